@@ -1,6 +1,6 @@
 from enigma import eActionMap
 
-from Tools.KeyBindings import queryKeyBinding
+from Tools.KeyBindings import hasKeyBinding, queryKeyBinding
 
 
 class ActionMap:
@@ -12,12 +12,7 @@ class ActionMap:
 		self.bound = False
 		self.exec_active = False
 		self.enabled = True
-		unknown = list(self.actions.keys())
-		for action in unknown[:]:
-			for context in self.contexts:
-				if queryKeyBinding(context, action):
-					unknown.remove(action)
-					break
+		unknown = [action for action in self.actions if not any(hasKeyBinding(context, action) for context in self.contexts)]
 		if unknown:
 			print("[ActionMap] Keymap(s) '%s' -> Undefined action(s) '%s'." % (", ".join(self.contexts), ", ".join(unknown)))
 
@@ -108,12 +103,12 @@ class HelpableActionMap(ActionMap):
 			for (action, funchelp) in actions.items():
 				# Check if this is a tuple.
 				if isinstance(funchelp, tuple):
-					if queryKeyBinding(context, action):
+					if hasKeyBinding(context, action):
 						if not exists((action, funchelp[1])):
 							alist.append((action, funchelp[1]))
 					adict[action] = funchelp[0]
 				else:
-					if queryKeyBinding(context, action):
+					if hasKeyBinding(context, action):
 						if not exists((action, None)):
 							alist.append((action, None))
 					adict[action] = funchelp
@@ -0,0 +1,126 @@
+from enigma import eDVBDB, eServiceCenter, eServiceReference
+
+
+class BouquetIndex:
+	"""Lookup tables over the bouquet and provider lists.
+
+	The tables are built on first use from the loaded bouquets and dropped
+	again by invalidate(), which is called whenever the bouquets are edited.
+	Reloads go through reloadBouquets() and reloadServicelist() below, which
+	invalidate as well. All references are keyed by toCompareString()."""
+
+	def __init__(self):
+		self.serviceHandler = eServiceCenter.getInstance()
+		self.invalidate()
+
+	def invalidate(self, *args):
+		self.lists = {}  # list root -> [eServiceReference, ...]
+		self.names = {}  # bouquet -> name
+		self.numbers = {}  # bouquet -> {channel number: service}
+		self.offsets = {}  # bouquet -> channel number offset
+		self.positions = {}  # (root, multi) -> {service: [(position, bouquet), ...]}
+		self.providers = {}  # provider root -> {service: provider name}
+
+	def getList(self, root):
+		key = root.toString()
+		content = self.lists.get(key)
+		if content is None:
+			content = []
+			servicelist = self.serviceHandler.list(root)
+			if servicelist is not None:
+				while True:
+					service = servicelist.getNext()
+					if not service.valid():
+						break
+					content.append(service)
+			self.lists[key] = content
+		return content
+
+	def getBouquets(self, root):
+		return [bouquet for bouquet in self.getList(root) if bouquet.flags & eServiceReference.isDirectory]
+
+	def getBouquetName(self, bouquet):
+		key = bouquet.toCompareString()
+		name = self.names.get(key)
+		if name is None:
+			info = self.serviceHandler.info(bouquet)
+			name = self.names[key] = info and info.getName(bouquet) or ""
+		return name
+
+	def getChannelNumbers(self, bouquet):
+		key = bouquet.toCompareString()
+		numbers = self.numbers.get(key)
+		if numbers is None:
+			numbers = self.numbers[key] = {}
+			for service in self.getList(bouquet):
+				numbers.setdefault(service.getChannelNum(), service)
+		return numbers
+
+	def getService(self, bouquet, number):
+		return self.getChannelNumbers(bouquet).get(number)
+
+	def getNumberOffset(self, bouquet):
+		key = bouquet.toCompareString()
+		offset = self.offsets.get(key)
+		if offset is None:
+			offset = 0
+			for service in self.getList(bouquet):
+				number = service.getChannelNum()
+				if number > 0:
+					offset = number - 1
+					break
+			self.offsets[key] = offset
+		return offset
+
+	def getPositions(self, root, multi):
+		key = (root.toString(), multi)
+		positions = self.positions.get(key)
+		if positions is None:
+			positions = self.positions[key] = {}
+			position = 0
+			for bouquet in multi and self.getBouquets(root) or [root]:
+				for service in self.getList(bouquet):
+					if not (service.flags & (eServiceReference.isMarker | eServiceReference.isDirectory)):
+						position += 1
+						positions.setdefault(service.toCompareString(), []).append((position, bouquet))
+		return positions
+
+	def getServicePosition(self, ref, root, multi=False, current=None):
+		"""Return (position, bouquet) of ref counted over the services of root,
+		or over all bouquets of root when multi is set. The occurrence in the
+		current bouquet is preferred. Returns (0, None) when ref is not found."""
+		found = self.getPositions(root, multi).get(ref.toCompareString())
+		if not found:
+			return 0, None
+		if current is not None:
+			for position, bouquet in found:
+				if bouquet == current:
+					return position, bouquet
+		return found[0]
+
+	def getProviderName(self, ref, root):
+		key = root.toString()
+		providers = self.providers.get(key)
+		if providers is None:
+			providers = self.providers[key] = {}
+			for provider in self.getBouquets(root):
+				info = self.serviceHandler.info(provider)
+				name = info and info.getName(provider) or "Unknown"
+				for service in self.getList(provider):
+					providers.setdefault(service.toCompareString(), name)
+		return providers.get(ref.toCompareString(), "")
+
+
+bouquetIndex = BouquetIndex()
+
+
+def reloadBouquets():
+	"""Reload the bouquets from the settings and drop the index over them."""
+	eDVBDB.getInstance().reloadBouquets()
+	bouquetIndex.invalidate()
+
+
+def reloadServicelist():
+	"""Reload lamedb and drop the index, which holds the service names."""
+	eDVBDB.getInstance().reloadServicelist()
+	bouquetIndex.invalidate()
@@ -5,16 +5,14 @@
 # Update By RAED for python3
 from Components.Converter.Converter import Converter
 from enigma import iServiceInformation, iPlayableService
-from Tools.Directories import fileExists
 from Components.Element import cached
-from Components.Converter.Poll import Poll
-import os
+from Tools.GetEcmInfo import ecmInfoFile
 
 info = {}
 old_ecm_mtime = None
 
 
-class CaidInfo2(Poll, Converter, object):
+class CaidInfo2(Converter, object):
 	CAID = 0
 	PID = 1
 	PROV = 2
@@ -53,12 +51,10 @@ class CaidInfo2(Poll, Converter, object):
 	SHORT = 35
 	IS_FTA = 36
 	IS_CRYPTED = 37
-	my_interval = 1000
-
 
 	def __init__(self, type):
-		Poll.__init__(self)
 		Converter.__init__(self, type)
+		self.ecm_watched = False
 		if type == "CAID":
 			self.type = self.CAID
 		elif type == "PID":
@@ -242,8 +238,7 @@ class CaidInfo2(Poll, Converter, object):
 					if ("%0.4X" % int(caid))[:2] == "26":
 						return True
 				return False
-			self.poll_interval = self.my_interval
-			self.poll_enabled = True
+			self.watchEcmInfo()
 			ecm_info = self.ecmfile()
 			if ecm_info:
 				caid = ("%0.4X" % int(ecm_info.get("caid", ""), 16))[:2]
@@ -331,10 +326,9 @@ class CaidInfo2(Poll, Converter, object):
 		service = self.source.service
 		if service:
 			if self.type == self.CRYPT2:
-				self.poll_interval = self.my_interval
-				self.poll_enabled = True
+				self.watchEcmInfo()
 				ecm_info = self.ecmfile()
-				if fileExists("/tmp/ecm.info"):
+				if ecmInfoFile.getStat() is not None:
 					try:
 						caid = "%0.4X" % int(ecm_info.get("caid", ""), 16)
 						return "%s" % self.systemTxtCaids.get(caid[:2])
@@ -346,8 +340,7 @@ class CaidInfo2(Poll, Converter, object):
 			info = service and service.info()
 			if info:
 				if info.getInfoObject(iServiceInformation.sCAIDs):
-					self.poll_interval = self.my_interval
-					self.poll_enabled = True
+					self.watchEcmInfo()
 					ecm_info = self.ecmfile()
 					# crypt2
 					if ecm_info:
@@ -503,20 +496,18 @@ class CaidInfo2(Poll, Converter, object):
 		ecm = None
 		service = self.source.service
 		if service:
-			try:
-				ecm_mtime = os.stat("/tmp/ecm.info").st_mtime
-				if not os.stat("/tmp/ecm.info").st_size > 0:
-					info = {}
-				if ecm_mtime == old_ecm_mtime:
-					return info
-				old_ecm_mtime = ecm_mtime
-				#ecmf = open("/tmp/ecm.info", "rb")
-				ecmf = open("/tmp/ecm.info", "r") # Fix Python3 (TypeError: a bytes-like object is required, not 'str' )
-				ecm = ecmf.readlines()
-			except:
+			stat = ecmInfoFile.getStat()
+			if stat is None:
 				old_ecm_mtime = None
 				info = {}
 				return info
+			ecm_mtime, ecm_size = stat
+			if not ecm_size > 0:
+				info = {}
+			if ecm_mtime == old_ecm_mtime:
+				return info
+			old_ecm_mtime = ecm_mtime
+			ecm = ecmInfoFile.getLines()
 
 			if ecm:
 				for line in ecm:
@@ -617,8 +608,30 @@ class CaidInfo2(Poll, Converter, object):
 										info["pid"] = line[x + 4:y]
 									elif z != -1:
 										info["pid"] = line[x + 4:z]
-				ecmf.close()
 		return info
 
+	# The shared ecm info reader notifies us about changes of the file,
+	# instead of polling it with a timer of our own.
+	def watchEcmInfo(self):
+		if not self.ecm_watched:
+			self.ecm_watched = True
+			if not self.suspended:
+				ecmInfoFile.addCallback(self.ecmInfoChanged)
+
+	def ecmInfoChanged(self):
+		self.changed((self.CHANGED_POLL,))
+
+	def doSuspend(self, suspended):
+		if self.ecm_watched:
+			if suspended:
+				ecmInfoFile.removeCallback(self.ecmInfoChanged)
+			else:
+				ecmInfoFile.addCallback(self.ecmInfoChanged)
+				self.changed((self.CHANGED_POLL,))
+
+	def destroy(self):
+		ecmInfoFile.removeCallback(self.ecmInfoChanged)
+		Converter.destroy(self)
+
 	def changed(self, what):
 		Converter.changed(self, (self.CHANGED_POLL,))
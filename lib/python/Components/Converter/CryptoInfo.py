@@ -1,7 +1,7 @@
 from Components.Converter.Converter import Converter
 from Components.Element import cached
 from Components.config import config
-from Tools.GetEcmInfo import GetEcmInfo
+from Tools.GetEcmInfo import GetEcmInfo, ecmInfoFile
 from Components.Converter.Poll import Poll
 
 
@@ -14,8 +14,11 @@ class CryptoInfo(Poll, Converter):
 		self.active = False
 		self.visible = config.usage.show_cryptoinfo.value
 		self.textvalue = ""
+		# The ecm intervals count the seconds since the last ecm, so they
+		# need a timer.  Everything else only changes with the ecm info
+		# file and is updated by the shared ecm info reader.
 		self.poll_interval = 1000
-		self.poll_enabled = True
+		self.poll_enabled = type.startswith("ecminterval")
 		self.ecmdata = GetEcmInfo()
 
 	@cached
@@ -31,3 +34,17 @@ class CryptoInfo(Poll, Converter):
 				data = self.ecmdata.getInfo(self.type)
 		return data
 	text = property(getText)
+
+	def ecmInfoChanged(self):
+		self.changed((self.CHANGED_POLL,))
+
+	def doSuspend(self, suspended):
+		if suspended:
+			ecmInfoFile.removeCallback(self.ecmInfoChanged)
+		else:
+			ecmInfoFile.addCallback(self.ecmInfoChanged)
+		Poll.doSuspend(self, suspended)
+
+	def destroy(self):
+		ecmInfoFile.removeCallback(self.ecmInfoChanged)
+		Poll.destroy(self)
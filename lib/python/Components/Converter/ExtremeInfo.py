@@ -4,9 +4,9 @@ from Components.Converter.Converter import Converter
 from Components.Element import cached
 from ServiceReference import ServiceReference
 from enigma import eServiceCenter, eServiceReference, iServiceInformation, eDVBFrontendParametersSatellite, eDVBFrontendParametersCable
-from string import upper
 import gettext
 from Components.Converter.Poll import Poll
+from Tools.GetEcmInfo import ecmInfoFile, getEcmInfoFile
 
 
 class ExtremeInfo(Poll, Converter, object):
@@ -290,10 +290,7 @@ class ExtremeInfo(Poll, Converter, object):
 		return False
 
 	def getEmu(self):
-		try:
-			content = open("/tmp/ecm.info", "r").read()
-		except:
-			content = ''
+		content = ecmInfoFile.getContent()
 
 		contentInfo = content.split('\n')
 		for line in contentInfo:
@@ -309,10 +306,7 @@ class ExtremeInfo(Poll, Converter, object):
 		return False
 
 	def getCrd(self):
-		try:
-			content = open("/tmp/ecm.info", "r").read()
-		except:
-			content = ''
+		content = ecmInfoFile.getContent()
 
 		contentInfo = content.split('\n')
 		for line in contentInfo:
@@ -328,10 +322,7 @@ class ExtremeInfo(Poll, Converter, object):
 		return False
 
 	def getNet(self):
-		try:
-			content = open("/tmp/ecm.info", "r").read()
-		except:
-			content = ''
+		content = ecmInfoFile.getContent()
 
 		contentInfo = content.split('\n')
 		for line in contentInfo:
@@ -352,10 +343,7 @@ class ExtremeInfo(Poll, Converter, object):
 		if service:
 			info = service and service.info()
 			if info:
-				try:
-					content = open("/tmp/ecm.info", "r").read()
-				except:
-					content = ''
+				content = ecmInfoFile.getContent()
 
 				contentInfo = content.split('\n')
 				if content == '':
@@ -389,10 +377,7 @@ class ExtremeInfo(Poll, Converter, object):
 		if service:
 			info = service and service.info()
 			if info:
-				try:
-					content = open("/tmp/ecm.info", "r").read()
-				except:
-					content = ''
+				content = ecmInfoFile.getContent()
 
 				contentInfo = content.split('\n')
 				if content == '':
@@ -426,10 +411,7 @@ class ExtremeInfo(Poll, Converter, object):
 		if service:
 			info = service and service.info()
 			if info:
-				try:
-					content = open("/tmp/ecm.info", "r").read()
-				except:
-					content = ''
+				content = ecmInfoFile.getContent()
 
 				contentInfo = content.split('\n')
 				if content == '':
@@ -463,10 +445,7 @@ class ExtremeInfo(Poll, Converter, object):
 		if service:
 			info = service and service.info()
 			if info:
-				try:
-					content = open("/tmp/ecm.info", "r").read()
-				except:
-					content = ''
+				content = ecmInfoFile.getContent()
 
 				contentInfo = content.split('\n')
 				if content == '':
@@ -500,10 +479,7 @@ class ExtremeInfo(Poll, Converter, object):
 		if service:
 			info = service and service.info()
 			if info:
-				try:
-					content = open("/tmp/ecm.info", "r").read()
-				except:
-					content = ''
+				content = ecmInfoFile.getContent()
 
 				contentInfo = content.split('\n')
 				if content == '':
@@ -537,10 +513,7 @@ class ExtremeInfo(Poll, Converter, object):
 		if service:
 			info = service and service.info()
 			if info:
-				try:
-					content = open("/tmp/ecm.info", "r").read()
-				except:
-					content = ''
+				content = ecmInfoFile.getContent()
 
 				contentInfo = content.split('\n')
 				if content == '':
@@ -574,10 +547,7 @@ class ExtremeInfo(Poll, Converter, object):
 		if service:
 			info = service and service.info()
 			if info:
-				try:
-					content = open("/tmp/ecm.info", "r").read()
-				except:
-					content = ''
+				content = ecmInfoFile.getContent()
 
 				contentInfo = content.split('\n')
 				if content == '':
@@ -611,10 +581,7 @@ class ExtremeInfo(Poll, Converter, object):
 		if service:
 			info = service and service.info()
 			if info:
-				try:
-					content = open("/tmp/ecm.info", "r").read()
-				except:
-					content = ''
+				content = ecmInfoFile.getContent()
 
 				contentInfo = content.split('\n')
 				if content == '':
@@ -648,10 +615,7 @@ class ExtremeInfo(Poll, Converter, object):
 		if service:
 			info = service and service.info()
 			if info:
-				try:
-					content = open("/tmp/ecm.info", "r").read()
-				except:
-					content = ''
+				content = ecmInfoFile.getContent()
 
 				contentInfo = content.split('\n')
 				if content == '':
@@ -685,10 +649,7 @@ class ExtremeInfo(Poll, Converter, object):
 		if service:
 			info = service and service.info()
 			if info:
-				try:
-					content = open("/tmp/ecm.info", "r").read()
-				except:
-					content = ''
+				content = ecmInfoFile.getContent()
 
 				contentInfo = content.split('\n')
 				if content == '':
@@ -722,10 +683,7 @@ class ExtremeInfo(Poll, Converter, object):
 		if service:
 			info = service and service.info()
 			if info:
-				try:
-					content = open("/tmp/ecm.info", "r").read()
-				except:
-					content = ''
+				content = ecmInfoFile.getContent()
 
 				contentInfo = content.split('\n')
 				if content == '':
@@ -1112,14 +1070,9 @@ class ExtremeInfo(Poll, Converter, object):
 		if service:
 			frontendInfo = service.frontendInfo()
 			if frontendInfo:
-				try:
-					ecmpath = '/tmp/ecm%s.info' % frontendInfo.getAll(False).get('tuner_number')
-					ecm = open(ecmpath, 'rb').readlines()
-				except:
-					try:
-						ecm = open('/tmp/ecm.info', 'rb').readlines()
-					except:
-						pass
+				ecm = getEcmInfoFile('/tmp/ecm%s.info' % frontendInfo.getAll(False).get('tuner_number')).getLines()
+				if not ecm:
+					ecm = ecmInfoFile.getLines()
 
 			if ecm:
 				for line in ecm:
@@ -1,19 +1,149 @@
-from enigma import eTimer
+from time import time
+from weakref import WeakKeyDictionary, WeakMethod, ref
+
+from enigma import eTimer, eGetEnigmaDebugLvl
+
+POLL_SLACK = 10 # ms, buckets due this soon are polled with the ones due now
+STATISTICS_INTERVAL = 300000 # ms, between the statistics printed in debug mode
+
+
+class PollSubscription:
+	__slots__ = ("owner", "callback", "name", "interval", "suspended", "polls", "cost", "max_cost")
+
+	def __init__(self, owner, callback, interval, name):
+		# the owner is not kept alive by the scheduler, not every owner calls remove()
+		self.owner = ref(owner)
+		self.callback = WeakMethod(callback)
+		self.name = name
+		self.interval = interval
+		self.suspended = False
+		self.polls = 0
+		self.cost = 0.0
+		self.max_cost = 0.0
+
+
+class PollScheduler:
+	"""One timer for all polling elements.
+
+	Subscribers are kept in buckets by their interval. A bucket is due at
+	the multiples of its interval on the clock, so buckets with intervals
+	dividing each other are polled in the same main loop iteration, and the
+	one second bucket is polled at the turn of the second. Suspended
+	subscribers stay in their bucket and are skipped. The time each poll
+	takes is counted per subscriber, see getStatistics(), and printed every
+	few minutes in debug mode. Subscribers are held weakly and dropped once
+	they are gone."""
+
+	def __init__(self):
+		self.timer = eTimer()
+		self.timer.callback.append(self.run)
+		self.subscriptions = WeakKeyDictionary() # owner -> PollSubscription
+		self.buckets = {} # interval -> [due in ms, subscriptions]
+		self.statistics = {} # name -> [interval, polls, cost, max cost], of the subscriptions gone
+		self.statistics_due = int(time() * 1000) + STATISTICS_INTERVAL if eGetEnigmaDebugLvl() >= 4 else None
+
+	def add(self, owner, interval, callback):
+		subscription = self.subscriptions.get(owner)
+		if subscription is not None:
+			subscription.suspended = False
+			if subscription.interval == interval:
+				return
+			self.remove(owner)
+		subscription = self.subscriptions[owner] = PollSubscription(owner, callback, interval, self.getName(owner))
+		bucket = self.buckets.get(interval)
+		if bucket is None:
+			now = int(time() * 1000)
+			bucket = self.buckets[interval] = [now - now % interval + interval, []]
+			self.schedule(now)
+		bucket[1].append(subscription)
+
+	def remove(self, owner):
+		subscription = self.subscriptions.pop(owner, None)
+		if subscription is not None:
+			self.drop(subscription)
+
+	def drop(self, subscription):
+		bucket = self.buckets.get(subscription.interval)
+		if bucket is not None and subscription in bucket[1]:
+			bucket[1].remove(subscription)
+			if not bucket[1]:
+				del self.buckets[subscription.interval]
+				if not self.buckets:
+					self.timer.stop()
+			if subscription.polls:
+				entry = self.statistics.setdefault(subscription.name, [subscription.interval, 0, 0.0, 0.0])
+				entry[1] += subscription.polls
+				entry[2] += subscription.cost
+				entry[3] = max(entry[3], subscription.max_cost)
+
+	def suspend(self, owner, suspended=True):
+		subscription = self.subscriptions.get(owner)
+		if subscription is not None:
+			subscription.suspended = suspended
+
+	def run(self):
+		now = int(time() * 1000)
+		for interval, bucket in list(self.buckets.items()):
+			if bucket[0] > now + POLL_SLACK and bucket[0] <= now + interval:
+				continue
+			bucket[0] = now - now % interval + interval # a clock which jumped is followed as well
+			for subscription in bucket[1][:]:
+				owner = subscription.owner()
+				if owner is None: # gone without remove()
+					self.drop(subscription)
+				elif not subscription.suspended and self.subscriptions.get(owner) is subscription: # not removed by an earlier poll
+					start = time()
+					subscription.callback()()
+					cost = time() - start
+					subscription.polls += 1
+					subscription.cost += cost
+					if cost > subscription.max_cost:
+						subscription.max_cost = cost
+		if self.statistics_due is not None and now >= self.statistics_due:
+			self.statistics_due = now + STATISTICS_INTERVAL
+			self.printStatistics()
+		self.schedule(int(time() * 1000))
+
+	def schedule(self, now):
+		if self.buckets:
+			self.timer.start(max(0, min(bucket[0] for bucket in self.buckets.values()) - now), True)
+		else:
+			self.timer.stop()
+
+	def getName(self, owner):
+		arguments = getattr(owner, "converter_arguments", None)
+		return "%s(%s)" % (owner.__class__.__name__, arguments) if arguments else owner.__class__.__name__
+
+	def getStatistics(self):
+		"""Returns (name, interval in ms, polls, total seconds, slowest poll in
+		seconds) per kind of subscriber, the most expensive first."""
+		statistics = dict((name, entry[:]) for name, entry in self.statistics.items())
+		for subscription in list(self.subscriptions.values()):
+			entry = statistics.setdefault(subscription.name, [subscription.interval, 0, 0.0, 0.0])
+			entry[1] += subscription.polls
+			entry[2] += subscription.cost
+			entry[3] = max(entry[3], subscription.max_cost)
+		return sorted(((name,) + tuple(entry) for name, entry in statistics.items()), key=lambda item: -item[3])
+
+	def printStatistics(self, count=10):
+		for name, interval, polls, cost, slowest in self.getStatistics()[:count]:
+			print("[Poll] %6d ms %7d polls %9.3fs total %7.3fs slowest  %s" % (interval, polls, cost, slowest, name))
+
+
+pollScheduler = PollScheduler()
 
 
 class Poll:
 	def __init__(self):
-		self.__poll_timer = eTimer()
-		self.__poll_timer.callback.append(self.poll)
 		self.__interval = 1000
 		self.__enabled = False
 
 	def __setInterval(self, interval):
 		self.__interval = interval
 		if self.__enabled:
-			self.__poll_timer.start(self.__interval)
+			pollScheduler.add(self, self.__interval, self.poll)
 		else:
-			self.__poll_timer.stop()
+			pollScheduler.remove(self)
 
 	def __setEnable(self, enabled):
 		self.__enabled = enabled
@@ -28,10 +158,10 @@ class Poll:
 	def doSuspend(self, suspended):
 		if self.__enabled:
 			if suspended:
-				self.__poll_timer.stop()
+				pollScheduler.suspend(self)
 			else:
 				self.poll()
 				self.poll_enabled = True
 
 	def destroy(self):
-		self.__poll_timer.callback.remove(self.poll)
+		pollScheduler.remove(self)
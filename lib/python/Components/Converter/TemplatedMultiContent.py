@@ -2,37 +2,57 @@ from Components.Converter.StringList import StringList
 
 from enigma import eListbox
 
+templates = {}  # (template source, skin factor) -> (template, styles), shared by all converters.
+
+
+def compileTemplate(args, f):
+	"""Evaluate the template source of a skin and work out the content setup of each of its styles."""
+	from enigma import BT_SCALE, RT_HALIGN_CENTER, RT_HALIGN_LEFT, RT_HALIGN_RIGHT, RT_VALIGN_BOTTOM, RT_VALIGN_CENTER, RT_VALIGN_TOP, RT_WRAP, eListboxPythonMultiContent, gFont
+	from skin import parseFont, getSkinFactor
+	from Components.MultiContent import MultiContentEntryPixmap, MultiContentEntryPixmapAlphaBlend, MultiContentEntryPixmapAlphaTest, MultiContentEntryProgress, MultiContentEntryProgressPixmap, MultiContentEntryText, MultiContentTemplateColor
+	loc = locals()
+	del loc["args"]  # Cleanup locals a bit.
+	template = eval(args, {}, loc)
+	assert "fonts" in template
+	assert "itemHeight" in template
+	assert "template" in template or "templates" in template
+	assert "template" in template or "default" in template["templates"]  # We need to have a default template.
+	if "template" not in template:  # Default template can be ["template"] or ["templates"]["default"].
+		templateDefault = template["templates"]["default"]
+		template["template"] = templateDefault[1]  # mandatory
+		template["itemHeight"] = templateDefault[0]  # mandatory
+		if len(templateDefault) > 2:  # optional
+			template["selectionEnabled"] = templateDefault[2]
+		if len(templateDefault) > 3:  # optional
+			template["scrollbarMode"] = templateDefault[3]
+		if len(templateDefault) > 5:  # optional, but, must be present together
+			template["itemWidth"] = templateDefault[4]
+			template["orientation"] = templateDefault[5]
+	# (template, item height, item width, orientation, selection enabled, scrollbar mode) per style, None is the default.
+	default = (template.get("template"), int(template["itemHeight"]), template.get("itemWidth"), template.get("orientation"), template.get("selectionEnabled", True), template.get("scrollbarMode", "showOnDemand"))
+	styles = {None: default}
+	for style, entry in (template.get("templates") or {}).items():
+		# "template" and "itemheight" are mandatory in a template. selectionEnabled, scrollbarMode, itemwidth, and orientation are optional.
+		itemwidth, orientation = (entry[4], entry[5]) if len(entry) > 5 else default[2:4]  # optional, but, must be present together
+		selectionEnabled = entry[2] if len(entry) > 2 and entry[2] is not None else default[4]
+		scrollbarMode = entry[3] if len(entry) > 3 and entry[3] is not None else default[5]
+		styles[style] = (entry[1], int(entry[0]), itemwidth, orientation, selectionEnabled, scrollbarMode)
+	return template, styles
+
 
 class TemplatedMultiContent(StringList):
 	"""Turns a python tuple list into a multi-content list which can be used in a listbox renderer."""
 
+	orientations = {"orHorizontal": eListbox.orHorizontal, "orVertical": eListbox.orVertical}
+
 	def __init__(self, args):
 		StringList.__init__(self, args)
-		from enigma import BT_SCALE, RT_HALIGN_CENTER, RT_HALIGN_LEFT, RT_HALIGN_RIGHT, RT_VALIGN_BOTTOM, RT_VALIGN_CENTER, RT_VALIGN_TOP, RT_WRAP, eListboxPythonMultiContent, gFont
-		from skin import parseFont, getSkinFactor
-		from Components.MultiContent import MultiContentEntryPixmap, MultiContentEntryPixmapAlphaBlend, MultiContentEntryPixmapAlphaTest, MultiContentEntryProgress, MultiContentEntryProgressPixmap, MultiContentEntryText, MultiContentTemplateColor
-		f = getSkinFactor()
-		loc = locals()
-		del loc["self"]  # Cleanup locals a bit.
-		del loc["args"]
+		from skin import getSkinFactor
+		key = (args, getSkinFactor())
+		if key not in templates:  # A screen opened again, or another one with the same list, reuses the evaluated template.
+			templates[key] = compileTemplate(*key)
+		self.template, self.styles = templates[key]
 		self.active_style = None
-		self.template = eval(args, {}, loc)
-		self.orientations = {"orHorizontal": eListbox.orHorizontal, "orVertical": eListbox.orVertical}
-		assert "fonts" in self.template
-		assert "itemHeight" in self.template
-		assert "template" in self.template or "templates" in self.template
-		assert "template" in self.template or "default" in self.template["templates"]  # We need to have a default template.
-		if "template" not in self.template:  # Default template can be ["template"] or ["templates"]["default"].
-			templateDefault = self.template["templates"]["default"]
-			self.template["template"] = templateDefault[1]  # mandatory
-			self.template["itemHeight"] = templateDefault[0]  # mandatory
-			if len(templateDefault) > 2:  # optional
-				self.template["selectionEnabled"] = templateDefault[2]
-			if len(templateDefault) > 3:  # optional
-				self.template["scrollbarMode"] = templateDefault[3]
-			if len(templateDefault) > 5:  # optional, but, must be present together
-				self.template["itemWidth"] =  templateDefault[4]
-				self.template["orientation"] = templateDefault[5]
 
 	def changed(self, what):
 		if not self.content:
@@ -52,30 +72,13 @@ class TemplatedMultiContent(StringList):
 			style = self.source.style
 			if style == self.active_style:
 				return
-			templates = self.template.get("templates")  # If skin defined "templates", that means that it defines multiple styles in a dict. template should still be a default.
-			template = self.template.get("template")
-			itemheight = self.template["itemHeight"]
-			itemwidth = self.template.get("itemWidth")
-			orientation = self.template.get("orientation")
-			selectionEnabled = self.template.get("selectionEnabled", True)
-			scrollbarMode = self.template.get("scrollbarMode", "showOnDemand")
-			if templates and style and style in templates:  # If we have a custom style defined in the source, and different templates in the skin, look it up
-				# "template" and "itemheight" are mandatory in a template. selectionEnabled, scrollbarMode, itemwidth, and orientation are optional.
-				template = templates[style][1]
-				itemheight = templates[style][0]
-				if len(templates[style]) > 2 and templates[style][2] is not None:
-					selectionEnabled = templates[style][2]
-				if len(templates[style]) > 3 and templates[style][3] is not None:
-					scrollbarMode = templates[style][3]
-				if len(templates[style]) > 5:  # optional, but, must be present together
-					itemwidth = templates[style][4]
-					orientation = templates[style][5]
-				
+			# If the source has a custom style and the skin defines different templates for it, use that, else the default.
+			template, itemheight, itemwidth, orientation, selectionEnabled, scrollbarMode = self.styles.get(style, self.styles[None]) if style else self.styles[None]
 			self.content.setTemplate(template)
 			if orientation is not None and itemwidth is not None:
 				self.content.setOrientation(self.orientations.get(orientation, self.orientations["orVertical"]))
 				self.content.setItemWidth(int(itemwidth))
-			self.content.setItemHeight(int(itemheight))
+			self.content.setItemHeight(itemheight)
 			self.selectionEnabled = selectionEnabled
 			self.scrollbarMode = scrollbarMode
 			self.active_style = style
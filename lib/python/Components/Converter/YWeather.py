@@ -6,11 +6,6 @@ from Tools.Directories import fileExists, resolveFilename, SCOPE_PLUGINS
 from Components.Converter.Poll import Poll
 import time
 import os
-try:
-	import urllib2
-except ImportError:
-	import urllib
-import socket
 from six import PY2
 
 if PY2:
@@ -58,6 +53,7 @@ class YWeather(Poll, Converter, object):
 	picon5 = 32
 	day5 = 33
 	date5 = 34
+	waiting = None # converters waiting for the download in progress
 
 	def __init__(self, type):
 		Converter.__init__(self, type)
@@ -136,36 +132,34 @@ class YWeather(Poll, Converter, object):
 		self.poll_enabled = True
 
 	def fetchXML(self, URL, save_to):
-		socket_timeout = 10
-		socket.setdefaulttimeout(socket_timeout)
-		if PY2:
-			req = urllib2.Request(URL)
-		else:
-			req = urllib.request.Request(URL)
-		try:
-			if PY2:
-				response = urllib2.urlopen(req)
-			else:
-				response = urllib.request.urlopen(req)
-		except Exception as e:
-			if hasattr(e, 'code') and hasattr(e, 'reason'):
-				print("[YWeather] fetchXML Failed to retrieve XML file. Error: %s %s" % (str(e.code), str(e.reason)))
-			else:
-				if hasattr(e, 'reason'):
-					print('[YWeather] fetchXML Failed to retrieve XML file. Error: ', str(e.reason))
-				else:
-					print('[YWeather] fetchXML Failed to retrieve XML file.')
+		# runs in the background, a skin has many of these converters and they share one download
+		if YWeather.waiting is not None:
+			if self not in YWeather.waiting:
+				YWeather.waiting.append(self)
 			return
+		from Tools.HttpClient import httpClient
+		YWeather.waiting = [self]
+		httpClient.get(URL).addCallbacks(self.gotXML, self.fetchXMLFailed, callbackArgs=(save_to,), errbackArgs=(save_to,))
 
+	def gotXML(self, data, save_to):
 		try:
 			with open(save_to, "w") as f:
-				f.write(response.read().replace("><", ">\n<"))
-				f.close
+				f.write(data.decode("UTF-8", "ignore").replace("><", ">\n<"))
 			print('[YWeather] fetchXML XML file retrieved and saved.')
-			return True
 		except:
 			print('[YWeather] fetchXML XML file retrieved and but could not be saved.')
-			return
+		self.notifyWaiting()
+
+	def fetchXMLFailed(self, failure, save_to):
+		print('[YWeather] fetchXML Failed to retrieve XML file. Error: ', failure.getErrorMessage())
+		with open(save_to, "w") as f:
+			f.write("None")
+		self.notifyWaiting()
+
+	def notifyWaiting(self):
+		waiting, YWeather.waiting = YWeather.waiting, None
+		for converter in waiting or ():
+			converter.changed((self.CHANGED_POLL,))
 
 	@cached
 	def getText(self):
@@ -187,10 +181,8 @@ class YWeather(Poll, Converter, object):
 		if fileExists(XML_location) and (int((time.time() - os.stat(XML_location).st_mtime) / 60) >= self.time_update):
 			os.remove(XML_location)
 		XML_URL = "https://query.yahooapis.com/v1/public/yql?q=select%%20*%%20from%%20weather.forecast%%20where%%20woeid=%ss%%20AND%%20u=%%22c%%22" % self.weather_city
-		if not fileExists(XML_location) and self.fetchXML(XML_URL, XML_location) != True:
-			with open(XML_location, "w") as f:
-				f.write("None")
-				f.close
+		if not fileExists(XML_location):
+			self.fetchXML(XML_URL, XML_location)
 			return 'N/A'
 		wday = 1
 		for line in open(XML_location):
@@ -1,4 +1,5 @@
 from Tools.CList import CList
+from enigma import eTimer
 from functools import reduce
 
 # down                       up
@@ -20,6 +21,18 @@ def cached(f):
 	return wrapper
 
 
+dirty_elements = []  # batching elements with changes waiting for the flush
+flush_timer = None
+
+
+def flushAllChanges():
+	global dirty_elements
+	while dirty_elements:  # a flush may make more elements dirty
+		elements, dirty_elements = dirty_elements, []
+		for element in elements:
+			element.flushChanges()
+
+
 class ElementError(Exception):
 	def __init__(self, message):
 		self.msg = message
@@ -36,6 +49,11 @@ class Element:
 	CHANGED_POLL = 4      # a timer expired
 
 	SINGLE_SOURCE = True
+	BATCH_CHANGES = False  # opt in to push the changes of one main loop iteration together
+
+	changes_pushed = 0
+	changes_saved = 0
+	pending_changes = ()
 
 	def __init__(self):
 		self.downstream_elements = CList()
@@ -44,6 +62,7 @@ class Element:
 		self.source = None
 		self.__suspended = True
 		self.cache = None
+		self.pending_changes = []
 
 	def connectDownstream(self, downstream):
 		self.downstream_elements.append(downstream)
@@ -87,10 +106,49 @@ class Element:
 
 	# default action: push downstream
 	def changed(self, *args, **kwargs):
+		if self.BATCH_CHANGES and len(args) == 1 and not kwargs:
+			self.addChange(args[0])
+		else:
+			if self.pending_changes:
+				self.flushChanges()
+			self.pushChange(*args, **kwargs)
+
+	def pushChange(self, *args, **kwargs):
+		self.changes_pushed += 1
 		self.cache = {}
 		self.downstream_elements.changed(*args, **kwargs)
 		self.cache = None
 
+	# a batching element only marks itself dirty and remembers what changed,
+	# the changes are pushed when the main loop has handled the current events
+	# and before the screen is painted. when everything changed the other
+	# changes are left out, the same specific change is pushed once
+	def addChange(self, what):
+		global flush_timer
+		pending = self.pending_changes
+		if not pending:
+			pending.append(what)
+			dirty_elements.append(self)
+			if flush_timer is None:
+				flush_timer = eTimer()
+				flush_timer.callback.append(flushAllChanges)
+			if not flush_timer.isActive():
+				flush_timer.start(0, True)
+		elif pending[0][0] == self.CHANGED_ALL or what in pending:
+			self.changes_saved += 1
+		elif what[0] == self.CHANGED_ALL:
+			self.changes_saved += len(pending)
+			pending[:] = [what]
+		else:
+			pending.append(what)
+
+	def flushChanges(self):
+		pending = self.pending_changes
+		if pending:
+			self.pending_changes = []
+			for what in pending:
+				self.pushChange(what)
+
 	def setSuspend(self, suspended):
 		changed = self.__suspended != suspended
 		if not self.__suspended and suspended:
@@ -317,7 +317,7 @@ class Harddisk:
 		os.mkdir(os.path.join(self.mount_path, 'movie'))
 
 	def createInitializeJob(self):
-		job = Task.Job(_("Initializing storage device..."))
+		job = Task.Job(_("Initializing storage device..."), resources=("device:" + self.device,))
 		size = self.diskSize()
 		print("[HD] size: %s MB" % size)
 
@@ -434,7 +434,7 @@ class Harddisk:
 		return -5
 
 	def createCheckJob(self):
-		job = Task.Job(_("Checking filesystem..."))
+		job = Task.Job(_("Checking filesystem..."), resources=("device:" + self.device,))
 		if self.findMount():
 			# Create unmount task if it was not mounted
 			UnmountTask(job, self)
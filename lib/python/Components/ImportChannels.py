@@ -4,20 +4,25 @@ import shutil
 import tempfile
 import threading
 from base64 import encodebytes
+from concurrent.futures import ThreadPoolExecutor
 from json import loads
 from time import sleep
 from urllib.error import URLError
 from urllib.parse import quote
 from urllib.request import Request, urlopen
-from json import loads
 from Components.config import config
 from Screens.MessageBox import MessageBox
 from Tools.Notifications import AddNotificationWithID
 
 settingfiles = ('lamedb', 'bouquets.', 'userbouquet.', 'blacklist', 'whitelist', 'alternatives.')
 
+MAX_DOWNLOADS = 4 # bouquet files fetched at the same time
+CHUNK_SIZE = 64 * 1024
+
 
 class ImportChannels:
+	settings_dir = "/etc/enigma2"
+	channels_changed = False # the infobar reloads the settings only when they changed
 
 	def __init__(self):
 		if config.usage.remote_fallback_enabled.value and config.usage.remote_fallback_import.value and config.usage.remote_fallback.value and not "ChannelsImport" in [x.name for x in threading.enumerate()]:
@@ -50,6 +55,10 @@ class ImportChannels:
 			raise(e)
 		return result
 
+	def downloadFile(self, url, f, timeout=30):
+		# epg.dat can be large, it goes to disk in chunks instead of through memory
+		shutil.copyfileobj(self.getUrl(url, timeout), f, CHUNK_SIZE)
+
 	def getTerrestrialUrl(self):
 		url = config.usage.remote_fallback_dvb_t.value
 		return url[:url.rfind(":")] if url else self.url
@@ -87,8 +96,6 @@ class ImportChannels:
 	def ImportGetFilelist(self, remote=False, radio=False, *files):
 		result = []
 		for file in files:
-			# determine the type of bouquet file
-			type = 1 if file.endswith('.tv') else 2
 			# read the contents of the file
 			try:
 				if remote:
@@ -100,21 +107,15 @@ class ImportChannels:
 						self.ImportChannelsDone(False, _("ERROR downloading file /etc/enigma2/%s") % file)
 						return
 				else:
-					with open('/etc/enigma2/%s' % file, 'r') as f:
+					with open(os.path.join(self.settings_dir, file), 'r') as f:
 						content = f.readlines()
 			except Exception as e:
 				# for the moment just log and ignore
 				print("[Import Channels] %s" % str(e))
-				continue;
+				continue
 
 			# check the contents for more bouquet files
-			for line in content:
-				print ("[Import Channels] %s" % line)
-				# check if it contains another bouquet reference
-				r = re.match('#SERVICE 1:7:%d:0:0:0:0:0:0:0:FROM BOUQUET "(.*)" ORDER BY bouquet' % type, line)
-				if r:
-					# recurse
-					result.extend(self.ImportGetFilelist(remote, r.group(1)))
+			result.extend(self.ImportGetFilelist(remote, radio, *self.getBouquetReferences(file, content)) or [])
 
 			# add add the file itself
 			result.append(file)
@@ -122,85 +123,159 @@ class ImportChannels:
 		# return the file list
 		return result
 
-	def threaded_function(self):
-		settings = self.getFallbackSettings()
-		self.getTerrestrialRegion(settings)
-		self.tmp_dir = tempfile.mkdtemp(prefix="ImportChannels_")
+	def getBouquetReferences(self, file, content):
+		# the bouquet files referenced by a bouquet list
+		type = 1 if file.endswith('.tv') else 2
+		pattern = re.compile('#SERVICE 1:7:%d:0:0:0:0:0:0:0:FROM BOUQUET "(.*)" ORDER BY bouquet' % type)
+		return [r.group(1) for r in map(pattern.match, content) if r]
+
+	def fetchRemoteBouquets(self):
+		"""Download the remote bouquet files, each of them once. The files
+		referenced by a level of bouquet lists are fetched in parallel.
+		Returns a dict file -> content, raises on the first failed download."""
+		result = {}
+		files = ['bouquets.tv', 'bouquets.radio']
 
-		if "epg" in self.remote_fallback_import:
-			print("[Import Channels] Writing epg.dat file on server box")
+		def fetch(file):
+			print("[Import Channels] Downloading %s..." % file)
 			try:
-				result = loads(self.getUrl("%s/api/saveepg" % self.url, timeout=30).read().decode('utf-8'))
-				if 'result' not in result and result['result'] == False:
-					self.ImportChannelsDone(False, _("Error when writing epg.dat on the fallback receiver"))
+				return self.getUrl("%s/file?file=/etc/enigma2/%s" % (self.url, quote(file))).read()
 			except Exception as e:
 				print("[Import Channels] Exception: %s" % str(e))
+				raise OSError(0, str(e), file) # tells which file failed
+
+		with ThreadPoolExecutor(MAX_DOWNLOADS) as pool:
+			while files:
+				references = []
+				for file, content in zip(files, pool.map(fetch, files)):
+					result[file] = content
+					references += self.getBouquetReferences(file, content.decode('utf-8', 'replace').splitlines())
+				files = [file for file in dict.fromkeys(references) if file not in result]
+		return result
+
+	def getChangedFiles(self, files):
+		changed = []
+		for file, content in files.items():
+			try:
+				with open(os.path.join(self.settings_dir, file), 'rb') as f:
+					if f.read() == content:
+						continue
+			except OSError:
+				pass
+			changed.append(file)
+		return changed
+
+	def importEPG(self, settings):
+		print("[Import Channels] Writing epg.dat file on server box")
+		try:
+			result = loads(self.getUrl("%s/api/saveepg" % self.url, timeout=30).read().decode('utf-8'))
+			if 'result' not in result and result['result'] == False:
 				self.ImportChannelsDone(False, _("Error when writing epg.dat on the fallback receiver"))
-				return
-			print("[Import Channels] Get EPG Location")
+		except Exception as e:
+			print("[Import Channels] Exception: %s" % str(e))
+			self.ImportChannelsDone(False, _("Error when writing epg.dat on the fallback receiver"))
+			return False
+		print("[Import Channels] Get EPG Location")
+		try:
+			epgdatfile = self.getFallbackSettingsValue(settings, "config.misc.epgcache_filename") or "/media/hdd/epg.dat"
+			try:
+				files = [file for file in loads(self.getUrl("%s/file?dir=%s" % (self.url, os.path.dirname(epgdatfile))).read())["files"] if os.path.basename(file).startswith(os.path.basename(epgdatfile))]
+			except:
+				files = [file for file in loads(self.getUrl("%s/file?dir=/" % self.url).read())["files"] if os.path.basename(file).startswith("epg.dat")]
+			epg_location = files[0] if files else None
+		except Exception as e:
+			print("[Import Channels] Exception: %s" % str(e))
+			self.ImportChannelsDone(False, _("Error while retrieving location of epg.dat on the fallback receiver"))
+			return False
+		if not epg_location:
+			self.ImportChannelsDone(False, _("No epg.dat file found on the fallback receiver"))
+			return True
+		print("[Import Channels] Copy EPG file...")
+		# follow same logic as in epgcache.cpp, the file is written next to its destination
+		# and then renamed, the cache never sees a partial file
+		for destination in (config.misc.epgcache_filename.value, "/epg.dat"):
 			try:
-				epgdatfile = self.getFallbackSettingsValue(settings, "config.misc.epgcache_filename") or "/media/hdd/epg.dat"
-				try:
-					files = [file for file in loads(self.getUrl("%s/file?dir=%s" % (self.url, os.path.dirname(epgdatfile))).read())["files"] if os.path.basename(file).startswith(os.path.basename(epgdatfile))]
-				except:
-					files = [file for file in loads(self.getUrl("%s/file?dir=/" % self.url).read())["files"] if os.path.basename(file).startswith("epg.dat")]
-				epg_location = files[0] if files else None
+				f = open(destination + ".import", "wb")
 			except Exception as e:
 				print("[Import Channels] Exception: %s" % str(e))
-				self.ImportChannelsDone(False, _("Error while retrieving location of epg.dat on the fallback receiver"))
-				return
-			if epg_location:
-				print("[Import Channels] Copy EPG file...")
-				try:
-					open(os.path.join(self.tmp_dir, "epg.dat"), "wb").write(self.getUrl("%s/file?file=%s" % (self.url, epg_location)).read())
-				except Exception as e:
-					print("[Import Channels] Exception: %s" % str(e))
-					self.ImportChannelsDone(False, _("Error while retrieving epg.dat from the fallback receiver"))
-					return
-				try:
-					shutil.move(os.path.join(self.tmp_dir, "epg.dat"), config.misc.epgcache_filename.value)
-				except:
-					# follow same logic as in epgcache.cpp
-					try:
-						shutil.move(os.path.join(self.tmp_dir, "epg.dat"), "/epg.dat")
-					except Exception as e:
-						print("[Import Channels] Exception: %s" % str(e))
-						self.ImportChannelsDone(False, _("Error while moving epg.dat to its destination"))
-						return
-			else:
-				self.ImportChannelsDone(False, _("No epg.dat file found on the fallback receiver"))
-
-		if "channels" in self.remote_fallback_import:
-			print("[Import Channels] enumerate remote files")
-			files = self.ImportGetFilelist(True, 'bouquets.tv', 'bouquets.radio');
-
-			print("[Import Channels] fetch remote files")
-			for file in files:
-				print("[Import Channels] Downloading %s..." % file)
-				try:
-					open(os.path.join(self.tmp_dir, os.path.basename(file)), "wb").write(self.getUrl("%s/file?file=/etc/enigma2/%s" % (self.url, quote(file))).read())
-				except Exception as e:
-					print("[Import Channels] Exception: %s" % str(e))
-
-			print("[Import Channels] enumerate local files")
-			files = self.ImportGetFilelist(False, 'bouquets.tv', 'bouquets.radio');
-
-			print("[Import Channels] Removing old local files...")
-			for file in files:
-				print("[Import Channels] Removing %s..." % file)
-				os.remove(os.path.join("/etc/enigma2", file))
-
-			print("[Import Channels] copying files...")
-			files = [x for x in os.listdir(self.tmp_dir)]
-			for file in files:
-				print("[Import Channels] Moving %s..." % file)
-				shutil.move(os.path.join(self.tmp_dir, file), os.path.join("/etc/enigma2", file))
+				continue
+			try:
+				with f:
+					self.downloadFile("%s/file?file=%s" % (self.url, epg_location), f)
+			except Exception as e:
+				print("[Import Channels] Exception: %s" % str(e))
+				os.remove(destination + ".import")
+				self.ImportChannelsDone(False, _("Error while retrieving epg.dat from the fallback receiver"))
+				return False
+			os.replace(destination + ".import", destination)
+			return True
+		self.ImportChannelsDone(False, _("Error while moving epg.dat to its destination"))
+		return False
+
+	def importChannels(self):
+		print("[Import Channels] fetch remote files")
+		self.channels_changed = False
+		try:
+			files = self.fetchRemoteBouquets()
+		except OSError as e:
+			self.ImportChannelsDone(False, _("ERROR downloading file /etc/enigma2/%s") % e.filename)
+			return False
+
+		print("[Import Channels] enumerate local files")
+		obsolete = [file for file in self.ImportGetFilelist(False, False, 'bouquets.tv', 'bouquets.radio') if file not in files]
+		changed = self.getChangedFiles(files)
+		print("[Import Channels] %d of %d files changed, %d removed" % (len(changed), len(files), len(obsolete)))
+		if not changed and not obsolete:
+			return True
+
+		staged = []
+		for file in changed:
+			name = os.path.basename(file)
+			if not name or name.startswith("."):
+				print("[Import Channels] Ignoring invalid file name %s" % file)
+				continue
+			staged.append((file, name))
+
+		# everything is staged before the first file is replaced, a failed import leaves the old set
+		try:
+			staging = tempfile.mkdtemp(prefix=".ImportChannels_", dir=self.settings_dir)
+			try:
+				for file, name in staged:
+					with open(os.path.join(staging, name), "wb") as f:
+						f.write(files[file])
+				# bouquet lists last, they must not point to bouquets which are not there yet
+				for file, name in sorted(staged, key=lambda entry: entry[1].startswith("bouquets.")):
+					print("[Import Channels] Replacing %s..." % name)
+					os.replace(os.path.join(staging, name), os.path.join(self.settings_dir, name))
+			finally:
+				shutil.rmtree(staging, True)
+		except OSError as e:
+			print("[Import Channels] Exception: %s" % str(e))
+			self.ImportChannelsDone(False, _("ERROR writing file %s") % (e.filename2 or e.filename))
+			return False
+		for file in obsolete:
+			print("[Import Channels] Removing %s..." % file)
+			try:
+				os.remove(os.path.join(self.settings_dir, file))
+			except OSError:
+				pass
+		self.channels_changed = True
+		return True
+
+	def threaded_function(self):
+		settings = self.getFallbackSettings()
+		self.getTerrestrialRegion(settings)
+
+		if "epg" in self.remote_fallback_import and not self.importEPG(settings):
+			return
+
+		if "channels" in self.remote_fallback_import and not self.importChannels():
+			return
 
 		self.ImportChannelsDone(True, {"channels": _("Channels"), "epg": _("EPG"), "channels_epg": _("Channels and EPG")}[self.remote_fallback_import])
 
 	def ImportChannelsDone(self, flag, message=None):
-		shutil.rmtree(self.tmp_dir, True)
 		if flag:
-			AddNotificationWithID("ChannelsImportOK", MessageBox, _("%s imported from fallback tuner") % message, type=MessageBox.TYPE_INFO, timeout=5)
+			AddNotificationWithID("ChannelsImportOK" if self.channels_changed else "ChannelsImportUnchangedOK", MessageBox, _("%s imported from fallback tuner") % message, type=MessageBox.TYPE_INFO, timeout=5)
 		else:
 			AddNotificationWithID("ChannelsImportNOK", MessageBox, _("Import from fallback tuner failed, %s") % message, type=MessageBox.TYPE_ERROR, timeout=5)
@@ -4,6 +4,7 @@ from ServiceReference import ServiceReference
 from Components.MultiContent import MultiContentEntryText, MultiContentEntryPixmapAlphaBlend, MultiContentEntryProgress
 from Components.config import config
 import os
+import pickle
 import struct
 import random
 from time import localtime, strftime
@@ -23,6 +24,9 @@ KNOWN_EXTENSIONS = MOVIE_EXTENSIONS.union(IMAGE_EXTENSIONS, DVD_EXTENSIONS, AUDI
 
 cutsParser = struct.Struct('>QI') # big-endian, 64-bit PTS and 32-bit type
 
+MOVIE_CACHE_FILE = ".e2moviecache.pkl"
+MOVIE_CACHE_VERSION = 1
+
 
 class MovieListData:
 	pass
@@ -64,20 +68,193 @@ def lastPlayPosFromCache(ref):
 	return resumePointCache.get(ref.toString(), None)
 
 
+def readLastPosition(cutsFileName):
+	f = open(cutsFileName, 'rb')
+	lastPosition = None
+	while True:
+		data = f.read(cutsParser.size)
+		if len(data) < cutsParser.size:
+			break
+		cut, cutType = cutsParser.unpack(data)
+		if cutType == 3: # undocumented, but 3 appears to be the stop
+			lastPosition = cut
+	f.close()
+	return lastPosition
+
+
+def fileSignature(path):
+	try:
+		st = os.stat(path)
+		return (st.st_mtime, st.st_size)
+	except OSError:
+		return None
+
+
+class MovieDirectoryCache:
+	"""Metadata of the movies in one directory, stored next to them in
+	MOVIE_CACHE_FILE. Entries are keyed by file name and are only valid as
+	long as the movie and its .meta file keep their mtime and size."""
+
+	def __init__(self, path):
+		self.filename = os.path.join(path, MOVIE_CACHE_FILE)
+		self.entries = None
+		self.dirty = False
+
+	def load(self):
+		if self.entries is None:
+			self.entries = {}
+			try:
+				with open(self.filename, "rb") as f:
+					data = pickle.load(f)
+				if data.get("version") == MOVIE_CACHE_VERSION:
+					self.entries = data["entries"]
+			except IOError:
+				pass
+			except Exception as e:
+				print("[MovieList] Failed to load movie cache %s: %s" % (self.filename, e))
+		return self.entries
+
+	def save(self):
+		if self.dirty:
+			self.dirty = False
+			if not self.entries:
+				# an empty directory must stay empty, or it could not be deleted
+				self.remove()
+				return
+			try:
+				with open(self.filename + ".tmp", "wb") as f:
+					pickle.dump({"version": MOVIE_CACHE_VERSION, "entries": self.entries}, f, pickle.HIGHEST_PROTOCOL)
+				os.rename(self.filename + ".tmp", self.filename)
+			except Exception as e:
+				print("[MovieList] Failed to save movie cache %s: %s" % (self.filename, e))
+
+	def remove(self):
+		self.entries = {}
+		self.dirty = False
+		try:
+			os.remove(self.filename)
+		except OSError:
+			pass
+
+	def get(self, path):
+		name = os.path.basename(path)
+		entry = self.load().get(name)
+		if entry is not None and entry["signature"] == (fileSignature(path), fileSignature(path + ".meta")):
+			return entry
+		return None
+
+	def add(self, path, serviceref, info):
+		entry = {
+			"signature": (fileSignature(path), fileSignature(path + ".meta")),
+			"name": info.getName(serviceref),
+			"tags": info.getInfoString(serviceref, iServiceInformation.sTags),
+			"begin": info.getInfo(serviceref, iServiceInformation.sTimeCreate),
+			"description": info.getInfoString(serviceref, iServiceInformation.sDescription),
+			"serviceref": info.getInfoString(serviceref, iServiceInformation.sServiceref),
+			"length": None,
+			"cuts": None
+		}
+		self.load()[os.path.basename(path)] = entry
+		self.dirty = True
+		return entry
+
+	def prune(self, names):
+		entries = self.load()
+		for name in set(entries) - names:
+			del entries[name]
+			self.dirty = True
+
+
+class MovieCache:
+	def __init__(self):
+		self.directories = {}
+
+	def getDirectory(self, path):
+		path = os.path.normpath(path)
+		directory = self.directories.get(path)
+		if directory is None:
+			directory = self.directories[path] = MovieDirectoryCache(path)
+		return directory
+
+	def save(self):
+		for directory in self.directories.values():
+			directory.save()
+
+	def removeDirectory(self, path):
+		"""Delete the cache file of path and forget the directory, before the directory itself is deleted."""
+		path = os.path.normpath(path)
+		directory = self.directories.pop(path, None) or MovieDirectoryCache(path)
+		directory.remove()
+
+	def getLastPosition(self, cutsFileName):
+		"""Return the last play position from cutsFileName, reading the file
+		only when it changed since it was cached. Raises IOError like
+		readLastPosition() when there is no cuts file."""
+		if not config.movielist.use_cache.value:
+			return readLastPosition(cutsFileName)
+		path = cutsFileName[:-5]
+		entry = self.getDirectory(os.path.dirname(path)).load().get(os.path.basename(path))
+		if entry is None:
+			return readLastPosition(cutsFileName)
+		signature = fileSignature(cutsFileName)
+		if signature is None:
+			raise IOError("no cuts file %s" % cutsFileName)
+		if entry["cuts"] is None or entry["cuts"][0] != signature:
+			entry["cuts"] = (signature, readLastPosition(cutsFileName))
+			self.getDirectory(os.path.dirname(path)).dirty = True
+		return entry["cuts"][1]
+
+
+movieCache = MovieCache()
+
+
+class CachedMovieInfo:
+	"""iStaticServiceInformation lookalike answering from a movie cache entry.
+	The real service information is only created for anything not cached."""
+
+	def __init__(self, serviceref, entry, directory):
+		self.serviceref = serviceref
+		self.entry = entry
+		self.directory = directory
+		self.info = None
+
+	def getServiceInformation(self):
+		if self.info is None:
+			self.info = eServiceCenter.getInstance().info(self.serviceref) or justStubInfo
+		return self.info
+
+	def getName(self, serviceref):
+		return self.entry["name"]
+
+	def getLength(self, serviceref):
+		if self.entry["length"] is None:
+			self.entry["length"] = self.getServiceInformation().getLength(serviceref)
+			self.directory.dirty = True
+		return self.entry["length"]
+
+	def getInfo(self, serviceref, w):
+		if w == iServiceInformation.sTimeCreate:
+			return self.entry["begin"]
+		return self.getServiceInformation().getInfo(serviceref, w)
+
+	def getInfoString(self, serviceref, w):
+		if w == iServiceInformation.sTags:
+			return self.entry["tags"]
+		if w == iServiceInformation.sDescription:
+			return self.entry["description"]
+		if w == iServiceInformation.sServiceref:
+			return self.entry["serviceref"]
+		return self.getServiceInformation().getInfoString(serviceref, w)
+
+	def __getattr__(self, name):
+		return getattr(self.getServiceInformation(), name)
+
+
 def moviePlayState(cutsFileName, ref, length):
 	'''Returns None, 0..100 for percentage'''
 	try:
 		# read the cuts file first
-		f = open(cutsFileName, 'rb')
-		lastPosition = None
-		while True:
-			data = f.read(cutsParser.size)
-			if len(data) < cutsParser.size:
-				break
-			cut, cutType = cutsParser.unpack(data)
-			if cutType == 3: # undocumented, but 3 appears to be the stop
-				lastPosition = cut
-		f.close()
+		lastPosition = movieCache.getLastPosition(cutsFileName)
 		# See what we have in RAM (it might help)
 		last = lastPlayPosFromCache(ref)
 		if last:
@@ -597,6 +774,7 @@ class MovieList(GUIComponent):
 		instance.selectionChanged.get().append(self.selectionChanged)
 
 	def preWidgetRemove(self, instance):
+		movieCache.save()
 		instance.setContent(None)
 		instance.selectionChanged.get().remove(self.selectionChanged)
 
@@ -660,6 +838,11 @@ class MovieList(GUIComponent):
 				ref.flags = eServiceReference.flagDirectory
 				self.list.append((ref, None, 0, -1))
 				numberOfDirs += 1
+		if config.movielist.use_cache.value:
+			cache = movieCache.getDirectory(rootPath)
+			names = set()
+		else:
+			cache = None
 		while True:
 			serviceref = reflist.getNext()
 			if not serviceref.valid():
@@ -668,9 +851,17 @@ class MovieList(GUIComponent):
 				from Components.ParentalControl import parentalControl
 				if not parentalControl.sessionPinCached and parentalControl.isProtected(serviceref) and config.ParentalControl.storeservicepin.value != 'never' and config.ParentalControl.hideBlacklist.value:
 					continue
-			info = serviceHandler.info(serviceref)
-			if info is None:
-				info = justStubInfo
+			if cache is not None and not serviceref.flags & eServiceReference.mustDescent:
+				path = serviceref.getPath()
+				names.add(os.path.basename(path))
+				entry = cache.get(path)
+				if entry is None:
+					entry = cache.add(path, serviceref, serviceHandler.info(serviceref) or justStubInfo)
+				info = CachedMovieInfo(serviceref, entry, cache)
+			else:
+				info = serviceHandler.info(serviceref)
+				if info is None:
+					info = justStubInfo
 			begin = info.getInfo(serviceref, iServiceInformation.sTimeCreate)
 			if serviceref.flags & eServiceReference.mustDescent:
 				self.list.append((serviceref, info, begin, -1))
@@ -702,28 +893,12 @@ class MovieList(GUIComponent):
 
 			self.list.append((serviceref, info, begin, -1))
 
+		if cache is not None:
+			cache.prune(names)
+			cache.save()
 		self.firstFileEntry = numberOfDirs
 		self.parentDirectory = 0
-		if self.sort_type == MovieList.SORT_ALPHANUMERIC:
-			self.list.sort(key=self.buildAlphaNumericSortKey)
-		elif self.sort_type == MovieList.SORT_ALPHANUMERIC_FLAT:
-			self.list.sort(key=self.buildAlphaNumericFlatSortKey)
-		elif self.sort_type == MovieList.SORT_ALPHANUMERIC_FLAT_REVERSE:
-			self.list.sort(key=self.buildAlphaNumericFlatSortKey, reverse=True)
-		elif self.sort_type == MovieList.SORT_RECORDED:
-			self.list.sort(key=self.buildBeginTimeSortKey)
-		else:
-			#always sort first this way to avoid shuffle and reverse-sort directories
-			self.list.sort(key=self.buildGroupwiseSortkey)
-			if self.sort_type == MovieList.SHUFFLE:
-				dirlist = self.list[:numberOfDirs]
-				shufflelist = self.list[numberOfDirs:]
-				random.shuffle(shufflelist)
-				self.list = dirlist + shufflelist
-			elif self.sort_type == MovieList.SORT_ALPHANUMERIC_REVERSE:
-				self.list = self.list[:numberOfDirs] + sorted(self.list[numberOfDirs:], key=self.buildAlphaNumericSortKey, reverse=True)
-			elif self.sort_type == MovieList.SORT_RECORDED_REVERSE:
-				self.list = self.list[:numberOfDirs] + sorted(self.list[numberOfDirs:], key=self.buildBeginTimeSortKey, reverse=True)
+		self.sortList()
 
 		if self.root and numberOfDirs > 0:
 			rootPath = os.path.normpath(self.root.getPath())
@@ -787,6 +962,35 @@ class MovieList(GUIComponent):
 		for tag in realtags:
 			self.tags[tag] = set([tag])
 
+	def sortList(self):
+		if self.sort_type == MovieList.SORT_ALPHANUMERIC:
+			self.list.sort(key=self.buildAlphaNumericSortKey)
+		elif self.sort_type == MovieList.SORT_ALPHANUMERIC_FLAT:
+			self.list.sort(key=self.buildAlphaNumericFlatSortKey)
+		elif self.sort_type == MovieList.SORT_ALPHANUMERIC_FLAT_REVERSE:
+			self.list.sort(key=self.buildAlphaNumericFlatSortKey, reverse=True)
+		elif self.sort_type == MovieList.SORT_RECORDED:
+			self.list.sort(key=self.buildBeginTimeSortKey)
+		else:
+			#always sort first this way to avoid shuffle and reverse-sort directories
+			self.list.sort(key=self.buildGroupwiseSortkey)
+			if self.sort_type == MovieList.SHUFFLE:
+				dirlist = self.list[:self.firstFileEntry]
+				shufflelist = self.list[self.firstFileEntry:]
+				random.shuffle(shufflelist)
+				self.list = dirlist + shufflelist
+			elif self.sort_type == MovieList.SORT_ALPHANUMERIC_REVERSE:
+				self.list = self.list[:self.firstFileEntry] + sorted(self.list[self.firstFileEntry:], key=self.buildAlphaNumericSortKey, reverse=True)
+			elif self.sort_type == MovieList.SORT_RECORDED_REVERSE:
+				self.list = self.list[:self.firstFileEntry] + sorted(self.list[self.firstFileEntry:], key=self.buildBeginTimeSortKey, reverse=True)
+
+	def resort(self):
+		# sort the loaded list again, e.g. after a sort type change
+		parent = self.getItem(self.parentDirectory)
+		self.sortList()
+		self.parentDirectory = self.findService(parent) or 0
+		self.l.setList(self.list)
+
 	def buildAlphaNumericSortKey(self, x):
 		# x = ref,info,begin,...
 		ref = x[0]
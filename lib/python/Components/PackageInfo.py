@@ -1,6 +1,7 @@
 import xml.sax
 from Tools.Directories import crawlDirectory, resolveFilename, SCOPE_CONFIG, SCOPE_SKIN, copyfile, copytree
 from Components.Console import Console
+from Components.BouquetIndex import reloadBouquets, reloadServicelist
 from Components.NimManager import nimmanager
 from Components.Opkg import OpkgComponent
 from Components.config import config, configfile
@@ -305,7 +306,7 @@ class PackageInfoHandler:
 	def installNext(self, *args, **kwargs):
 		if self.reloadFavourites:
 			self.reloadFavourites = False
-			db = eDVBDB.getInstance().reloadBouquets()
+			reloadBouquets()
 
 		self.currentIndex += 1
 		attributes = self.installingAttributes
@@ -395,7 +396,7 @@ class PackageInfoHandler:
 	def mergeServices(self, directory, name, merge=False):
 		if os.path.isfile(directory + name):
 			db = eDVBDB.getInstance()
-			db.reloadServicelist()
+			reloadServicelist()
 			db.loadServicelist(directory + name)
 			db.saveServicelist()
 		self.installNext()
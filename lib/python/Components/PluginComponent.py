@@ -1,11 +1,103 @@
 import os
+import pickle
 from bisect import insort
-from Tools.Directories import fileExists, resolveFilename, SCOPE_PLUGINS
+from Tools.Directories import fileExists, resolveFilename, SCOPE_CONFIG, SCOPE_PLUGINS
 from Tools.Import import my_import
-from Tools.Profile import profile
+from Tools.Profile import profile, profiled
 from Plugins.Plugin import PluginDescriptor
 import keymapparser
 
+PLUGIN_CACHE_FILE = "plugins.pkl"
+PLUGIN_CACHE_VERSION = 1
+
+# plugins listed only in these places are not imported before they are used
+LAZY_WHERE = frozenset((
+	PluginDescriptor.WHERE_EXTENSIONSMENU, PluginDescriptor.WHERE_MAINMENU, PluginDescriptor.WHERE_PLUGINMENU,
+	PluginDescriptor.WHERE_MOVIELIST, PluginDescriptor.WHERE_MENU, PluginDescriptor.WHERE_TELETEXT,
+	PluginDescriptor.WHERE_NETWORKSETUP, PluginDescriptor.WHERE_EVENTINFO, PluginDescriptor.WHERE_AUDIOMENU,
+	PluginDescriptor.WHERE_SOFTWAREMANAGER, PluginDescriptor.WHERE_CHANNEL_CONTEXT_MENU))
+
+
+def getPluginStamp(path):
+	# a plugin is imported again when any of its files changed
+	return sorted((entry.name, entry.stat().st_mtime, entry.stat().st_size) for entry in os.scandir(path) if entry.is_file())
+
+
+def getDescriptorInfo(plugin):
+	"""The cacheable part of a descriptor, None if it can not be loaded lazily."""
+	if type(plugin) is not PluginDescriptor or plugin.wakeupfnc or not set(plugin.where) <= LAZY_WHERE:
+		return None
+	if not isinstance(plugin.name, str) or not isinstance(plugin.description, str) or plugin._icon is not None:
+		return None
+	return {"name": plugin.name, "description": plugin.description, "where": plugin.where, "icon": plugin.iconstr,
+		"weight": plugin.weight, "needsRestart": plugin.needsRestart, "internal": plugin.internal}
+
+
+class PluginLoader:
+	"""Imports a cached plugin on first use, once for all its descriptors."""
+
+	def __init__(self, module, path):
+		self.module = module
+		self.path = path
+		self.plugins = None
+
+	def getPlugin(self, index):
+		if self.plugins is None:
+			print("[PluginComponent] Loading plugin %s" % self.module)
+			try:
+				plugins = my_import(self.module).Plugins(path=self.path)
+				self.plugins = plugins if isinstance(plugins, list) else [plugins]
+			except Exception as exc:
+				print("[PluginComponent] Plugin %s failed to load:" % self.module, exc)
+				self.plugins = []
+		return self.plugins[index] if index < len(self.plugins) else None
+
+
+class LazyPluginDescriptor(PluginDescriptor):
+	"""A descriptor from the plugin cache. Name, icon and places are known
+	without importing the plugin, the plugin module is imported when the
+	function is needed."""
+
+	def __init__(self, loader, index, info):
+		self.loader = loader
+		self.index = index
+		self.name = info["name"]
+		self.description = info["description"]
+		self.where = info["where"]
+		self.iconstr = info["icon"]
+		self._icon = None
+		self.weight = info["weight"]
+		self.needsRestart = info["needsRestart"]
+		self.internal = info["internal"]
+		self.path = loader.path
+		self.wakeupfnc = None
+
+	@property
+	def plugin(self):
+		return self.loader.getPlugin(self.index)
+
+	@property
+	def fnc(self):
+		plugin = self.plugin
+		return plugin.fnc if plugin else None
+
+	def __eq__(self, other):
+		# only a descriptor of the same plugin can be equal, others are told apart without importing it
+		if isinstance(other, LazyPluginDescriptor) and self.loader is other.loader:
+			return self.index == other.index
+		if other.path != self.path:
+			return False
+		return PluginDescriptor.__eq__(self, other)
+
+	def __ne__(self, other):
+		return not self == other
+
+	def __getattr__(self, name):
+		# attributes the plugin set on its descriptor
+		if name in ("loader", "index"):
+			raise AttributeError(name)
+		return getattr(self.plugin, name)
+
 
 class PluginComponent:
 	firstRun = True
@@ -38,9 +130,44 @@ class PluginComponent:
 			if x == PluginDescriptor.WHERE_AUTOSTART:
 				plugin(reason=1)
 
+	def loadPluginCache(self):
+		from Components.config import config
+		from Components.Language import language
+		if not config.usage.plugin_cache.value:
+			return {}
+		try:
+			with open(resolveFilename(SCOPE_CONFIG, PLUGIN_CACHE_FILE), "rb") as f:
+				data = pickle.load(f)
+			# names and descriptions are translated when the plugin is imported
+			if data.get("version") == PLUGIN_CACHE_VERSION and data.get("language") == language.getLanguage():
+				return data["plugins"]
+		except FileNotFoundError:
+			pass
+		except Exception as e:
+			print("[PluginComponent] Failed to load plugin cache:", e)
+		return {}
+
+	def savePluginCache(self, entries):
+		from Components.config import config
+		from Components.Language import language
+		filename = resolveFilename(SCOPE_CONFIG, PLUGIN_CACHE_FILE)
+		if not config.usage.plugin_cache.value:
+			if os.path.exists(filename):
+				os.remove(filename)
+			return
+		try:
+			with open(filename + ".tmp", "wb") as f:
+				pickle.dump({"version": PLUGIN_CACHE_VERSION, "language": language.getLanguage(), "plugins": entries}, f, pickle.HIGHEST_PROTOCOL)
+			os.rename(filename + ".tmp", filename)
+		except Exception as e:
+			print("[PluginComponent] Failed to save plugin cache:", e)
+
 	def readPluginList(self, directory):
 		"""enumerates plugins"""
 		new_plugins = []
+		# at startup plugins which did not change are taken from the cache, a reload imports all of them
+		cache = self.loadPluginCache() if self.firstRun else {}
+		entries = {}
 		for c in os.listdir(directory):
 			directory_category = os.path.join(directory, c)
 			if not os.path.isdir(directory_category):
@@ -50,44 +177,11 @@ class PluginComponent:
 					continue
 				path = os.path.join(directory_category, pluginname)
 				if os.path.isdir(path):
-						profile('plugin ' + pluginname)
-						try:
-							plugin = my_import('.'.join(["Plugins", c, pluginname, "plugin"]))
-							plugins = plugin.Plugins(path=path)
-						except Exception as exc:
-							print("Plugin ", c + "/" + pluginname, "failed to load:", exc)
-							# supress errors due to missing plugin.py* files (badly removed plugin)
-							for fn in ('plugin.py', 'plugin.pyc'):
-								if os.path.exists(os.path.join(path, fn)):
-									self.warnings.append((c + "/" + pluginname, str(exc)))
-									from traceback import print_exc
-									print_exc()
-									break
-							else:
-								print("Plugin probably removed, but not cleanly in", path)
-								try:
-									os.rmdir(path)
-								except:
-									pass
-							continue
-
-						# allow single entry not to be a list
-						if not isinstance(plugins, list):
-							plugins = [plugins]
-
-						for p in plugins:
-							if p:
-								p.path = path
-								p.updateIcon(path)
-								new_plugins.append(p)
-
-						keymap = os.path.join(path, "keymap.xml")
-						if fileExists(keymap):
-							try:
-								keymapparser.readKeymap(keymap)
-							except Exception as exc:
-								print("keymap for plugin %s/%s failed to load: " % (c, pluginname), exc)
-								self.warnings.append((c + "/" + pluginname, str(exc)))
+					profile('plugin ' + pluginname)
+					new_plugins.extend(self.readPlugin(c, pluginname, path, cache, entries))
+
+		if entries != cache:
+			self.savePluginCache(entries)
 
 		# build a diff between the old list of plugins and the new one
 		# internally, the "fnc" argument will be compared with __eq__
@@ -117,6 +211,66 @@ class PluginComponent:
 			self.firstRun = False
 			self.installedPluginList = self.pluginList
 
+	@profiled(lambda self, c, pluginname, *args: "plugin %s/%s" % (c, pluginname))
+	def readPlugin(self, c, pluginname, path, cache, entries):
+		module = '.'.join(["Plugins", c, pluginname, "plugin"])
+		try:
+			stamp = getPluginStamp(path)
+		except OSError:
+			stamp = None
+		entry = cache.get(module)
+		if entry and entry["stamp"] == stamp:
+			loader = PluginLoader(module, path)
+			entries[module] = entry
+			self.readPluginKeymap(c, pluginname, path)
+			return [LazyPluginDescriptor(loader, index, info) for index, info in enumerate(entry["descriptors"])]
+		try:
+			plugin = my_import(module)
+			plugins = plugin.Plugins(path=path)
+		except Exception as exc:
+			print("Plugin ", c + "/" + pluginname, "failed to load:", exc)
+			# supress errors due to missing plugin.py* files (badly removed plugin)
+			for fn in ('plugin.py', 'plugin.pyc'):
+				if os.path.exists(os.path.join(path, fn)):
+					self.warnings.append((c + "/" + pluginname, str(exc)))
+					from traceback import print_exc
+					print_exc()
+					break
+			else:
+				print("Plugin probably removed, but not cleanly in", path)
+				try:
+					os.rmdir(path)
+				except:
+					pass
+			return []
+
+		# allow single entry not to be a list
+		if not isinstance(plugins, list):
+			plugins = [plugins]
+
+		new_plugins = []
+		for p in plugins:
+			if p:
+				p.path = path
+				p.updateIcon(path)
+				new_plugins.append(p)
+
+		descriptors = [getDescriptorInfo(p) for p in plugins]
+		if stamp is not None and descriptors and None not in descriptors:
+			entries[module] = {"stamp": stamp, "descriptors": descriptors}
+
+		self.readPluginKeymap(c, pluginname, path)
+		return new_plugins
+
+	def readPluginKeymap(self, category, pluginname, path):
+		keymap = os.path.join(path, "keymap.xml")
+		if fileExists(keymap):
+			try:
+				keymapparser.readKeymap(keymap)
+			except Exception as exc:
+				print("keymap for plugin %s/%s failed to load: " % (category, pluginname), exc)
+				self.warnings.append((category + "/" + pluginname, str(exc)))
+
 	def getPlugins(self, where):
 		"""Get list of plugins in a specific category"""
 		if not isinstance(where, list):
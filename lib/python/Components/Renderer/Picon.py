@@ -3,6 +3,8 @@
 import os
 import re
 import unicodedata
+from collections import OrderedDict
+from time import time
 from Components.Renderer.Renderer import Renderer
 from enigma import ePixmap
 from Tools.Alternatives import GetWithAlternative
@@ -12,11 +14,17 @@ from ServiceReference import ServiceReference
 
 
 class PiconLocator:
+	CACHE_SIZE = 1000  # Number of service references remembered by getPiconName.
+	CHECK_INTERVAL = 10  # Seconds between checks of the picon directories for changes.
+
 	def __init__(self, piconDirectories=['picon']):
 		harddiskmanager.on_partition_list_change.append(self.__onPartitionChange)
 		self.piconDirectories = piconDirectories
 		self.activePiconPath = None
 		self.searchPaths = []
+		self.piconIndex = {}  # path -> (mtime, {name: picon file})
+		self.piconCache = OrderedDict()  # service reference -> picon file
+		self.lastCheck = 0
 		for mp in ('/usr/share/enigma2/', '/'):
 			self.__onMountpointAdded(mp)
 		for part in harddiskmanager.getMountedPartitions():
@@ -31,18 +39,24 @@ class PiconLocator:
 						if fn.endswith('.png') or fn.endswith('.svg'):
 							print("[Picon] adding path:", path)
 							self.searchPaths.append(path)
+							self.piconCache.clear()
 							break
 			except:
 				pass
 
 	def __onMountpointRemoved(self, mountpoint):
 		for piconDirectory in self.piconDirectories:
-			path = os.path.join(mountpoint, self.piconDirectories) + '/'
+			path = os.path.join(mountpoint, piconDirectory) + '/'
 			try:
 				self.searchPaths.remove(path)
 				print("[Picon] removed path:", path)
 			except:
 				pass
+			else:
+				self.piconIndex.pop(path, None)
+				self.piconCache.clear()
+				if self.activePiconPath == path:
+					self.activePiconPath = None
 
 	def __onPartitionChange(self, why, part):
 		if why == 'add':
@@ -50,19 +64,49 @@ class PiconLocator:
 		elif why == 'remove':
 			self.__onMountpointRemoved(part.mountpoint)
 
+	# The picon directories are listed once and all candidate names are
+	# looked up in memory.  A directory is listed again when its mtime
+	# changes, which is checked at most every CHECK_INTERVAL seconds.
+	def getIndex(self, path):
+		index = self.piconIndex.get(path)
+		if index is None:
+			names = {}
+			try:
+				mtime = os.stat(path).st_mtime
+				for fn in os.listdir(path):
+					if fn.endswith('.png'):
+						names[fn[:-4]] = path + fn
+					elif fn.endswith('.svg'):
+						names.setdefault(fn[:-4], path + fn)
+			except OSError:
+				mtime = None
+			index = self.piconIndex[path] = (mtime, names)
+		return index[1]
+
+	def checkIndex(self):
+		now = time()
+		if now - self.lastCheck < self.CHECK_INTERVAL:
+			return
+		self.lastCheck = now
+		for path, (mtime, names) in list(self.piconIndex.items()):
+			try:
+				changed = os.stat(path).st_mtime != mtime
+			except OSError:
+				changed = mtime is not None
+			if changed:
+				print("[Picon] picon directory changed:", path)
+				del self.piconIndex[path]
+				self.piconCache.clear()
+
 	def findPicon(self, serviceName):
 		if self.activePiconPath is not None:
-			for ext in ('.png', '.svg'):
-				pngname = self.activePiconPath + serviceName + ext
-				if pathExists(pngname):
-					return pngname
+			return self.getIndex(self.activePiconPath).get(serviceName, "")
 		else:
 			for path in self.searchPaths:
-				for ext in ('.png', '.svg'):
-					pngname = path + serviceName + ext
-					if pathExists(pngname):
-						self.activePiconPath = path
-						return pngname
+				pngname = self.getIndex(path).get(serviceName)
+				if pngname:
+					self.activePiconPath = path
+					return pngname
 		return ""
 
 	def addSearchPath(self, value):
@@ -71,8 +115,21 @@ class PiconLocator:
 				value += '/'
 			if not value.startswith('/media/net') and not value.startswith('/media/autofs') and value not in self.searchPaths:
 				self.searchPaths.append(value)
+				self.piconCache.clear()
 
 	def getPiconName(self, serviceName):
+		self.checkIndex()
+		pngname = self.piconCache.get(serviceName)
+		if pngname is None:
+			pngname = self.findPiconName(serviceName)
+			if len(self.piconCache) >= self.CACHE_SIZE:
+				self.piconCache.popitem(last=False)
+			self.piconCache[serviceName] = pngname
+		else:
+			self.piconCache.move_to_end(serviceName)
+		return pngname
+
+	def findPiconName(self, serviceName):
 		#remove the path and name fields, and replace ':' by '_'
 		fields = GetWithAlternative(serviceName).split(':', 10)[:10]
 		if not fields or len(fields) < 10:
@@ -9,9 +9,11 @@ from Tools.Directories import resolveFilename, SCOPE_CURRENT_SKIN
 
 from Components.Renderer.Picon import getPiconName
 from Components.config import config
+from Components.BouquetIndex import bouquetIndex
 
 
 def refreshServiceList(configElement=None):
+	bouquetIndex.invalidate()
 	from Screens.InfoBar import InfoBar
 	InfoBarInstance = InfoBar.instance
 	if InfoBarInstance is not None:
@@ -1,5 +1,5 @@
+from Components.Converter.Poll import pollScheduler
 from Components.Element import cached
-from enigma import eTimer
 from time import time as getTime
 
 from Components.Sources.Source import Source
@@ -8,9 +8,7 @@ from Components.Sources.Source import Source
 class Clock(Source):
 	def __init__(self):
 		Source.__init__(self)
-		self.clock_timer = eTimer()
-		self.clock_timer.callback.append(self.poll)
-		self.clock_timer.start(1000)
+		pollScheduler.add(self, 1000, self.poll)
 
 	@cached
 	def getClock(self):
@@ -23,11 +21,11 @@ class Clock(Source):
 
 	def doSuspend(self, suspended):
 		if suspended:
-			self.clock_timer.stop()
+			pollScheduler.suspend(self)
 		else:
-			self.clock_timer.start(1000)
+			pollScheduler.suspend(self, False)
 			self.poll()
 
 	def destroy(self):
-		self.clock_timer.callback.remove(self.poll)
+		pollScheduler.remove(self)
 		Source.destroy(self)
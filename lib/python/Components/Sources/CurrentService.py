@@ -6,6 +6,8 @@ import NavigationInstance
 
 
 class CurrentService(PerServiceBase, Source):
+	BATCH_CHANGES = True  # a zap sends several events at once, the converters are updated once for them
+
 	def __init__(self, navcore):
 		Source.__init__(self)
 		PerServiceBase.__init__(self, navcore,
@@ -1,5 +1,5 @@
+from Components.Converter.Poll import pollScheduler
 from Components.Sources.Source import Source
-from enigma import eTimer
 
 
 class FrontendStatus(Source):
@@ -9,9 +9,7 @@ class FrontendStatus(Source):
 		self.service_source = service_source
 		self.frontend_source = frontend_source
 		self.invalidate()
-		self.poll_timer = eTimer()
-		self.poll_timer.callback.append(self.updateFrontendStatus)
-		self.poll_timer.start(update_interval, True)
+		pollScheduler.add(self, update_interval, self.updateFrontendStatus)
 
 	def invalidate(self):
 		self.snr = self.agc = self.ber = self.lock = self.snr_db = None
@@ -27,7 +25,6 @@ class FrontendStatus(Source):
 			self.ber = status.get("tuner_bit_error_rate")
 			self.lock = status.get("tuner_locked")
 		self.changed((self.CHANGED_ALL, ))
-		self.poll_timer.start(self.update_interval, True)
 
 	def getFrontendStatus(self):
 		if self.frontend_source:
@@ -45,10 +42,11 @@ class FrontendStatus(Source):
 
 	def doSuspend(self, suspended):
 		if suspended:
-			self.poll_timer.stop()
+			pollScheduler.suspend(self)
 		else:
 			self.updateFrontendStatus()
+			pollScheduler.suspend(self, False)
 
 	def destroy(self):
-		self.poll_timer.callback.remove(self.updateFrontendStatus)
+		pollScheduler.remove(self)
 		Source.destroy(self)
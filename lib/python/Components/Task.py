@@ -1,15 +1,19 @@
 # A Job consists of many "Tasks".
 # A task is the run of an external tool, with proper methods for failure handling
 
+import os
+
 from Tools.CList import CList
 
 
 class Job:
 	NOT_STARTED, IN_PROGRESS, FINISHED, FAILED = range(4)
 
-	def __init__(self, name):
+	def __init__(self, name, resources=None):
 		self.tasks = []
 		self.resident_tasks = []
+		# jobs sharing a resource never run at the same time, a job without resources runs alone
+		self.resources = set(resources or ())
 		self.workspace = "/tmp"
 		self.current_task = 0
 		self.callback = None
@@ -353,14 +357,38 @@ class ConditionTask(Task):
 # It also supports a notification when some error occurred, and possibly a retry.
 
 
+# resource tags for jobs
+RESOURCE_CPU = "cpu"
+RESOURCE_NETWORK = "network"
+
+
+def getDeviceResource(path):
+	"""Returns the resource tag of the disk holding path, "device:sda" for
+	/media/hdd on /dev/sda1. Device nodes are accepted as well."""
+	while path and not os.path.exists(path):
+		path = os.path.dirname(path)
+	try:
+		st = os.stat(path or "/")
+	except OSError:
+		return "device:unknown"
+	dev = st.st_rdev if st.st_rdev else st.st_dev
+	sysfs = os.path.realpath("/sys/dev/block/%d:%d" % (os.major(dev), os.minor(dev)))
+	if os.path.exists(os.path.join(sysfs, "partition")):
+		sysfs = os.path.dirname(sysfs)
+	if os.path.exists(sysfs):
+		return "device:" + os.path.basename(sysfs)
+	return "device:%d:%d" % (os.major(dev), os.minor(dev))
+
+
 class JobManager:
 	def __init__(self):
-		self.active_jobs = []
+		self.active_jobs = [] # waiting jobs
+		self.running_jobs = []
 		self.failed_jobs = []
 		self.job_classes = []
 		self.in_background = False
 		self.visible = False
-		self.active_job = None
+		self.max_jobs = 1 # config.usage.concurrent_jobs
 
 	# Set onSuccess to popupTaskView to get a visible notification.
 	# onFail defaults to notifyFailed which tells the user that it went south.
@@ -373,17 +401,46 @@ class JobManager:
 		self.active_jobs.append(job)
 		self.kick()
 
+	def getActiveJob(self):
+		return self.running_jobs and self.running_jobs[0] or None
+
+	active_job = property(getActiveJob)
+
+	def setMaxJobs(self, max_jobs):
+		self.max_jobs = max_jobs
+		self.kick()
+
+	def getStartableJob(self):
+		# waiting jobs start in order, a job may pass an earlier one only
+		# when it shares no resource with it or with any running job.
+		if len(self.running_jobs) >= self.max_jobs:
+			return None
+		busy = set()
+		for job in self.running_jobs:
+			if not job.resources:
+				return None
+			busy |= job.resources
+		for job in self.active_jobs:
+			if not job.resources:
+				return None if self.running_jobs else job
+			if not busy & job.resources:
+				return job
+			busy |= job.resources
+		return None
+
 	def kick(self):
-		if self.active_job is None:
-			if self.active_jobs:
-				self.active_job = self.active_jobs.pop(0)
-				self.active_job.start(self.jobDone)
+		job = self.getStartableJob()
+		while job is not None:
+			self.active_jobs.remove(job)
+			self.running_jobs.append(job)
+			job.start(self.jobDone)
+			job = self.getStartableJob()
 
 	def notifyFailed(self, job, task, problems):
 		from Tools.Notifications import AddNotification, AddNotificationWithCallback
 		from Screens.MessageBox import MessageBox
 		if problems[0].RECOVERABLE:
-			AddNotificationWithCallback(self.errorCB, MessageBox, _("Error: %s\nRetry?") % (problems[0].getErrorMessage(task)))
+			AddNotificationWithCallback(lambda answer: self.errorCB(answer, job), MessageBox, _("Error: %s\nRetry?") % (problems[0].getErrorMessage(task)))
 			return True
 		else:
 			AddNotification(MessageBox, job.name + "\n" + _("Error") + (': %s') % (problems[0].getErrorMessage(task)), type=MessageBox.TYPE_ERROR)
@@ -393,9 +450,10 @@ class JobManager:
 		print("job", job, "completed with", problems, "in", task)
 		if problems:
 			if not job.onFail(job, task, problems):
-				self.errorCB(False)
+				self.errorCB(False, job)
 		else:
-			self.active_job = None
+			if job in self.running_jobs:
+				self.running_jobs.remove(job)
 			if job.onSuccess:
 				job.onSuccess(job)
 			self.kick()
@@ -408,22 +466,21 @@ class JobManager:
 			self.visible = True
 			AddNotification(JobView, job)
 
-	def errorCB(self, answer):
+	def errorCB(self, answer, job=None):
+		if job is None:
+			job = self.active_job
 		if answer:
 			print("retrying job")
-			self.active_job.retry()
+			job.retry()
 		else:
 			print("not retrying job.")
-			self.failed_jobs.append(self.active_job)
-			self.active_job = None
+			self.failed_jobs.append(job)
+			if job in self.running_jobs:
+				self.running_jobs.remove(job)
 			self.kick()
 
 	def getPendingJobs(self):
-		list = []
-		if self.active_job:
-			list.append(self.active_job)
-		list += self.active_jobs
-		return list
+		return self.running_jobs + self.active_jobs
 
 # some examples:
 #class PartitionExistsPostcondition:
@@ -996,6 +996,13 @@ def InitUsageConfig():
 			hdd[1].setIdleTime(int(configElement.value))
 	config.usage.hdd_standby.addNotifier(setHDDStandby, immediate_feedback=False)
 
+	def setConcurrentJobs(configElement):
+		from Components.Task import job_manager
+		job_manager.setMaxJobs(int(configElement.value))
+	config.usage.concurrent_jobs = ConfigSelection(default="2", choices=[(str(x), str(x)) for x in range(1, 5)])
+	config.usage.concurrent_jobs.addNotifier(setConcurrentJobs, immediate_feedback=False)
+	config.usage.plugin_cache = ConfigYesNo(default=True)
+
 	if SystemInfo["12V_Output"]:
 		def set12VOutput(configElement):
 			Misc_Options.getInstance().set_12V_output(configElement.value == "on" and 1 or 0)
@@ -96,6 +96,8 @@ def NoSave(element):
 #            or invalid.
 #
 class ConfigElement(object):
+	_saved_value = None
+
 	def __init__(self):
 		self.saved_value = None
 		self.save_forced = False
@@ -126,6 +128,18 @@ class ConfigElement(object):
 
 	notifiers_final = property(getNotifiersFinal, setNotifiersFinal)
 
+	# every change of the stored text marks the config tree dirty,
+	# so configfile.save() can skip writing when nothing has changed.
+	def getSavedValue(self):
+		return self._saved_value
+
+	def setSavedValue(self, value):
+		if value != self._saved_value:
+			self._saved_value = value
+			config.setDirty()
+
+	saved_value = property(getSavedValue, setSavedValue)
+
 	# you need to override this to do input validation
 	def setValue(self, value):
 		self._value = value
@@ -1771,6 +1785,8 @@ class ConfigSubList(list):
 	def __init__(self):
 		list.__init__(self)
 		self.stored_values = {}
+		self.root = None
+		self.path = None
 
 	def save(self):
 		for x in self:
@@ -1802,6 +1818,8 @@ class ConfigSubList(list):
 		if i in self.stored_values:
 			item.saved_value = self.stored_values[i]
 			item.load()
+		if self.root is not None:
+			self.root.addPath("%s.%s" % (self.path, i), item)
 
 	def dict(self):
 		return dict([(str(index), value) for index, value in enumerate(self)])
@@ -1816,6 +1834,8 @@ class ConfigSubDict(dict):
 	def __init__(self):
 		dict.__init__(self)
 		self.stored_values = {}
+		self.root = None
+		self.path = None
 
 	def save(self):
 		for x in self.values():
@@ -1842,10 +1862,16 @@ class ConfigSubDict(dict):
 	saved_value = property(getSavedValue, setSavedValue)
 
 	def __setitem__(self, key, item):
+		old = self.get(key)
 		dict.__setitem__(self, key, item)
 		if str(key) in self.stored_values:
 			item.saved_value = self.stored_values[str(key)]
 			item.load()
+		if self.root is not None:
+			path = "%s.%s" % (self.path, key)
+			if old is not None and old is not item:
+				self.root.removePath(path, old)
+			self.root.addPath(path, item)
 
 	def dict(self):
 		return self
@@ -1868,18 +1894,26 @@ class ConfigSubsection:
 		self.__dict__["content"] = ConfigSubsectionContent()
 		self.content.items = {}
 		self.content.stored_values = {}
+		self.content.root = None
+		self.content.path = None
 
 	def __setattr__(self, name, value):
 		if name == "saved_value":
 			return self.setSavedValue(value)
 		assert isinstance(value, (ConfigSubsection, ConfigElement, ConfigSubList, ConfigSubDict)), "ConfigSubsections can only store ConfigSubsections, ConfigSubLists, ConfigSubDicts or ConfigElements"
 		content = self.content
+		old = content.items.get(name)
 		content.items[name] = value
 		x = content.stored_values.get(name, None)
 		if x is not None:
 			# print "ok, now we have a new item,", name, "and have the following value for it:", x
 			value.saved_value = x
 			value.load()
+		if content.root is not None:
+			path = "%s.%s" % (content.path, name)
+			if old is not None and old is not value:
+				content.root.removePath(path, old)
+			content.root.addPath(path, value)
 
 	def __getattr__(self, name):
 		if name in self.content.items:
@@ -1924,11 +1958,54 @@ class ConfigSubsection:
 # a new config entry is added to a subsection
 # also, non-existing config entries will be saved, so they won't be
 # lost when a config entry disappears.
+#
+# the root also keeps an index of every entry attached below it by its
+# dotted path, as written to the config file ("config.Nims.0.configMode"),
+# so entries can be looked up without eval() or walking the tree.
 
 
 class Config(ConfigSubsection):
 	def __init__(self):
 		ConfigSubsection.__init__(self)
+		self.__dict__["dirty"] = False
+		self.__dict__["index"] = {}
+		self.content.root = self
+		self.content.path = "config"
+
+	def setDirty(self, dirty=True):
+		self.__dict__["dirty"] = dirty
+
+	def addPath(self, path, value):
+		self.index[path] = value
+		if isinstance(value, ConfigSubsection):
+			value.content.root = self
+			value.content.path = path
+			items = value.content.items.items()
+		elif isinstance(value, (ConfigSubList, ConfigSubDict)):
+			value.root = self
+			value.path = path
+			items = value.dict().items()
+		else:
+			return
+		for (key, item) in items:
+			self.addPath("%s.%s" % (path, key), item)
+
+	def removePath(self, path, value):
+		if self.index.get(path) is value:
+			del self.index[path]
+		if isinstance(value, ConfigSubsection):
+			value.content.root = None
+			items = value.content.items.items()
+		elif isinstance(value, (ConfigSubList, ConfigSubDict)):
+			value.root = None
+			items = value.dict().items()
+		else:
+			return
+		for (key, item) in items:
+			self.removePath("%s.%s" % (path, key), item)
+
+	def lookup(self, path):
+		return self.index.get(path)
 
 	def pickle_this(self, prefix, topickle, result):
 		for (key, val) in sorted(topickle.items(), key=lambda x: int(x[0]) if x[0].isdigit() else x[0].lower()):
@@ -1945,6 +2022,23 @@ class Config(ConfigSubsection):
 		self.pickle_this("config", self.saved_value, result)
 		return ''.join(result)
 
+	# same as pickle, but returns an unsorted {"config.x.y": value} dict,
+	# which is used to find the entries changed since the last save.
+	def flatten_this(self, prefix, toflatten, result):
+		for (key, val) in toflatten.items():
+			name = '.'.join((prefix, key))
+			if isinstance(val, dict):
+				self.flatten_this(name, val, result)
+			elif isinstance(val, tuple):
+				result[name] = val[0]
+			else:
+				result[name] = val
+
+	def flatten(self):
+		result = {}
+		self.flatten_this("config", self.saved_value, result)
+		return result
+
 	def unpickle(self, lines, base_file=True):
 		tree = {}
 		configbase = tree.setdefault("config", {})
@@ -1952,6 +2046,17 @@ class Config(ConfigSubsection):
 			if not l or l[0] == '#':
 				continue
 
+			if l[0] == '-':  # journal entry for a value reverted to its default
+				names = l[1:].strip().split('.')
+				base = configbase
+				for n in names[1:-1]:
+					base = base.get(n)
+					if not isinstance(base, dict):
+						break
+				else:
+					base.pop(names[-1], None)
+				continue
+
 			result = l.split('=', 1)
 			if len(result) != 2:
 				continue
@@ -1968,12 +2073,9 @@ class Config(ConfigSubsection):
 
 			if not base_file:  # not the initial config file..
 				# update config.x.y.value when exist
-				try:
-					configEntry = eval(name)
-					if configEntry is not None:
-						configEntry.value = val
-				except (SyntaxError, KeyError):
-					pass
+				configEntry = self.index.get(name)
+				if isinstance(configEntry, ConfigElement):
+					configEntry.value = val
 
 		# we inherit from ConfigSubsection, so ...
 		# object.__setattr__(self, "saved_value", tree["config"])
@@ -1992,6 +2094,8 @@ class Config(ConfigSubsection):
 			os.rename(filename + ".writing", filename)
 		except IOError:
 			print("Config: Couldn't write %s" % filename)
+			return False
+		return True
 
 	def loadFromFile(self, filename, base_file=True):
 		self.unpickle(open(filename, "r", encoding="UTF-8"), base_file)
@@ -1999,33 +2103,89 @@ class Config(ConfigSubsection):
 
 class ConfigFile:
 	CONFIG_FILE = resolveFilename(SCOPE_CONFIG, "settings")
+	JOURNAL_FILE = CONFIG_FILE + ".journal"
+	JOURNAL_LIMIT = 500  # compact the journal into the settings file after this many lines
+
+	def __init__(self):
+		self.saved = None
+		self.journal_lines = 0
 
 	def load(self):
+		lines = []
 		try:
-			config.loadFromFile(self.CONFIG_FILE, True)
+			with open(self.CONFIG_FILE, "r", encoding="UTF-8") as f:
+				lines = f.readlines()
 		except IOError as e:
 			print("unable to load config (%s), assuming defaults..." % str(e))
-
-	def save(self):
+		journal = []
+		if os.path.exists(self.JOURNAL_FILE):
+			try:
+				with open(self.JOURNAL_FILE, "r", encoding="UTF-8") as f:
+					journal = f.readlines()
+			except IOError as e:
+				print("unable to load config journal (%s)" % str(e))
+			if journal and not journal[-1].endswith("\n"):  # interrupted append
+				del journal[-1]
+		self.journal_lines = len(journal)
+		config.unpickle(lines + journal, True)
+		self.saved = config.flatten()
+		config.setDirty(False)
+
+	# In journal mode only the entries changed since the last save are
+	# appended to settings.journal, the full settings file is rewritten
+	# when the journal grows too large or when compact is requested
+	# (on shutdown).
+	def save(self, compact=False):
 		# config.save()
-		config.saveToFile(self.CONFIG_FILE)
-
-	def __resolveValue(self, pickles, cmap):
-		key = pickles[0]
-		if key in cmap:
-			if len(pickles) > 1:
-				return self.__resolveValue(pickles[1:], cmap[key].dict())
-			else:
-				return str(cmap[key].value)
-		return None
+		if not config.misc.settingsjournal.value:
+			self.compact()
+			return
+		saved = self.saved
+		if saved is not None and not config.dirty and not compact:
+			return
+		current = config.flatten()
+		if saved is None:  # nothing to compare with since the last save without journal
+			self.compact(current)
+			return
+		changes = ["%s=%s\n" % (key, val) for (key, val) in current.items() if saved.get(key) != val]
+		changes += ["-%s\n" % key for key in saved if key not in current]
+		if compact and (changes or self.journal_lines) or self.journal_lines + len(changes) > self.JOURNAL_LIMIT:
+			self.compact(current)
+			return
+		if changes:
+			try:
+				f = open(self.JOURNAL_FILE, "a", encoding="UTF-8")
+				f.write(''.join(changes))
+				f.flush()
+				os.fsync(f.fileno())
+				f.close()
+				self.journal_lines += len(changes)
+			except IOError:
+				print("Config: Couldn't write %s" % self.JOURNAL_FILE)
+				self.compact(current)
+				return
+		self.saved = current
+		config.setDirty(False)
+
+	# current is the config.flatten() of the values written, which the next
+	# journal save compares with. Without it the journal starts with a
+	# compact again, so saves without journal never flatten the tree.
+	def compact(self, current=None):
+		if not config.saveToFile(self.CONFIG_FILE):
+			return
+		if self.journal_lines or os.path.exists(self.JOURNAL_FILE):
+			try:
+				os.remove(self.JOURNAL_FILE)
+			except OSError:
+				pass
+		self.journal_lines = 0
+		self.saved = current
+		config.setDirty(False)
 
 	def getResolvedKey(self, key):
-		names = key.split('.')
-		if len(names) > 1:
-			if names[0] == "config":
-				ret = self.__resolveValue(names[1:], config.content.items)
-				if ret and len(ret) or ret == "":
-					return ret
+		configEntry = config.lookup(key)
+		if isinstance(configEntry, ConfigElement):
+			return str(configEntry.value)
 		print("getResolvedKey", key, "failed !! (Typo??)")
 		return ""
 
@@ -2034,6 +2194,7 @@ config = Config()
 config.misc = ConfigSubsection()
 configfile = ConfigFile()
 configfile.load()
+config.misc.settingsjournal = ConfigYesNo(default=False)
 
 # def _(x):
 # 	return x
@@ -157,7 +157,7 @@ class DVDToolbox(Screen):
 
 class DVDformatJob(Job):
 	def __init__(self, toolbox):
-		Job.__init__(self, _("DVD media toolbox"))
+		Job.__init__(self, _("DVD media toolbox"), resources=("device:" + harddiskmanager.getCD(),))
 		self.toolbox = toolbox
 		DVDformatTask(self)
 
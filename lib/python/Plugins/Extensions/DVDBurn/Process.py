@@ -1,4 +1,4 @@
-from Components.Task import Task, Job, DiskspacePrecondition, Condition, ToolExistsPrecondition
+from Components.Task import Task, Job, DiskspacePrecondition, Condition, ToolExistsPrecondition, getDeviceResource, RESOURCE_CPU
 from Components.Harddisk import harddiskmanager
 from Screens.MessageBox import MessageBox
 import os
@@ -906,6 +906,7 @@ class DVDJob(Job):
 		createDir(new_workspace, True)
 		self.workspace = new_workspace
 		self.project.workspace = self.workspace
+		self.resources = set(("device:" + harddiskmanager.getCD(), getDeviceResource(self.workspace), RESOURCE_CPU))
 		self.menupreview = menupreview
 		self.conduct()
 
@@ -969,6 +970,7 @@ class DVDdataJob(Job):
 		createDir(new_workspace, True)
 		self.workspace = new_workspace
 		self.project.workspace = self.workspace
+		self.resources = set(("device:" + harddiskmanager.getCD(), getDeviceResource(self.workspace)))
 		self.conduct()
 
 	def conduct(self):
@@ -1008,7 +1010,7 @@ class DVDdataJob(Job):
 
 class DVDisoJob(Job):
 	def __init__(self, project, imagepath):
-		Job.__init__(self, _("Burn DVD"))
+		Job.__init__(self, _("Burn DVD"), resources=("device:" + harddiskmanager.getCD(), getDeviceResource(imagepath)))
 		self.project = project
 		self.menupreview = False
 		from Tools.Directories import getSize
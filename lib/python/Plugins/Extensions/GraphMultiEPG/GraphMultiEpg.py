@@ -37,6 +37,9 @@ from Plugins.Plugin import PluginDescriptor
 from Tools.BoundFunction import boundFunction
 
 MAX_TIMELINES = 6
+PREFETCH_PAGES = 1 # time pages before and after the shown one read ahead from the epg cache
+PREFETCH_SERVICES = 25 # services read per main loop iteration while prefetching
+MAX_CACHED_ROWS = 600
 
 config.misc.graph_mepg = ConfigSubsection()
 config.misc.graph_mepg.prev_time = ConfigClock(default=time())
@@ -93,6 +96,17 @@ class EPGList(GUIComponent):
 		self.setOverjump_Empty(overjump_empty)
 		self.epg_bouquet = epg_bouquet
 		self.epgcache = eEPGCache.getInstance()
+		self.services = [] # (service reference string, ServiceReference)
+		self.events = {} # service reference string -> [begin, end, service, service name, events], the events known from begin to end
+		self.events_minute = None
+		self.picons = {} # service -> picon pixmap
+		self.rows = {} # (service, time base, epoch, selection, events) -> built entry
+		self.rows_layout = None
+		self.rows_timers = None
+		self.rows_minute = None
+		self.prefetch_jobs = []
+		self.prefetchTimer = eTimer()
+		self.prefetchTimer.callback.append(self.prefetch)
 
 		main_icons = (
 			"epgclock",
@@ -285,6 +299,7 @@ class EPGList(GUIComponent):
 
 	def setCurrentlyPlaying(self, serviceref):
 		self.currentlyPlaying = serviceref
+		self.rows.clear()
 
 	def getEventFromId(self, service, eventid):
 		event = None
@@ -413,6 +428,8 @@ class EPGList(GUIComponent):
 		self.l.setSelectionClip(eRect(0, 0, 0, 0), False)
 
 	def preWidgetRemove(self, instance):
+		self.prefetchTimer.stop()
+		self.prefetch_jobs = []
 		instance.selectionChanged.get().remove(self.serviceChanged)
 		instance.setContent(None)
 
@@ -433,6 +450,10 @@ class EPGList(GUIComponent):
 		if piconWidth > w - 2 * self.serviceBorderVerWidth:
 			piconWidth = w - 2 * self.serviceBorderVerWidth
 		self.picon_size = eSize(piconWidth, piconHeight)
+		layout = (w, width, height, piconWidth, piconHeight, self.showPicon, self.showServiceTitle, self.number_width, config.misc.graph_mepg.event_alignment.value, config.misc.graph_mepg.servicename_alignment.value, config.misc.graph_mepg.show_record_clocks.value)
+		if layout != self.rows_layout:
+			self.rows_layout = layout
+			self.rows.clear()
 
 	def calcEntryPosAndWidthHelper(self, stime, duration, start, end, width):
 		xpos = (stime - start) * width // (end - start)
@@ -450,9 +471,33 @@ class EPGList(GUIComponent):
 		return xpos + event_rect.left(), width
 
 	def buildEntry(self, service, service_name, events, picon, serviceref):
+		# rows are built again only when something they show has changed. the
+		# shading of running events and the timer marks are kept for a minute
+		# at most, or until a timer is added, changed or removed
+		timers = self.timer and self.timer.getTimerIndex()
+		minute = int(time()) // 60
+		if timers is not self.rows_timers or minute != self.rows_minute:
+			self.rows_timers = timers
+			self.rows_minute = minute
+			self.rows.clear()
+		selected = self.cur_service[0] == service
+		key = (service, self.getTimeBase(), self.time_epoch, self.select_rect.x if selected else None, events and tuple(events))
+		res = self.rows.get(key)
+		if res is None:
+			if len(self.rows) >= MAX_CACHED_ROWS:
+				del self.rows[next(iter(self.rows))]
+			res = self.rows[key] = self.buildRow(service, service_name, events, serviceref, selected)
+		return res
+
+	def getPicon(self, service):
+		if service not in self.picons:
+			picon = getPiconName(service)
+			self.picons[service] = LoadPixmap(picon) if picon else None
+		return self.picons[service]
+
+	def buildRow(self, service, service_name, events, serviceref, selected):
 		r1 = self.service_rect
 		r2 = self.event_rect
-		selected = self.cur_service[0] == service
 
 		# Picon and Service name
 		if CompareWithAlternatives(service, self.currentlyPlaying and self.currentlyPlaying.toString()):
@@ -492,14 +537,9 @@ class EPGList(GUIComponent):
 				color=serviceForeColor, color_sel=serviceForeColor,
 				backcolor=serviceBackColor if bgpng is None else None, backcolor_sel=serviceBackColor if bgpng is None else None))
 		if self.showPicon:
-			if picon is None: # go find picon and cache its location
-				picon = getPiconName(service)
-				curIdx = self.l.getCurrentSelectionIndex()
-				self.list[curIdx] = (service, service_name, events, picon, serviceref)
 			piconWidth = self.picon_size.width()
 			piconHeight = self.picon_size.height()
-			if picon != "":
-				displayPicon = LoadPixmap(picon)
+			displayPicon = self.getPicon(service)
 			if displayPicon is not None:
 				res.append(MultiContentEntryPixmapAlphaBlend(
 					pos=(r1.x + self.serviceBorderVerWidth + self.number_width, r1.y + self.serviceBorderHorWidth),
@@ -677,48 +717,92 @@ class EPGList(GUIComponent):
 		self.selectionChanged()
 		return False
 
-	def fillMultiEPG(self, services, stime=None):
+	def fillMultiEPG(self, services, stime=None, refresh=False):
+		# the known events are read again each minute, as the epg cache gets
+		# new events while the screen is open, and on refresh
 		if stime is not None:
 			self.time_base = int(stime)
-		if services is None:
-			time_base = self.time_base + self.offs * self.time_epoch * 60
-			test = [(service[0], 0, time_base, self.time_epoch) for service in self.list]
-			serviceList = self.list
-			piconIdx = 3
-			channelIdx = 4
-		else:
+		if services is not None:
 			self.cur_event = None
 			self.cur_service = None
-			test = [(service.ref.toString(), 0, self.time_base, self.time_epoch) for service in services]
-			serviceList = services
-			piconIdx = 0
-			channelIdx = None
+			self.services = [(service.ref.toString(), service) for service in services]
+		minute = int(time()) // 60
+		if services is not None or refresh or minute != self.events_minute:
+			self.events_minute = minute
+			self.events = {}
+		begin = self.getTimeBase()
+		end = begin + self.time_epoch * 60
+		self.lookupEvents([ref for ref, serviceref in self.services if not self.isCached(ref, begin, end)], begin, end)
+		self.list = []
+		for ref, serviceref in self.services:
+			entry = self.events[ref]
+			self.list.append((entry[2], entry[3], self.getEvents(ref, begin, end), None, serviceref))
+		self.l.setList(self.list)
+		self.findBestEvent()
+		self.startPrefetch()
 
+	def isCached(self, ref, begin, end):
+		# a window without events is looked up again, its events may have arrived since
+		entry = self.events.get(ref)
+		return entry is not None and entry[0] <= begin and end <= entry[1] and any(event[2] < end and event[2] + event[3] > begin for event in entry[4])
+
+	def getEvents(self, ref, begin, end):
+		return [event for event in self.events[ref][4] if event[2] < end and event[2] + event[3] > begin] or None
+
+	def lookupEvents(self, refs, begin, end):
+		# the events of refs from begin to end are added to the ones known
+		# already, a window which does not touch the known one replaces it
+		if not refs:
+			return
+		test = [(ref, 0, begin, (end - begin) // 60) for ref in refs]
 		test.insert(0, 'XRnITBD') #return record, service ref, service name, event id, event title, begin time, duration
 		epg_data = [] if self.epgcache is None else self.epgcache.lookupEvent(test)
-		self.list = []
-		tmp_list = None
-		service = ""
-		sname = ""
-
-		serviceIdx = 0
+		results = []
+		service = None
 		for x in epg_data:
 			if service != x[0]:
-				if tmp_list is not None:
-					picon = None if piconIdx == 0 else serviceList[serviceIdx][piconIdx]
-					self.list.append((service, sname, tmp_list[0][0] is not None and tmp_list or None, picon, serviceList[serviceIdx] if (channelIdx is None) else serviceList[serviceIdx][channelIdx]))
-					serviceIdx += 1
 				service = x[0]
-				sname = x[1]
-				tmp_list = []
-			tmp_list.append((x[2], x[3], x[4], x[5])) #(event_id, event_title, begin_time, duration)
-		if tmp_list and len(tmp_list):
-			picon = None if piconIdx == 0 else serviceList[serviceIdx][piconIdx]
-			self.list.append((service, sname, tmp_list[0][0] is not None and tmp_list or None, picon, serviceList[serviceIdx] if (channelIdx is None) else serviceList[serviceIdx][channelIdx]))
-			serviceIdx += 1
-
-		self.l.setList(self.list)
-		self.findBestEvent()
+				results.append((service, x[1], []))
+			if x[2] is not None:
+				results[-1][2].append((x[2], x[3], x[4], x[5])) #(event_id, event_title, begin_time, duration)
+		for index, ref in enumerate(refs):
+			service, sname, events = results[index] if index < len(results) else (ref, "", [])
+			first, last = begin, end
+			entry = self.events.get(ref)
+			if entry is not None and entry[0] <= end and begin <= entry[1]:
+				known = set((event[0], event[2]) for event in entry[4])
+				events = entry[4] + [event for event in events if (event[0], event[2]) not in known]
+				events.sort(key=lambda event: event[2])
+				first, last = min(begin, entry[0]), max(end, entry[1])
+			self.events[ref] = [first, last, service, sname, events]
+
+	def startPrefetch(self):
+		# read the neighbouring time pages in the background, in small steps
+		# so keys are still handled in between. the services around the
+		# selection come first, they are shown first when paging
+		self.prefetch_jobs = []
+		if not self.services or self.epgcache is None:
+			return
+		index = self.l.getCurrentSelectionIndex() if self.instance else 0
+		refs = [ref for distance, ref in sorted((abs(x - index), self.services[x][0]) for x in range(len(self.services)))]
+		length = self.time_epoch * 60
+		for page in range(1, PREFETCH_PAGES + 1):
+			for offs in (page, -page):
+				if self.offs + offs < 0:
+					continue
+				begin = self.getTimeBase() + offs * length
+				missing = [ref for ref in refs if not self.isCached(ref, begin, begin + length)]
+				for x in range(0, len(missing), PREFETCH_SERVICES):
+					self.prefetch_jobs.append((missing[x:x + PREFETCH_SERVICES], begin, begin + length))
+		if self.prefetch_jobs:
+			self.prefetchTimer.start(0, True)
+
+	def prefetch(self):
+		if self.prefetch_jobs:
+			refs, begin, end = self.prefetch_jobs.pop(0)
+			self.lookupEvents([ref for ref in refs if not self.isCached(ref, begin, end)], begin, end)
+		if self.prefetch_jobs:
+			self.prefetchTimer.start(0, True)
 
 	def getEventRect(self):
 		rc = self.event_rect
@@ -1074,7 +1158,7 @@ class GraphMultiEPG(Screen, HelpableScreen):
 				self.ask_time = self.ask_time - self.ask_time % int(config.misc.graph_mepg.roundTo.getValue())
 				l = self["list"]
 				l.resetOffset()
-				l.fillMultiEPG(None, self.ask_time)
+				l.fillMultiEPG(None, self.ask_time, refresh=True)
 				self.moveTimeLines(True)
 				self.time_mode = self.TIME_CHANGE
 				self["key_blue"].setText(_("Now"))
@@ -1096,7 +1180,7 @@ class GraphMultiEPG(Screen, HelpableScreen):
 			l = self["list"]
 			self.ask_time = date - date % int(config.misc.graph_mepg.roundTo.getValue())
 			l.resetOffset()
-			l.fillMultiEPG(None, self.ask_time)
+			l.fillMultiEPG(None, self.ask_time, refresh=True)
 			self.moveTimeLines(True)
 
 	def setEvent(self, serviceref, eventid):
@@ -1105,7 +1189,7 @@ class GraphMultiEPG(Screen, HelpableScreen):
 		event = l.getEventFromId(serviceref, eventid)
 		self.ask_time = event.getBeginTime()
 		l.resetOffset()
-		l.fillMultiEPG(None, self.ask_time)
+		l.fillMultiEPG(None, self.ask_time, refresh=True)
 		self.moveTimeLines(True)
 
 	def showSetup(self):
@@ -1132,7 +1216,7 @@ class GraphMultiEPG(Screen, HelpableScreen):
 		now = time() - config.epg.histminutes.getValue() * 60
 		self.ask_time = now - now % int(config.misc.graph_mepg.roundTo.getValue())
 		self["timeline_text"].setDateFormat(config.misc.graph_mepg.servicetitle_mode.value)
-		l.fillMultiEPG(None, self.ask_time)
+		l.fillMultiEPG(None, self.ask_time, refresh=True)
 		self.moveTimeLines(True)
 		self.time_mode = self.TIME_NOW
 		self["key_blue"].setText(_("Prime time"))
@@ -4,6 +4,7 @@ from Screens.ScanSetup import ScanSetup
 from Screens.ServiceScan import ServiceScan
 from Screens.MessageBox import MessageBox
 from Tools.Directories import resolveFilename, SCOPE_CONFIG, copyfile
+from Components.BouquetIndex import reloadServicelist
 from os import unlink
 from enigma import eTimer, eDVBDB
 
@@ -39,8 +40,7 @@ class DefaultServiceScan(ServiceScan):
 			unlink(resolveFilename(SCOPE_CONFIG) + "/lamedb")
 		except OSError:
 			pass
-		db = eDVBDB.getInstance()
-		db.reloadServicelist()
+		reloadServicelist()
 		ServiceScan.__init__(self, session, scanList)
 		self.timer = eTimer()
 		self.timer.callback.append(self.ok)
@@ -119,7 +119,7 @@ class DefaultServicesScannerPlugin(ScanSetup):
 			print("no more sats to scan")
 			confdir = resolveFilename(SCOPE_CONFIG)
 			copyfile(confdir + "/lamedb.backup", confdir + "/lamedb")
-			db.reloadServicelist()
+			reloadServicelist()
 			self.close()
 		else:
 			self.selectSat(self.scanIndex)
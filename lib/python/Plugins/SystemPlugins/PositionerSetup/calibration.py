@@ -0,0 +1,330 @@
+from enigma import eTimer
+
+from operator import mul as mul
+from random import SystemRandom as SystemRandom
+
+
+class CalibrationError(Exception):
+	pass
+
+
+class CalibrationFrontend:
+	"""What the calibration needs of the rotor and the tuner. PositionerSetup
+	drives the real dish with it, a simulated signal can be used as well."""
+
+	def gotoX(self, satlon):
+		"""Turn the dish to satlon (degrees east) with USALS, returns the rotor step position."""
+		raise NotImplementedError
+
+	def step(self, steps):
+		"""Turn the dish by a number of steps, east when positive."""
+		raise NotImplementedError
+
+	def getSettleTime(self, degrees):
+		"""Seconds to wait after turning the dish by degrees."""
+		raise NotImplementedError
+
+	def measure(self, time, callback):
+		"""Measure for time seconds, then call callback(signal quality in percent, lock ratio)."""
+		raise NotImplementedError
+
+	def stop(self):
+		"""Stop the dish and a running measurement."""
+		raise NotImplementedError
+
+	def statusMsg(self, msg, blinking=False, timeout=0):
+		pass
+
+	def log(self, msg):
+		pass
+
+
+class Calibration:
+	"""Rotor calibration run from timer callbacks instead of a thread.
+
+	The search and optimise steps are generators which yield what they
+	want done: turning the dish or measuring the signal. The engine does it
+	and resumes them with the result once the dish has settled or the
+	measurement is complete, so the main loop keeps running in between.
+	A calibration can be paused, resumed and cancelled at every step."""
+
+	IDLE, MOVING, SETTLING, MEASURING, PAUSED, DONE, FAILED, CANCELLED = range(8)
+
+	MAX_SEARCH_ANGLE = 12.0				# degrees
+	MAX_FOCUS_ANGLE = 6.0				# degrees
+	LOCK_LIMIT = 0.1					# ratio
+	MEASURING_TIME = 2.500				# seconds
+	SYNC_TIME = 0.500					# seconds
+
+	def __init__(self, frontend, tuningstepsize, random=None):
+		self.frontend = frontend
+		self.tuningstepsize = tuningstepsize
+		self.random = random or SystemRandom().random
+		self.state = self.IDLE
+		self.steps = None
+		self.result = None
+		self.paused = False
+		self.pending = None
+		self.progress = 0
+		self.onProgress = []  # callback(text, percentage)
+		self.onFinished = []  # callback(state, result or error message)
+		self.timer = eTimer()
+		self.timer.callback.append(self.next)
+
+	def isRunning(self):
+		return self.state in (self.MOVING, self.SETTLING, self.MEASURING, self.PAUSED)
+
+	def start(self, steps):
+		self.steps = steps
+		self.advance(None)
+
+	def pause(self):
+		if self.isRunning():
+			self.paused = True
+
+	def resume(self):
+		if self.paused:
+			self.paused = False
+			if self.pending is not None:
+				value, self.pending = self.pending[0], None
+				self.advance(value)
+
+	def cancel(self):
+		if self.isRunning():
+			self.timer.stop()
+			self.steps.close()
+			self.frontend.stop()
+			self.finish(self.CANCELLED, _("Calibration cancelled"))
+
+	def advance(self, value):
+		# run the steps up to the next move or measurement
+		if self.paused:
+			self.pending = (value,)
+			self.state = self.PAUSED
+			return
+		try:
+			action = self.steps.send(value)
+		except StopIteration as e:
+			self.finish(self.DONE, e.value)
+			return
+		except CalibrationError as e:
+			self.finish(self.FAILED, str(e))
+			return
+		if action[0] == "measure":
+			self.state = self.MEASURING
+			self.frontend.measure(action[1], self.measured)
+		elif action[0] == "goto":
+			self.state = self.MOVING
+			self.settle(action[2], self.frontend.gotoX(action[1]))
+		elif action[0] == "step":
+			self.state = self.MOVING
+			if action[1]:
+				self.frontend.step(action[1])
+			self.settle(abs(action[1]) * self.tuningstepsize if action[1] else None, None)
+
+	def settle(self, degrees, result):
+		self.state = self.SETTLING
+		self.result = result
+		self.timer.start(int(self.frontend.getSettleTime(degrees) * 1000) if degrees is not None else 0, True)
+
+	def measured(self, snr, lock):
+		if self.state == self.MEASURING:
+			self.result = (snr, lock)
+			self.timer.start(0, True)  # continue from the main loop, not from within the frontend
+
+	def next(self):
+		self.advance(self.result)
+
+	def finish(self, state, result):
+		self.state = state
+		self.steps = None
+		for x in self.onFinished:
+			x(state, result)
+
+	def setProgress(self, text, percentage, blinking=True):
+		self.progress = percentage
+		self.frontend.statusMsg(text, blinking=blinking)
+		for x in self.onProgress:
+			x(text, percentage)
+
+	def logMsg(self, msg, timeout=0):
+		self.frontend.statusMsg(msg, timeout=timeout)
+		self.frontend.log(msg)
+
+	def randomBool(self):
+		return self.random() >= 0.5
+
+	@staticmethod
+	def toGeopos(x):
+		if x < 0:
+			return _("W")
+		else:
+			return _("E")
+
+	@staticmethod
+	def toGeoposEx(x):
+		if x < 0:
+			return _("west")
+		else:
+			return _("east")
+
+	def sync(self):
+		lock_count = 0.0
+		n = 0
+		while lock_count < (1 - self.LOCK_LIMIT) and n < 5:
+			snr_percentage, lock_count = yield ("measure", self.SYNC_TIME)
+			n += 1
+		return lock_count >= (1 - self.LOCK_LIMIT)
+
+	def gotoXcalibration(self, satlon):
+		"""Find the satellite around satlon (degrees east) and the offset of the USALS positions."""
+		log = self.frontend.log
+		toGeoposEx = self.toGeoposEx
+		self.prev_pos = 0.0					# previous relative position w.r.t. satlon
+
+		def move(x):
+			z = yield ("goto", x + satlon, abs(x - self.prev_pos))
+			self.prev_pos = x
+			return z
+
+		def reportlevels(pos, level, lock):
+			log((_("Signal quality") + " %5.1f" + chr(176) + "   : %6.2f") % (pos, level))
+			log((_("Lock ratio") + "     %5.1f" + chr(176) + "   : %6.2f") % (pos, lock))
+
+		def optimise(readings):
+			xi = [*readings]
+			yi = list(map(lambda x: x[0], readings.values()))
+			x0 = sum(map(mul, xi, yi)) / sum(yi)
+			xm = xi[yi.index(max(yi))]
+			return (x0, xm)
+
+		def focus(start_pos, dir, progress):
+			x = 0.0
+			while abs(x) < self.MAX_FOCUS_ANGLE:
+				x += self.tuningstepsize * dir				# one step east/west
+				self.setProgress((_("Moving") + " " + toGeoposEx(dir) + " %5.1f" + chr(176)) % abs(x + start_pos), progress + int(30 * abs(x) / self.MAX_FOCUS_ANGLE))
+				yield from move(x + start_pos)
+				snr_percentage, lock_count = yield ("measure", self.MEASURING_TIME)
+				measurements[x + start_pos] = (snr_percentage, lock_count)
+				reportlevels(x + start_pos, snr_percentage, lock_count)
+				if lock_count < self.LOCK_LIMIT:
+					break
+			else:
+				raise CalibrationError(_("Cannot determine") + " " + toGeoposEx(dir) + " " + _("limit ..., aborting !"))
+
+		self.logMsg(_("GotoX calibration"))
+		x = 0.0								# relative position w.r.t. satlon
+		dir = 1
+		if self.randomBool():
+			dir = -dir
+		searched = 0
+		while abs(x) < self.MAX_SEARCH_ANGLE:
+			if (yield from self.sync()):
+				break
+			x += (1.0 * dir)						# one degree east/west
+			searched += 1
+			self.setProgress((_("Searching") + " " + toGeoposEx(dir) + " %2d" + chr(176)) % abs(x), int(30 * searched / (2 * self.MAX_SEARCH_ANGLE)))
+			yield from move(x)
+		else:
+			x = 0.0
+			dir = -dir
+			while abs(x) < self.MAX_SEARCH_ANGLE:
+				x += (1.0 * dir)					# one degree east/west
+				searched += 1
+				self.setProgress((_("Searching") + " " + toGeoposEx(dir) + " %2d" + chr(176)) % abs(x), int(30 * searched / (2 * self.MAX_SEARCH_ANGLE)))
+				yield from move(x)
+				if (yield from self.sync()):
+					break
+			else:
+				raise CalibrationError(_("Cannot find any signal ..., aborting !"))
+		x = round(x / self.tuningstepsize) * self.tuningstepsize
+		yield from move(x)
+		measurements = {}
+		snr_percentage, lock_count = yield ("measure", self.MEASURING_TIME)
+		log((_("Initial signal quality") + " %5.1f" + chr(176) + ": %6.2f") % (x, snr_percentage))
+		log((_("Initial lock ratio") + "     %5.1f" + chr(176) + ": %6.2f") % (x, lock_count))
+		measurements[x] = (snr_percentage, lock_count)
+
+		start_pos = x
+		dir = 1
+		if self.randomBool():
+			dir = -dir
+		yield from focus(start_pos, dir, 30)
+		dir = -dir
+		self.setProgress((_("Moving") + " " + toGeoposEx(dir) + " %5.1f" + chr(176)) % abs(start_pos), 60)
+		yield from move(start_pos)
+		if not (yield from self.sync()):
+			raise CalibrationError(_("Sync failure moving back to origin !"))
+		yield from focus(start_pos, dir, 60)
+		(x0, xm) = optimise(measurements)
+		x = yield from move(x0)
+		if satlon > 180:
+			satlon -= 360
+		x0 += satlon
+		xm += satlon
+		log((_("Weighted position") + "     : %5.1f" + chr(176) + " %s") % (abs(x0), self.toGeopos(x0)))
+		log((_("Strongest position") + "    : %5.1f" + chr(176) + " %s") % (abs(xm), self.toGeopos(xm)))
+		self.progress = 100
+		self.logMsg((_("Final position at") + " %5.1f" + chr(176) + " %s / %d; " + _("offset is") + " %4.1f" + chr(176)) % (abs(x0), self.toGeopos(x0), x, x0 - satlon), timeout=10)
+		return (x0, xm)
+
+	def autofocus(self):
+		"""Find the best position around the current one, in rotor steps."""
+		log = self.frontend.log
+		toGeoposEx = self.toGeoposEx
+
+		def reportlevels(pos, level, lock):
+			log((_("Signal quality") + " [%2d]   : %6.2f") % (pos, level))
+			log((_("Lock ratio") + " [%2d]       : %6.2f") % (pos, lock))
+
+		def optimise(readings):
+			xi = [*readings]
+			yi = list(map(lambda x: x[0], readings.values()))
+			x0 = int(round(sum(map(mul, xi, yi)) / sum(yi)))
+			xm = xi[yi.index(max(yi))]
+			return (x0, xm)
+
+		def focus(dir, progress):
+			x = 0
+			nsteps = 0
+			while nsteps < maxsteps:
+				x += dir
+				self.setProgress((_("Moving") + " " + toGeoposEx(dir) + " %2d") % abs(x), progress + int(45 * nsteps / maxsteps))
+				yield ("step", dir)			# one step
+				snr_percentage, lock_count = yield ("measure", self.MEASURING_TIME)
+				measurements[x] = (snr_percentage, lock_count)
+				reportlevels(x, snr_percentage, lock_count)
+				if lock_count < self.LOCK_LIMIT:
+					break
+				nsteps += 1
+			else:
+				raise CalibrationError(_("Cannot determine") + " " + toGeoposEx(dir) + " " + _("limit ..., aborting !"))
+			return x
+
+		self.logMsg(_("Auto focus commencing..."))
+		measurements = {}
+		maxsteps = max(min(round(self.MAX_FOCUS_ANGLE / self.tuningstepsize), 0x1F), 3)
+		snr_percentage, lock_count = yield ("measure", self.MEASURING_TIME)
+		log((_("Initial signal quality:") + " %6.2f") % snr_percentage)
+		log((_("Initial lock ratio") + "    : %6.2f") % lock_count)
+		if lock_count < 1 - self.LOCK_LIMIT:
+			raise CalibrationError(_("There is no signal to lock on !"))
+		log(_("Signal OK, proceeding"))
+		dir = 1
+		if self.randomBool():
+			dir = -dir
+		measurements[0] = (snr_percentage, lock_count)
+		x = yield from focus(dir, 0)
+		dir = -dir
+		self.setProgress(_("Moving") + " " + toGeoposEx(dir) + "  0", 45)
+		yield ("step", -x)
+		if not (yield from self.sync()):
+			raise CalibrationError(_("Sync failure moving back to origin !"))
+		x = yield from focus(dir, 50)
+		(x0, xm) = optimise(measurements)
+		log((_("Weighted position") + "     : %2d") % x0)
+		log((_("Strongest position") + "    : %2d") % xm)
+		self.logMsg((_("Final position at index") + " %2d (%5.1f" + chr(176) + ")") % (x0, x0 * self.tuningstepsize), timeout=6)
+		self.progress = 100
+		yield ("step", x0 - x)
+		return (x0, xm)
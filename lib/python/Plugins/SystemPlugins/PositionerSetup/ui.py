@@ -21,12 +21,9 @@ from Tools.Transponder import ConvertToHumanReadable
 from skin import parameters
 
 from time import sleep
-from operator import mul as mul
-from random import SystemRandom as SystemRandom
-from threading import Thread as Thread
-from threading import Event as Event
 
 from . import log
+from .calibration import Calibration, CalibrationFrontend
 from . import rotor_calc
 
 
@@ -268,12 +265,15 @@ class PositionerSetup(Screen):
 		self.rotorStatusTimer.callback.append(self.startStatusTimer)
 		self.collectingStatistics = False
 		self.statusTimer.start(self.FIRST_UPDATE_INTERVAL, True)
-		self.dataAvailable = Event()
+		self.calibration = None
+		self.measureCallback = None
 		self.onClose.append(self.__onClose)
 		self.createConfig()
 		self.createSetup()
 
 	def __onClose(self):
+		if self.isCalibrating():
+			self.calibration.cancel()
 		self.statusTimer.stop()
 		log.close()
 		if self.frontend:
@@ -318,6 +318,9 @@ class PositionerSetup(Screen):
 		self.close(None)
 
 	def keyCancel(self):
+		if self.isCalibrating():
+			self.calibration.cancel()
+			return
 		if self.oldref is not None:
 			if self.oldref_stop:
 				self.session.openWithCallback(self.restartPrevService, MessageBox, _("Zap back to service before positioner setup?"), MessageBox.TYPE_YESNO)
@@ -617,7 +620,7 @@ class PositionerSetup(Screen):
 			self.printMsg(_("Auto focus"))
 			print((_("Site latitude") + "      : %5.1f %s") % PositionerSetup.latitude2orbital(self.sitelat), file=log)
 			print((_("Site longitude") + "     : %5.1f %s") % PositionerSetup.longitude2orbital(self.sitelon), file=log)
-			Thread(target=self.autofocus).start()
+			self.startCalibration("autofocus")
 		elif entry == "move":
 			if self.isMoving:
 				self.stopMoving()
@@ -713,7 +716,7 @@ class PositionerSetup(Screen):
 			self.printMsg(_("USALS calibration"))
 			print((_("Site latitude") + "      : %5.1f %s") % PositionerSetup.latitude2orbital(self.sitelat), file=log)
 			print((_("Site longitude") + "     : %5.1f %s") % PositionerSetup.longitude2orbital(self.sitelon), file=log)
-			Thread(target=self.gotoXcalibration).start()
+			self.startCalibration("gotoX")
 
 	def blueKey(self):
 		if self.frontend is None:
@@ -912,7 +915,9 @@ class PositionerSetup(Screen):
 					count = float(self.stat_count)
 					self.lock_count /= count
 					self.snr_percentage *= 100.0 / 0x10000 / count
-					self.dataAvailable.set()
+					callback, self.measureCallback = self.measureCallback, None
+					if callback:
+						callback(self.snr_percentage, self.lock_count)
 
 	def tuningChangedTo(self, tp):
 
@@ -1000,270 +1005,87 @@ class PositionerSetup(Screen):
 		return max(turningspeed, 0.1)
 
 	TURNING_START_STOP_DELAY = 1.600	# seconds
-	MAX_SEARCH_ANGLE = 12.0				# degrees
-	MAX_FOCUS_ANGLE = 6.0				# degrees
-	LOCK_LIMIT = 0.1					# ratio
-	MEASURING_TIME = 2.500				# seconds
 
-	def measure(self, time=MEASURING_TIME):	# time in seconds
+	def getSettleTime(self, degrees):
+		return int(degrees / self.getTurningspeed() + 2 * self.TURNING_START_STOP_DELAY) * self.MAX_LOW_RATE_ADAPTER_COUNT
+
+	def measure(self, time, callback):	# time in seconds
 		self.snr_percentage = 0.0
 		self.lock_count = 0.0
 		self.stat_count = 0
 		self.low_rate_adapter_count = 0
 		self.max_count = max(int((time * 1000 + self.UPDATE_INTERVAL / 2) / self.UPDATE_INTERVAL), 1)
+		self.measureCallback = callback
 		self.collectingStatistics = True
-		self.dataAvailable.clear()
-		self.dataAvailable.wait()
 
 	def logMsg(self, msg, timeout=0):
 		self.statusMsg(msg, timeout=timeout)
 		self.printMsg(msg)
 
-	def sync(self):
-		self.lock_count = 0.0
-		n = 0
-		while self.lock_count < (1 - self.LOCK_LIMIT) and n < 5:
-			self.measure(time=0.500)
-			n += 1
-		if self.lock_count < (1 - self.LOCK_LIMIT):
-			return False
-		return True
-
-	randomGenerator = None
-
-	def randomBool(self):
-		if self.randomGenerator is None:
-			self.randomGenerator = SystemRandom()
-		return self.randomGenerator.random() >= 0.5
-
-	def gotoXcalibration(self):
-
-		def move(x):
-			z = self.gotoX(x + satlon)
-			time = int(abs(x - prev_pos) / turningspeed + 2 * self.TURNING_START_STOP_DELAY)
-			sleep(time * self.MAX_LOW_RATE_ADAPTER_COUNT)
-			return z
-
-		def reportlevels(pos, level, lock):
-			print((_("Signal quality") + " %5.1f" + chr(176) + "   : %6.2f") % (pos, level), file=log)
-			print((_("Lock ratio") + "     %5.1f" + chr(176) + "   : %6.2f") % (pos, lock), file=log)
-
-		def optimise(readings):
-			xi = [*readings]
-			yi = list(map(lambda x: x[0], readings.values()))
-			x0 = sum(map(mul, xi, yi)) / sum(yi)
-			xm = xi[yi.index(max(yi))]
-			return (x0, xm)
-
-		def toGeopos(x):
-			if x < 0:
-				return _("W")
-			else:
-				return _("E")
+	def isCalibrating(self):
+		return self.calibration is not None and self.calibration.isRunning()
 
-		def toGeoposEx(x):
-			if x < 0:
-				return _("west")
-			else:
-				return _("east")
-
-		self.logMsg(_("GotoX calibration"))
-		satlon = self.orbitalposition.float
-		print((_("Satellite longitude:") + " %5.1f" + chr(176) + " %s") % (satlon, self.orientation.value), file=log)
-		satlon = PositionerSetup.orbital2metric(satlon, self.orientation.value)
-		prev_pos = 0.0						# previous relative position w.r.t. satlon
-		turningspeed = self.getTurningspeed()
-
-		x = 0.0								# relative position w.r.t. satlon
-		dir = 1
-		if self.randomBool():
-			dir = -dir
-		while abs(x) < self.MAX_SEARCH_ANGLE:
-			if self.sync():
-				break
-			x += (1.0 * dir)						# one degree east/west
-			self.statusMsg((_("Searching") + " " + toGeoposEx(dir) + " %2d" + chr(176)) % abs(x), blinking=True)
-			move(x)
-			prev_pos = x
-		else:
-			x = 0.0
-			dir = -dir
-			while abs(x) < self.MAX_SEARCH_ANGLE:
-				x += (1.0 * dir)					# one degree east/west
-				self.statusMsg((_("Searching") + " " + toGeoposEx(dir) + " %2d" + chr(176)) % abs(x), blinking=True)
-				move(x)
-				prev_pos = x
-				if self.sync():
-					break
-			else:
-				msg = _("Cannot find any signal ..., aborting !")
-				self.printMsg(msg)
-				self.statusMsg("")
-				self.session.open(MessageBox, msg, MessageBox.TYPE_ERROR, timeout=5)
-				return
-		x = round(x / self.tuningstepsize) * self.tuningstepsize
-		move(x)
-		prev_pos = x
-		measurements = {}
-		self.measure()
-		print((_("Initial signal quality") + " %5.1f" + chr(176) + ": %6.2f") % (x, self.snr_percentage), file=log)
-		print((_("Initial lock ratio") + "     %5.1f" + chr(176) + ": %6.2f") % (x, self.lock_count), file=log)
-		measurements[x] = (self.snr_percentage, self.lock_count)
-
-		start_pos = x
-		x = 0.0
-		dir = 1
-		if self.randomBool():
-			dir = -dir
-		while x < self.MAX_FOCUS_ANGLE:
-			x += self.tuningstepsize * dir					# one step east/west
-			self.statusMsg((_("Moving") + " " + toGeoposEx(dir) + " %5.1f" + chr(176)) % abs(x + start_pos), blinking=True)
-			move(x + start_pos)
-			prev_pos = x + start_pos
-			self.measure()
-			measurements[x + start_pos] = (self.snr_percentage, self.lock_count)
-			reportlevels(x + start_pos, self.snr_percentage, self.lock_count)
-			if self.lock_count < self.LOCK_LIMIT:
-				break
-		else:
-			msg = _("Cannot determine") + " " + toGeoposEx(dir) + " " + _("limit ..., aborting !")
-			self.printMsg(msg)
-			self.statusMsg("")
-			self.session.open(MessageBox, msg, MessageBox.TYPE_ERROR, timeout=5)
-			return
-		x = 0.0
-		dir = -dir
-		self.statusMsg((_("Moving") + " " + toGeoposEx(dir) + " %5.1f" + chr(176)) % abs(start_pos), blinking=True)
-		move(start_pos)
-		prev_pos = start_pos
-		if not self.sync():
-			msg = _("Sync failure moving back to origin !")
-			self.printMsg(msg)
-			self.statusMsg("")
-			self.session.open(MessageBox, msg, MessageBox.TYPE_ERROR, timeout=5)
-			return
-		while abs(x) < self.MAX_FOCUS_ANGLE:
-			x += self.tuningstepsize * dir					# one step west/east
-			self.statusMsg((_("Moving") + " " + toGeoposEx(dir) + " %5.1f" + chr(176)) % abs(x + start_pos), blinking=True)
-			move(x + start_pos)
-			prev_pos = x + start_pos
-			self.measure()
-			measurements[x + start_pos] = (self.snr_percentage, self.lock_count)
-			reportlevels(x + start_pos, self.snr_percentage, self.lock_count)
-			if self.lock_count < self.LOCK_LIMIT:
-				break
-		else:
-			msg = _("Cannot determine") + " " + toGeoposEx(dir) + " " + _("limit ..., aborting !")
-			self.printMsg(msg)
-			self.statusMsg("")
-			self.session.open(MessageBox, msg, MessageBox.TYPE_ERROR, timeout=5)
-			return
-		(x0, xm) = optimise(measurements)
-		x = move(x0)
-		if satlon > 180:
-			satlon -= 360
-		x0 += satlon
-		xm += satlon
-		print((_("Weighted position") + "     : %5.1f" + chr(176) + " %s") % (abs(x0), toGeopos(x0)), file=log)
-		print((_("Strongest position") + "    : %5.1f" + chr(176) + " %s") % (abs(xm), toGeopos(xm)), file=log)
-		self.logMsg((_("Final position at") + " %5.1f" + chr(176) + " %s / %d; " + _("offset is") + " %4.1f" + chr(176)) % (abs(x0), toGeopos(x0), x, x0 - satlon), timeout=10)
-
-	def autofocus(self):
-
-		def move(x):
-			if x > 0:
-				self.diseqccommand("moveEast", (-x) & 0xFF)
-			elif x < 0:
-				self.diseqccommand("moveWest", x & 0xFF)
-			if x != 0:
-				time = int(abs(x) * self.tuningstepsize / turningspeed + 2 * self.TURNING_START_STOP_DELAY)
-				sleep(time * self.MAX_LOW_RATE_ADAPTER_COUNT)
-
-		def reportlevels(pos, level, lock):
-			print((_("Signal quality") + " [%2d]   : %6.2f") % (pos, level), file=log)
-			print((_("Lock ratio") + " [%2d]       : %6.2f") % (pos, lock), file=log)
-
-		def optimise(readings):
-			xi = [*readings]
-			yi = list(map(lambda x: x[0], readings.values()))
-			x0 = int(round(sum(map(mul, xi, yi)) / sum(yi)))
-			xm = xi[yi.index(max(yi))]
-			return (x0, xm)
-
-		def toGeoposEx(x):
-			if x < 0:
-				return _("west")
-			else:
-				return _("east")
-
-		self.logMsg(_("Auto focus commencing..."))
-		turningspeed = self.getTurningspeed()
-		measurements = {}
-		maxsteps = max(min(round(self.MAX_FOCUS_ANGLE / self.tuningstepsize), 0x1F), 3)
-		self.measure()
-		print((_("Initial signal quality:") + " %6.2f") % self.snr_percentage, file=log)
-		print((_("Initial lock ratio") + "    : %6.2f") % self.lock_count, file=log)
-		if self.lock_count < 1 - self.LOCK_LIMIT:
-			msg = _("There is no signal to lock on !")
-			self.printMsg(msg)
-			self.statusMsg("")
-			self.session.open(MessageBox, msg, MessageBox.TYPE_ERROR, timeout=5)
-			return
-		print(_("Signal OK, proceeding"), file=log)
-		x = 0
-		dir = 1
-		if self.randomBool():
-			dir = -dir
-		measurements[x] = (self.snr_percentage, self.lock_count)
-		nsteps = 0
-		while nsteps < maxsteps:
-			x += dir
-			self.statusMsg((_("Moving") + " " + toGeoposEx(dir) + " %2d") % abs(x), blinking=True)
-			move(dir) 		# one step
-			self.measure()
-			measurements[x] = (self.snr_percentage, self.lock_count)
-			reportlevels(x, self.snr_percentage, self.lock_count)
-			if self.lock_count < self.LOCK_LIMIT:
-				break
-			nsteps += 1
-		else:
-			msg = _("Cannot determine") + " " + toGeoposEx(dir) + " " + _("limit ..., aborting !")
-			self.printMsg(msg)
-			self.statusMsg("")
-			self.session.open(MessageBox, msg, MessageBox.TYPE_ERROR, timeout=5)
-			return
-		dir = -dir
-		self.statusMsg(_("Moving") + " " + toGeoposEx(dir) + "  0", blinking=True)
-		move(-x)
-		if not self.sync():
-			msg = _("Sync failure moving back to origin !")
-			self.printMsg(msg)
-			self.statusMsg("")
-			self.session.open(MessageBox, msg, MessageBox.TYPE_ERROR, timeout=5)
+	def startCalibration(self, kind):
+		if self.isCalibrating():
+			if self.calibration.kind == kind:
+				if self.calibration.paused:
+					self.calibration.resume()
+					self.printMsg(_("Calibration resumed"))
+				else:
+					self.calibration.pause()
+					self.statusMsg(_("Calibration paused"))
 			return
-		x = 0
-		nsteps = 0
-		while nsteps < maxsteps:
-			x += dir
-			self.statusMsg((_("Moving") + " " + toGeoposEx(dir) + " %2d") % abs(x), blinking=True)
-			move(dir) 		# one step
-			self.measure()
-			measurements[x] = (self.snr_percentage, self.lock_count)
-			reportlevels(x, self.snr_percentage, self.lock_count)
-			if self.lock_count < self.LOCK_LIMIT:
-				break
-			nsteps += 1
+		self.calibration = Calibration(PositionerFrontend(self), self.tuningstepsize)
+		self.calibration.kind = kind
+		self.calibration.onFinished.append(self.calibrationFinished)
+		if kind == "autofocus":
+			self.calibration.start(self.calibration.autofocus())
 		else:
-			msg = _("Cannot determine") + " " + toGeoposEx(dir) + " " + _("limit ..., aborting !")
-			self.printMsg(msg)
+			satlon = self.orbitalposition.float
+			print((_("Satellite longitude:") + " %5.1f" + chr(176) + " %s") % (satlon, self.orientation.value), file=log)
+			self.calibration.start(self.calibration.gotoXcalibration(PositionerSetup.orbital2metric(satlon, self.orientation.value)))
+
+	def calibrationFinished(self, state, result):
+		if state == Calibration.FAILED:
+			self.printMsg(result)
 			self.statusMsg("")
-			self.session.open(MessageBox, msg, MessageBox.TYPE_ERROR, timeout=5)
-			return
-		(x0, xm) = optimise(measurements)
-		print((_("Weighted position") + "     : %2d") % x0, file=log)
-		print((_("Strongest position") + "    : %2d") % xm, file=log)
-		self.logMsg((_("Final position at index") + " %2d (%5.1f" + chr(176) + ")") % (x0, x0 * self.tuningstepsize), timeout=6)
-		move(x0 - x)
+			self.session.open(MessageBox, result, MessageBox.TYPE_ERROR, timeout=5)
+		elif state == Calibration.CANCELLED:
+			self.printMsg(result)
+			self.statusMsg(result, timeout=self.STATUS_MSG_TIMEOUT)
+
+
+class PositionerFrontend(CalibrationFrontend):
+	"""Calibrates with the dish and the tuner of the positioner setup."""
+
+	def __init__(self, screen):
+		self.screen = screen
+
+	def gotoX(self, satlon):
+		return self.screen.gotoX(satlon)
+
+	def step(self, steps):
+		if steps > 0:
+			self.screen.diseqccommand("moveEast", (-steps) & 0xFF)
+		elif steps < 0:
+			self.screen.diseqccommand("moveWest", steps & 0xFF)
+
+	def getSettleTime(self, degrees):
+		return self.screen.getSettleTime(degrees)
+
+	def measure(self, time, callback):
+		self.screen.measure(time, callback)
+
+	def stop(self):
+		self.screen.collectingStatistics = False
+		self.screen.measureCallback = None
+		self.screen.diseqccommand("stop")
+
+	def statusMsg(self, msg, blinking=False, timeout=0):
+		self.screen.statusMsg(msg, blinking=blinking, timeout=timeout)
+
+	def log(self, msg):
+		print(msg, file=log)
 
 
 class Diseqc:
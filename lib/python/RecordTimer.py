@@ -1,5 +1,5 @@
 import os
-from enigma import eEPGCache, getBestPlayableServiceReference, eStreamServer, eServiceReference, iRecordableService, quitMainloop, eActionMap, setPreferredTuner
+from enigma import eEPGCache, getBestPlayableServiceReference, eStreamServer, eServiceReference, iRecordableService, quitMainloop, eActionMap, setPreferredTuner, eTimer
 
 from Components.config import config
 from Components.UsageConfig import defaultMoviePath
@@ -25,7 +25,8 @@ import NavigationInstance
 from ServiceReference import ServiceReference, isPlayableForCur
 
 from time import localtime, strftime, ctime, time
-from bisect import insort
+from bisect import bisect_left, bisect_right, insort
+from hashlib import md5
 from sys import maxsize
 
 # ok, for descriptions etc we have:
@@ -35,6 +36,26 @@ from sys import maxsize
 # event data         (ONLY for time adjustments etc.)
 
 
+LOG_ENTRIES_MAX = 100 # log entries kept per timer, older ones go to timers.log
+LOG_FILE_MAX = 512 * 1024 # timers.log is rotated to timers.log.1 at this size
+SAVE_DELAY = 2000 # ms to collect timer changes before timers.xml is written
+
+
+def appendTimerLog(timer, entries):
+	filename = resolveFilename(SCOPE_CONFIG, "timers.log")
+	try:
+		if os.path.getsize(filename) > LOG_FILE_MAX:
+			os.rename(filename, filename + ".1")
+	except OSError:
+		pass
+	try:
+		with open(filename, "a") as f:
+			for time, code, msg in entries:
+				f.write("%s %d %s %s: %s\n" % (strftime("%Y-%m-%d %H:%M:%S", localtime(time)), code, timer.service_ref, timer.name, msg))
+	except (IOError, OSError) as e:
+		print("[RecordTimer] writing %s failed: %s" % (filename, e))
+
+
 # parses an event, and gives out a (begin, end, name, duration, eit)-tuple.
 # begin and end will be corrected
 def parseEvent(ev, description=True):
@@ -230,6 +251,15 @@ class RecordTimerEntry(timer.TimerEntry):
 	def log(self, code, msg):
 		self.log_entries.append((int(time()), code, msg))
 		print("[TIMER]", msg)
+		if len(self.log_entries) > LOG_ENTRIES_MAX:
+			self.trimLog()
+
+	def trimLog(self):
+		# move the older half of the log to timers.log
+		count = len(self.log_entries) - LOG_ENTRIES_MAX // 2
+		if count > 0:
+			appendTimerLog(self, self.log_entries[:count])
+			del self.log_entries[:count]
 
 	def calculateFilename(self, name=None):
 		service_name = self.service_ref.getServiceName()
@@ -860,6 +890,9 @@ def createTimer(xml):
 		code = int(l.get("code"))
 		msg = l.text.strip()
 		entry.log_entries.append((time, code, msg))
+	# an oversized log is trimmed by the next log(). timers.xml is not written
+	# after loading, trimming here would append the same entries to timers.log
+	# at every start
 
 	return entry
 
@@ -870,13 +903,22 @@ class RecordTimer(timer.Timer):
 
 		self.Filename = resolveFilename(SCOPE_CONFIG, "timers.xml")
 		self.fallback_timer_list = []
+		self.timer_index = None
+		self.savedTimers = None # digest of timers.xml as last written
+		self.saveTimerTimer = eTimer()
+		self.saveTimerTimer.callback.append(self.saveTimer)
 
 		try:
 			self.loadTimer()
 		except IOError:
 			print("unable to load timers from file!")
 
+	def addTimerEntry(self, entry, noRecalc=0):
+		self.timer_index = None
+		timer.Timer.addTimerEntry(self, entry, noRecalc)
+
 	def doActivate(self, w):
+		self.timer_index = None
 		# when activating a timer for servicetype 4097,	
 		# and SystemApp has player enabled, then skip recording.
 		# Or always skip if in ("5001", "5002") as these cannot be recorded.
@@ -896,11 +938,13 @@ class RecordTimer(timer.Timer):
 				w.state += 1
 
 		self.timer_list.remove(w)
+		self.unscheduleEntry(w)
 
 		# did this timer reached the last state?
 		if w.state < RecordTimerEntry.StateEnded:
 			# no, sort it into active list
 			insort(self.timer_list, w)
+			self.scheduleEntry(w)
 		else:
 			# yes. Process repeated, and re-add.
 			if w.repeated:
@@ -918,7 +962,7 @@ class RecordTimer(timer.Timer):
 				# If we want to keep done timers, re-insert in the active list
 				if config.recording.keep_timers.value > 0 and w not in self.processed_timers:
 					insort(self.processed_timers, w)
-					self.saveTimer()
+					self.saveTimerLater()
 
 		self.stateChanged(w)
 
@@ -937,8 +981,13 @@ class RecordTimer(timer.Timer):
 		return False
 
 	def loadTimer(self):
+		# stream the file, every timer element is dropped once it was read
+		timers = []
 		try:
-			doc = xml.etree.ElementTree.parse(self.Filename)
+			for event, element in xml.etree.ElementTree.iterparse(self.Filename):
+				if element.tag == "timer":
+					timers.append(createTimer(element))
+					element.clear()
 		except SyntaxError:
 			AddPopup(_("The timer file (timers.xml) is corrupt and could not be loaded."), type=MessageBox.TYPE_ERROR, timeout=0, id="TimerLoadFailed")
 
@@ -953,12 +1002,9 @@ class RecordTimer(timer.Timer):
 			print("timers.xml not found!")
 			return
 
-		root = doc.getroot()
-
 		checkit = False
 		timer_text = ""
-		for timer in root.findall("timer"):
-			newTimer = createTimer(timer)
+		for newTimer in timers:
 			conflict_list = self.record(newTimer, ignoreTSC=True, dosave=False, loadtimer=True)
 			if conflict_list:
 				checkit = True
@@ -967,7 +1013,14 @@ class RecordTimer(timer.Timer):
 		if checkit:
 			AddPopup(_("Timer overlap in timers.xml detected!\nPlease recheck it!") + timer_text, type=MessageBox.TYPE_ERROR, timeout=0, id="TimerLoadFailed")
 
+	def saveTimerLater(self):
+		# collect a burst of changes into one write
+		if not self.saveTimerTimer.isActive():
+			self.saveTimerTimer.start(SAVE_DELAY, True)
+
 	def saveTimer(self):
+		self.saveTimerTimer.stop()
+
 		#root_element = xml.etree.ElementTree.Element('timers')
 		#root_element.text = "\n"
 
@@ -1062,15 +1115,19 @@ class RecordTimer(timer.Timer):
 
 		list.append('</timers>\n')
 
+		content = "".join(list)
+		digest = md5(content.encode()).digest()
+		if digest == self.savedTimers:
+			return
+
 		file = open(self.Filename + ".writing", "w")
-		for x in list:
-			file.write(x)
+		file.write(content)
 		file.flush()
 
-		import os
 		os.fsync(file.fileno())
 		file.close()
 		os.rename(self.Filename + ".writing", self.Filename)
+		self.savedTimers = digest
 
 	def getNextZapTime(self, isWakeup=False):
 		now = time()
@@ -1140,7 +1197,7 @@ class RecordTimer(timer.Timer):
 		entry.Timer = self
 		self.addTimerEntry(entry)
 		if dosave:
-			self.saveTimer()
+			self.saveTimerLater()
 		return answer
 
 	def isInRepeatTimer(self, timer, event):
@@ -1245,10 +1302,40 @@ class RecordTimer(timer.Timer):
 
 	def setFallbackTimerList(self, list):
 		self.fallback_timer_list = [timer for timer in list if timer.state != 3]
+		self.timer_index = None
 
 	def getAllTimersList(self):
 		return self.timer_list + self.fallback_timer_list
 
+	def getTimerIndex(self):
+		# normalised service ref -> (begins, timers, repeated timers, longest timer)
+		# timers are kept with their position in getAllTimersList() so callers
+		# see them in the same order as when walking the whole list
+		if self.timer_index is None:
+			entries = {}
+			for order, x in enumerate(self.getAllTimersList()):
+				refstr = ':'.join(x.service_ref.ref.toString().split(':')[:11])
+				entries.setdefault(refstr, []).append((order, x))
+			self.timer_index = {}
+			for refstr, timers in entries.items():
+				single = sorted((x.begin, order, x) for order, x in timers if not x.repeated)
+				repeated = [(order, x) for order, x in timers if x.repeated]
+				length = max([x.end - x.begin for begin, order, x in single] or [0])
+				self.timer_index[refstr] = ([begin for begin, order, x in single], [(order, x) for begin, order, x in single], repeated, length)
+		return self.timer_index
+
+	def getTimersInRange(self, refstr, begin, end):
+		# timers on refstr which may overlap begin..end, the one minute slack covers the
+		# margin and zap timer adjustments done in isInTimer. repeated timers match on
+		# weekday and time of day, so they are always returned.
+		entry = self.getTimerIndex().get(refstr)
+		if entry is None:
+			return []
+		begins, timers, repeated, length = entry
+		first = bisect_left(begins, begin - length - 60)
+		last = bisect_right(begins, end + 60)
+		return [x for order, x in sorted(repeated + timers[first:last], key=lambda item: item[0])]
+
 	def isInTimer(self, eventid, begin, duration, service):
 		returnValue = None
 		type = 0
@@ -1257,94 +1344,71 @@ class RecordTimer(timer.Timer):
 		check_offset_time = not config.recording.margin_before.value and not config.recording.margin_after.value
 		end = begin + duration
 		refstr = ':'.join(service.split(':')[:11])
-		for x in self.getAllTimersList():
-			check = ':'.join(x.service_ref.ref.toString().split(':')[:11]) == refstr
-			if check:
-				timer_end = x.end
-				timer_begin = x.begin
-				type_offset = 0
-				if not x.repeated and check_offset_time:
-					if 0 < end - timer_end <= 59:
-						timer_end = end
-					elif 0 < timer_begin - begin <= 59:
-						timer_begin = begin
-				if x.justplay:
-					type_offset = 5
-					if (timer_end - x.begin) <= 1:
-						timer_end += 60
-					if x.pipzap and not x.repeated:
-						type_offset = 30
-				if x.always_zap:
-					type_offset = 10
-
-				timer_repeat = x.repeated
-				# if set 'don't stop current event but disable coming events' for repeat timer
-				running_only_curevent = x.disabled and x.isRunning() and timer_repeat
-				if running_only_curevent:
-					timer_repeat = 0
-					type_offset += 15
-
-				if timer_repeat != 0:
-					type_offset += 15
-					if bt is None:
-						bt = localtime(begin)
-						bday = bt.tm_wday
-						begin2 = 1440 + bt.tm_hour * 60 + bt.tm_min
-						end2 = begin2 + duration / 60
-					xbt = localtime(x.begin)
-					xet = localtime(timer_end)
-					offset_day = False
-					checking_time = x.begin < begin or begin <= x.begin <= end
-					if xbt.tm_yday != xet.tm_yday:
-						oday = bday - 1
-						if oday == -1:
-							oday = 6
-						offset_day = x.repeated & (1 << oday)
-					xbegin = 1440 + xbt.tm_hour * 60 + xbt.tm_min
-					xend = xbegin + ((timer_end - x.begin) / 60)
-					if xend < xbegin:
-						xend += 1440
-					if x.repeated & (1 << bday) and checking_time:
-						if begin2 < xbegin <= end2:
-							if xend < end2:
-								# recording within event
-								time_match = (xend - xbegin) * 60
-								type = type_offset + 3
-							else:
-								# recording last part of event
-								time_match = (end2 - xbegin) * 60
-								type = type_offset + 1
-						elif xbegin <= begin2 <= xend:
-							if xend < end2:
-								# recording first part of event
-								time_match = (xend - begin2) * 60
-								type = type_offset + 4
-							else:
-								# recording whole event
-								time_match = (end2 - begin2) * 60
-								type = type_offset + 2
-						elif offset_day:
-							xbegin -= 1440
-							xend -= 1440
-							if begin2 < xbegin <= end2:
-								if xend < end2:
-									# recording within event
-									time_match = (xend - xbegin) * 60
-									type = type_offset + 3
-								else:
-									# recording last part of event
-									time_match = (end2 - xbegin) * 60
-									type = type_offset + 1
-							elif xbegin <= begin2 <= xend:
-								if xend < end2:
-									# recording first part of event
-									time_match = (xend - begin2) * 60
-									type = type_offset + 4
-								else:
-									# recording whole event
-									time_match = (end2 - begin2) * 60
-									type = type_offset + 2
-					elif offset_day and checking_time:
+		for x in self.getTimersInRange(refstr, begin, end):
+			timer_end = x.end
+			timer_begin = x.begin
+			type_offset = 0
+			if not x.repeated and check_offset_time:
+				if 0 < end - timer_end <= 59:
+					timer_end = end
+				elif 0 < timer_begin - begin <= 59:
+					timer_begin = begin
+			if x.justplay:
+				type_offset = 5
+				if (timer_end - x.begin) <= 1:
+					timer_end += 60
+				if x.pipzap and not x.repeated:
+					type_offset = 30
+			if x.always_zap:
+				type_offset = 10
+
+			timer_repeat = x.repeated
+			# if set 'don't stop current event but disable coming events' for repeat timer
+			running_only_curevent = x.disabled and x.isRunning() and timer_repeat
+			if running_only_curevent:
+				timer_repeat = 0
+				type_offset += 15
+
+			if timer_repeat != 0:
+				type_offset += 15
+				if bt is None:
+					bt = localtime(begin)
+					bday = bt.tm_wday
+					begin2 = 1440 + bt.tm_hour * 60 + bt.tm_min
+					end2 = begin2 + duration / 60
+				xbt = localtime(x.begin)
+				xet = localtime(timer_end)
+				offset_day = False
+				checking_time = x.begin < begin or begin <= x.begin <= end
+				if xbt.tm_yday != xet.tm_yday:
+					oday = bday - 1
+					if oday == -1:
+						oday = 6
+					offset_day = x.repeated & (1 << oday)
+				xbegin = 1440 + xbt.tm_hour * 60 + xbt.tm_min
+				xend = xbegin + ((timer_end - x.begin) / 60)
+				if xend < xbegin:
+					xend += 1440
+				if x.repeated & (1 << bday) and checking_time:
+					if begin2 < xbegin <= end2:
+						if xend < end2:
+							# recording within event
+							time_match = (xend - xbegin) * 60
+							type = type_offset + 3
+						else:
+							# recording last part of event
+							time_match = (end2 - xbegin) * 60
+							type = type_offset + 1
+					elif xbegin <= begin2 <= xend:
+						if xend < end2:
+							# recording first part of event
+							time_match = (xend - begin2) * 60
+							type = type_offset + 4
+						else:
+							# recording whole event
+							time_match = (end2 - begin2) * 60
+							type = type_offset + 2
+					elif offset_day:
 						xbegin -= 1440
 						xend -= 1440
 						if begin2 < xbegin <= end2:
@@ -1365,35 +1429,56 @@ class RecordTimer(timer.Timer):
 								# recording whole event
 								time_match = (end2 - begin2) * 60
 								type = type_offset + 2
-				else:
-					if begin < timer_begin <= end:
-						if timer_end < end:
+				elif offset_day and checking_time:
+					xbegin -= 1440
+					xend -= 1440
+					if begin2 < xbegin <= end2:
+						if xend < end2:
 							# recording within event
-							time_match = timer_end - timer_begin
+							time_match = (xend - xbegin) * 60
 							type = type_offset + 3
 						else:
 							# recording last part of event
-							time_match = end - timer_begin
+							time_match = (end2 - xbegin) * 60
 							type = type_offset + 1
-					elif timer_begin <= begin <= timer_end:
-						if timer_end < end:
+					elif xbegin <= begin2 <= xend:
+						if xend < end2:
 							# recording first part of event
-							time_match = timer_end - begin
+							time_match = (xend - begin2) * 60
 							type = type_offset + 4
 						else:
 							# recording whole event
-							time_match = end - begin
+							time_match = (end2 - begin2) * 60
 							type = type_offset + 2
-				if time_match:
-					if type in (2, 7, 12, 17, 22, 27, 32):
-						# When full recording do not look further
-						returnValue = (time_match, [type])
-						break
-					elif returnValue:
-						if type not in returnValue[1]:
-							returnValue[1].append(type)
+			else:
+				if begin < timer_begin <= end:
+					if timer_end < end:
+						# recording within event
+						time_match = timer_end - timer_begin
+						type = type_offset + 3
 					else:
-						returnValue = (time_match, [type])
+						# recording last part of event
+						time_match = end - timer_begin
+						type = type_offset + 1
+				elif timer_begin <= begin <= timer_end:
+					if timer_end < end:
+						# recording first part of event
+						time_match = timer_end - begin
+						type = type_offset + 4
+					else:
+						# recording whole event
+						time_match = end - begin
+						type = type_offset + 2
+			if time_match:
+				if type in (2, 7, 12, 17, 22, 27, 32):
+					# When full recording do not look further
+					returnValue = (time_match, [type])
+					break
+				elif returnValue:
+					if type not in returnValue[1]:
+						returnValue[1].append(type)
+				else:
+					returnValue = (time_match, [type])
 
 		return returnValue
 
@@ -1422,15 +1507,16 @@ class RecordTimer(timer.Timer):
 		if entry in self.processed_timers:
 			# now the timer should be in the processed_timers list. remove it from there.
 			self.processed_timers.remove(entry)
-		self.saveTimer()
+		self.timer_index = None
+		self.saveTimerLater()
 
 	def shutdown(self):
 		self.saveTimer()
 
 	def cleanup(self):
 		timer.Timer.cleanup(self)
-		self.saveTimer()
+		self.saveTimerLater()
 
 	def cleanupDaily(self, days):
 		timer.Timer.cleanupDaily(self, days)
-		self.saveTimer()
+		self.saveTimerLater()
@@ -230,39 +230,37 @@ class CommitInfo(Screen):
 		self.Timer.start(50, True)
 
 	def readGithubCommitLogs(self):
-		url = self.projects[self.project][0]
-		commitlog = ""
+		from Tools.HttpClient import httpClient
+		project = self.project
+		httpClient.getJson(self.projects[project][0], timeout=5, owner=self).addCallbacks(self.gotGithubCommitLogs, self.gotGithubCommitLogs, callbackArgs=(project,), errbackArgs=(project,))
+
+	def gotGithubCommitLogs(self, log, project):
 		from datetime import datetime
-		from json import loads
-		from urllib.request import urlopen
+		url = self.projects[project][0]
+		commitlog = 80 * '-' + '\n'
+		commitlog += url.split('/')[-2] + '\n'
+		commitlog += 80 * '-' + '\n'
 		try:
-			commitlog += 80 * '-' + '\n'
-			commitlog += url.split('/')[-2] + '\n'
-			commitlog += 80 * '-' + '\n'
-			try:
-				# OpenPli 5.0 uses python 2.7.11 and here we need to bypass the certificate check
-				from ssl import _create_unverified_context
-				log = loads(urlopen(url, timeout=5, context=_create_unverified_context()).read())
-			except:
-				log = loads(urlopen(url, timeout=5).read())
-
-			if self.projects[self.project][2] == API_GITHUB:
+			if not isinstance(log, list):
+				raise ValueError(log)
+			if self.projects[project][2] == API_GITHUB:
 				for c in log:
 					creator = c['commit']['author']['name']
 					title = c['commit']['message']
 					date = datetime.strptime(c['commit']['committer']['date'], '%Y-%m-%dT%H:%M:%SZ').strftime('%x %X')
 					commitlog += date + ' ' + creator + '\n' + title + 2 * '\n'
-			elif self.projects[self.project][2] == API_GITLAB:
+			elif self.projects[project][2] == API_GITLAB:
 				for c in log:
 					creator = c['author_name']
 					title = c['title']
 					date = datetime.strptime(c['committed_date'], '%Y-%m-%dT%H:%M:%S.000%z').strftime('%x %X')
 					commitlog += date + ' ' + creator + '\n' + title + 2 * '\n'
 
-			self.cachedProjects[self.projects[self.project][1]] = commitlog
+			self.cachedProjects[self.projects[project][1]] = commitlog
 		except Exception as e:
 			commitlog += _("Currently the commit log cannot be retrieved - please try later again.")
-		self["AboutScrollLabel"].setText(commitlog)
+		if project == self.project: # the user may have moved on meanwhile
+			self["AboutScrollLabel"].setText(commitlog)
 
 	def updateCommitLogs(self):
 		if self.projects[self.project][1] in self.cachedProjects:
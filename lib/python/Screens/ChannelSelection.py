@@ -7,6 +7,7 @@ from Screens.ScreenSaver import InfoBarScreenSaver
 import Components.ParentalControl
 from Components.Button import Button
 from Components.ServiceList import ServiceList, refreshServiceList
+from Components.BouquetIndex import bouquetIndex, reloadBouquets, reloadServicelist
 from Components.ActionMap import NumberActionMap, ActionMap, HelpableActionMap
 from Components.MenuList import MenuList
 from Components.ServiceEventTracker import ServiceEventTracker, InfoBarBase
@@ -313,13 +314,13 @@ class ChannelContextMenu(Screen):
 
 	def addDedicated3DFlag(self):
 		eDVBDB.getInstance().addFlag(eServiceReference(self.csel.getCurrentSelection().toString()), FLAG_IS_DEDICATED_3D)
-		eDVBDB.getInstance().reloadBouquets()
+		reloadBouquets()
 		self.set3DMode(True)
 		self.close()
 
 	def removeDedicated3DFlag(self):
 		eDVBDB.getInstance().removeFlag(eServiceReference(self.csel.getCurrentSelection().toString()), FLAG_IS_DEDICATED_3D)
-		eDVBDB.getInstance().reloadBouquets()
+		reloadBouquets()
 		self.set3DMode(False)
 		self.close()
 
@@ -330,13 +331,13 @@ class ChannelContextMenu(Screen):
 
 	def addCenterDVBSubsFlag(self):
 		eDVBDB.getInstance().addFlag(eServiceReference(self.csel.getCurrentSelection().toString()), FLAG_CENTER_DVB_SUBS)
-		eDVBDB.getInstance().reloadBouquets()
+		reloadBouquets()
 		config.subtitles.dvb_subtitles_centered.value = True
 		self.close()
 
 	def removeCenterDVBSubsFlag(self):
 		eDVBDB.getInstance().removeFlag(eServiceReference(self.csel.getCurrentSelection().toString()), FLAG_CENTER_DVB_SUBS)
-		eDVBDB.getInstance().reloadBouquets()
+		reloadBouquets()
 		config.subtitles.dvb_subtitles_centered.value = False
 		self.close()
 
@@ -396,7 +397,7 @@ class ChannelContextMenu(Screen):
 			if self.csel.movemode:
 				self.csel.toggleMoveMode()
 			self.csel.removeBouquet()
-			eDVBDB.getInstance().reloadBouquets()
+			reloadBouquets()
 			self.close()
 
 	def purgeDeletedBouquets(self):
@@ -419,7 +420,7 @@ class ChannelContextMenu(Screen):
 				os.rename(file, file[:-4])
 		eDVBDBInstance = eDVBDB.getInstance()
 		eDVBDBInstance.setLoadUnlinkedUserbouquets(True)
-		eDVBDBInstance.reloadBouquets()
+		reloadBouquets()
 		eDVBDBInstance.setLoadUnlinkedUserbouquets(config.misc.load_unlinked_userbouquets.value)
 		refreshServiceList()
 		self.csel.showFavourites()
@@ -447,8 +448,8 @@ class ChannelContextMenu(Screen):
 		self.close(False)
 
 	def reloadServices(self):
-		eDVBDB.getInstance().reloadBouquets()
-		eDVBDB.getInstance().reloadServicelist()
+		reloadBouquets()
+		reloadServicelist()
 		self.session.openWithCallback(self.close, MessageBox, _("The service list is reloaded."), MessageBox.TYPE_INFO, timeout=5)
 
 	def showServiceInformations(self):
@@ -960,6 +961,7 @@ class ChannelSelectionEdit:
 				mutableList.addService(current)
 				mutableList.moveService(current, index)
 				mutableList.flushChanges()
+				bouquetIndex.invalidate()
 				self.servicelist.addService(current, True)
 				self.servicelist.removeCurrent()
 				if not self.servicelist.atEnd():
@@ -976,10 +978,12 @@ class ChannelSelectionEdit:
 				if not mutableList.addService(ref, current):
 					self.servicelist.addService(ref, True)
 					mutableList.flushChanges()
+					bouquetIndex.invalidate()
 					break
 			elif not mutableList.addService(ref):
 				self.servicelist.addService(ref, True)
 				mutableList.flushChanges()
+				bouquetIndex.invalidate()
 				break
 			cnt += 1
 
@@ -1000,13 +1004,14 @@ class ChannelSelectionEdit:
 			if not mutableBouquet.addService(new_ref.ref, cur_service.ref):
 				mutableBouquet.removeService(cur_service.ref)
 				mutableBouquet.flushChanges()
-				eDVBDB.getInstance().reloadBouquets()
+				reloadBouquets()
 				mutableAlternatives = new_ref.list().startEdit()
 				if mutableAlternatives:
 					mutableAlternatives.setListName(name)
 					if mutableAlternatives.addService(cur_service.ref):
 						print("add", cur_service.ref.toString(), "to new alternatives failed")
 					mutableAlternatives.flushChanges()
+					bouquetIndex.invalidate()
 					self.servicelist.addService(new_ref.ref, True)
 					self.servicelist.removeCurrent()
 					if not end:
@@ -1033,7 +1038,7 @@ class ChannelSelectionEdit:
 			new_bouquet_ref = eServiceReference((self.mode == MODE_TV and '1:7:1:0:0:0:0:0:0:0:FROM BOUQUET "userbouquet.%s.tv" ORDER BY bouquet' or '1:7:2:0:0:0:0:0:0:0:FROM BOUQUET "userbouquet.%s.radio" ORDER BY bouquet') % name)
 			if not mutableBouquetList.addService(new_bouquet_ref):
 				mutableBouquetList.flushChanges()
-				eDVBDB.getInstance().reloadBouquets()
+				reloadBouquets()
 				mutableBouquet = serviceHandler.list(new_bouquet_ref).startEdit()
 				if mutableBouquet:
 					mutableBouquet.setListName(bName)
@@ -1042,6 +1047,7 @@ class ChannelSelectionEdit:
 							if mutableBouquet.addService(service):
 								print("add", service.toString(), "to new bouquet failed")
 					mutableBouquet.flushChanges()
+					bouquetIndex.invalidate()
 				else:
 					print("get mutable list for new created bouquet failed")
 				# do some voodoo to check if current_root is equal to bouquet_root
@@ -1189,6 +1195,7 @@ class ChannelSelectionEdit:
 				if self.bouquet_mark_edit == EDIT_ALTERNATIVES and not new_marked and self.__marked:
 					self.mutableList.addService(eServiceReference(self.__marked[0]))
 				self.mutableList.flushChanges()
+				bouquetIndex.invalidate()
 		self.__marked = []
 		self.clearMarks()
 		self.bouquet_mark_edit = OFF
@@ -1240,6 +1247,7 @@ class ChannelSelectionEdit:
 		if ref.valid() and mutableList is not None:
 			if not mutableList.removeService(ref):
 				mutableList.flushChanges() #FIXME dont flush on each single removed service
+				bouquetIndex.invalidate()
 				self.servicelist.removeCurrent()
 				self.servicelist.resetRoot()
 				playingref = self.session.nav.getCurrentlyPlayingServiceOrGroup()
@@ -1253,6 +1261,7 @@ class ChannelSelectionEdit:
 				service = self.servicelist.getCurrent()
 			if not mutableList.addService(service):
 				mutableList.flushChanges()
+				bouquetIndex.invalidate()
 				# do some voodoo to check if current_root is equal to dest
 				cur_root = self.getRoot()
 				str1 = cur_root and cur_root.toString() or -1
@@ -1270,6 +1279,7 @@ class ChannelSelectionEdit:
 				self.toggleMoveMarked() # unmark current entry
 			self.movemode = False
 			self.mutableList.flushChanges() # FIXME add check if changes was made
+			bouquetIndex.invalidate()
 			self.mutableList = None
 			self.setTitle(self.saved_title)
 			self.saved_title = None
@@ -1393,21 +1403,9 @@ class ChannelSelectionBase(Screen):
 	def getBouquetNumOffset(self, bouquet):
 		if not config.usage.multibouquet.value:
 			return 0
-		str = bouquet.toString()
-		offset = 0
 		if 'userbouquet.' in bouquet.toCompareString():
-			serviceHandler = eServiceCenter.getInstance()
-			servicelist = serviceHandler.list(bouquet)
-			if not servicelist is None:
-				while True:
-					serviceIterator = servicelist.getNext()
-					if not serviceIterator.valid(): #check if end of list
-						break
-					number = serviceIterator.getChannelNum()
-					if number > 0:
-						offset = number - 1
-						break
-		return offset
+			return bouquetIndex.getNumberOffset(bouquet)
+		return 0
 
 	def recallBouquetMode(self):
 		if self.mode == MODE_TV:
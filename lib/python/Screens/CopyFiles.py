@@ -118,9 +118,13 @@ class MoveFileTask(CopyFileTask):
 			raise errors[0]
 
 
+def getResources(fileList):
+	return set(Components.Task.getDeviceResource(path) for files in fileList for path in files)
+
+
 def copyFiles(fileList, name):
 	name = _("Copy") + " " + name
-	job = Components.Task.Job(name)
+	job = Components.Task.Job(name, resources=getResources(fileList))
 	task = CopyFileTask(job, name)
 	task.openFiles(fileList)
 	Components.Task.job_manager.AddJob(job)
@@ -128,7 +132,7 @@ def copyFiles(fileList, name):
 
 def moveFiles(fileList, name):
 	name = _("Move") + " " + name
-	job = Components.Task.Job(name)
+	job = Components.Task.Job(name, resources=getResources(fileList))
 	task = MoveFileTask(job, name)
 	task.openFiles(fileList)
 	Components.Task.job_manager.AddJob(job)
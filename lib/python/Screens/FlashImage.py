@@ -15,12 +15,11 @@ from Tools.BoundFunction import boundFunction
 from Tools.Directories import resolveFilename, SCOPE_PLUGINS, fileExists, pathExists, fileHas
 from Tools.Downloader import downloadWithProgress
 from Tools.HardwareInfo import HardwareInfo
+from Tools.HttpClient import httpClient
 from Tools.Multiboot import getImagelist, getCurrentImage, getCurrentImageMode, deleteImage, restoreImages
 import os
 import re
-from urllib.request import urlopen, Request
 import xml.etree.ElementTree
-import json
 import time
 import zipfile
 import shutil
@@ -37,6 +36,7 @@ class SelectImage(Screen):
 	def __init__(self, session, *args):
 		Screen.__init__(self, session)
 		self.jsonlist = {}
+		self.jsonlistFetched = False
 		self.imagesList = {}
 		self.setIndex = 0
 		self.expanded = []
@@ -95,23 +95,14 @@ class SelectImage(Screen):
 		model = HardwareInfo().get_machine_name()
 
 		if not self.imagesList:
-			if not self.jsonlist:
+			if not self.jsonlist or self.jsonlistFetched:
 				if "model" in self.selectedImage:
 					for expression in eval(self.url_feeds.find(self.selectedImage["model"]).text):
 						model = re.sub(expression[0], expression[1], model)
-				url = "%s%s" % (self.selectedImage["url"], model)
-				try:
-					self.jsonlist = dict(json.load(urlopen(url, timeout=3)))
-				except:
-					print("[FlashImage] getImagesList Error: Unable to load json data from URL '%s'!" % url)
-				alternative_imagefeed = config.usage.alternative_imagefeed.value
-				if alternative_imagefeed:
-					if "http" in alternative_imagefeed:
-						url = "%s%s" % (config.usage.alternative_imagefeed.value, model)
-						try:
-							self.jsonlist.update(dict(json.load(urlopen(url, timeout=3))))
-						except:
-							print("[FlashImage] getImagesList Error: Unable to load json data from alternative URL '%s'!" % url)
+				if not self.jsonlistFetched:
+					self.fetchJsonList(model) # comes back here when the feeds answered
+					return
+				self.jsonlistFetched = False
 
 			self.imagesList = dict(self.jsonlist)
 
@@ -151,6 +142,30 @@ class SelectImage(Screen):
 		else:
 			self["list"].setList([ChoiceEntryComponent('', ((_("Cannot find images - please try later or select an alternate image")), "Waiter"))])
 
+	def fetchJsonList(self, model):
+		from twisted.internet.defer import gatherResults
+		urls = ["%s%s" % (self.selectedImage["url"], model)]
+		alternative_imagefeed = config.usage.alternative_imagefeed.value
+		if alternative_imagefeed and "http" in alternative_imagefeed:
+			urls.append("%s%s" % (alternative_imagefeed, model))
+
+		def failed(failure, url):
+			print("[FlashImage] getImagesList Error: Unable to load json data from URL '%s'!" % url)
+			return {}
+
+		def done(results):
+			self.jsonlist = {}
+			for result in results:
+				try:
+					self.jsonlist.update(dict(result))
+				except:
+					pass
+			self.jsonlistFetched = True
+			self.getImagesList()
+
+		# the image feed and the alternative feed are asked at the same time
+		gatherResults([httpClient.getJson(url, timeout=3, owner=self).addErrback(failed, url) for url in urls]).addCallback(done)
+
 	def keyOk(self):
 		currentSelected = self["list"].l.getCurrentSelection()
 		if currentSelected[0][1] == "Expander":
@@ -2,6 +2,7 @@ from Screens.ChannelSelection import ChannelSelection, BouquetSelector, SilentBo
 
 from Components.ActionMap import ActionMap, HelpableActionMap
 from Components.ActionMap import NumberActionMap
+from Components.BouquetIndex import bouquetIndex, reloadBouquets, reloadServicelist
 from Components.Harddisk import harddiskmanager
 from Components.Input import Input
 from Components.Label import Label
@@ -715,38 +716,24 @@ class InfoBarNumberZap:
 		if service:
 			self.selectAndStartService(service, bouquet)
 
-	def searchNumberHelper(self, serviceHandler, num, bouquet):
-		servicelist = serviceHandler.list(bouquet)
-		if servicelist:
-			serviceIterator = servicelist.getNext()
-			while serviceIterator.valid():
-				if num == serviceIterator.getChannelNum():
-					return serviceIterator
-				serviceIterator = servicelist.getNext()
-		return None
-
 	def searchNumber(self, number, firstBouquetOnly=False, bouquet=None):
 		bouquet = bouquet or self.servicelist.getRoot()
 		service = None
-		serviceHandler = eServiceCenter.getInstance()
 		if not firstBouquetOnly:
-			service = self.searchNumberHelper(serviceHandler, number, bouquet)
+			service = bouquetIndex.getService(bouquet, number)
 		if config.usage.multibouquet.value and not service:
-			bouquet = self.servicelist.bouquet_root
-			bouquetlist = serviceHandler.list(bouquet)
-			if bouquetlist:
-				bouquet = bouquetlist.getNext()
-				while bouquet.valid():
-					if bouquet.flags & eServiceReference.isDirectory and not bouquet.flags & eServiceReference.isInvisible:
-						service = self.searchNumberHelper(serviceHandler, number, bouquet)
-						if service:
-							playable = not (service.flags & (eServiceReference.isMarker | eServiceReference.isDirectory)) or (service.flags & eServiceReference.isNumberedMarker)
-							if not playable:
-								service = None
-							break
-						if config.usage.alternative_number_mode.value or firstBouquetOnly:
-							break
-					bouquet = bouquetlist.getNext()
+			for bouquet in bouquetIndex.getBouquets(self.servicelist.bouquet_root):
+				if not bouquet.flags & eServiceReference.isInvisible:
+					service = bouquetIndex.getService(bouquet, number)
+					if service:
+						playable = not (service.flags & (eServiceReference.isMarker | eServiceReference.isDirectory)) or (service.flags & eServiceReference.isNumberedMarker)
+						if not playable:
+							service = None
+						break
+					if config.usage.alternative_number_mode.value or firstBouquetOnly:
+						break
+		if not service:
+			return None, None
 		return service, bouquet
 
 	def selectAndStartService(self, service, bouquet):
@@ -3323,9 +3310,9 @@ class InfoBarNotifications:
 				del n[3]["onSessionOpenCallback"]
 
 			if n[4] and n[4].startswith("ChannelsImport"):
-				if "channels" in config.usage.remote_fallback_import.value:
-					eDVBDB.getInstance().reloadBouquets()
-					eDVBDB.getInstance().reloadServicelist()
+				if "channels" in config.usage.remote_fallback_import.value and n[4] != "ChannelsImportUnchangedOK":
+					reloadBouquets()
+					reloadServicelist()
 					from Components.ParentalControl import parentalControl
 					parentalControl.open()
 					refreshServiceList()
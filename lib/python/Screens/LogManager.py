@@ -85,14 +85,14 @@ class LogManagerPoller:
 		# Components.Task.job_manager.AddJob(self.createTrashJob())
 
 	def createTrimJob(self):
-		job = Components.Task.Job(_("LogManager"))
+		job = Components.Task.Job(_("LogManager"), resources=(Components.Task.getDeviceResource(config.crash.debugPath.value),))
 		task = Components.Task.PythonTask(job, _("Checking Logs..."))
 		task.work = self.JobTrim
 		task.weighting = 1
 		return job
 
 	def createTrashJob(self):
-		job = Components.Task.Job(_("LogManager"))
+		job = Components.Task.Job(_("LogManager"), resources=(Components.Task.getDeviceResource(config.crash.debugPath.value),))
 		task = Components.Task.PythonTask(job, _("Checking Logs..."))
 		task.work = self.JobTrash
 		task.weighting = 1
@@ -2,7 +2,7 @@ from Screens.Screen import Screen
 from Components.Button import Button
 from Components.ActionMap import HelpableActionMap, ActionMap, NumberActionMap
 from Components.ChoiceList import ChoiceList, ChoiceEntryComponent
-from Components.MovieList import MovieList, resetMoviePlayState, AUDIO_EXTENSIONS, DVD_EXTENSIONS, IMAGE_EXTENSIONS, moviePlayState
+from Components.MovieList import MovieList, resetMoviePlayState, AUDIO_EXTENSIONS, DVD_EXTENSIONS, IMAGE_EXTENSIONS, MOVIE_CACHE_FILE, moviePlayState, movieCache
 from Components.DiskInfo import DiskInfo
 from Components.Pixmap import Pixmap, MultiPixmap
 from Components.Label import Label
@@ -54,6 +54,7 @@ config.movielist.hide_extensions = ConfigYesNo(default=False)
 config.movielist.stop_service = ConfigYesNo(default=True)
 config.movielist.add_bookmark = ConfigYesNo(default=True)
 config.movielist.show_underlines = ConfigYesNo(default=False)
+config.movielist.use_cache = ConfigYesNo(default=True)
 
 userDefinedButtons = None
 last_selected_dest = []
@@ -277,6 +278,7 @@ class MovieBrowserConfiguration(ConfigListScreen, Screen):
 			(_("Show extended description"), cfg.description, _("You can enable if will be displayed extended EPG description for item.")),
 			(_("Type"), cfg.listtype, _("Set movielist type.")),
 			(_("Use individual settings for each directory"), config.movielist.settings_per_directory, _("Settings can be different for each directory separately (for non removeable devices only).")),
+			(_("Cache movie information"), config.movielist.use_cache, _("Keep name, tags, length and play position of the movies in a file in each directory, so the movie list only reads changed recordings.")),
 			(_("Allow quitting movie player with exit"), config.usage.leave_movieplayer_onExit, _("When enabled, it is possible to leave the movie player with exit.")),
 			(_("Behavior when a movie reaches the end"), config.usage.on_movie_eof, _("Set action when movie playback is finished.")),
 			(_("Stop service on return to movie list"), config.movielist.stop_service, _("If is enabled and movie playback is finished, then after return to movielist will not be automaticaly start service playback.")),
@@ -1273,7 +1275,7 @@ class MovieSelection(Screen, HelpableScreen, SelectionEventInfo, InfoBarBase, Pr
 		self.settings["moviesort"] = newType
 		self.saveLocalSettings()
 		self.setSortType(newType)
-		self.reloadList()
+		self.resortList()
 
 	def listType(self, newType):
 		self.settings["listtype"] = newType
@@ -1360,6 +1362,15 @@ class MovieSelection(Screen, HelpableScreen, SelectionEventInfo, InfoBarBase, Pr
 		# Magic: this sets extra things to show
 		self.current_ref.setName('16384:jpg 16384:png 16384:gif 16384:bmp')
 
+	def resortList(self):
+		# the entries are already loaded, only their order changes
+		sel = self.getCurrent()
+		self["list"].resort()
+		self.displaySortStatus()
+		if not (sel and self["list"].moveTo(sel)):
+			self["list"].moveToFirstMovie()
+		self.createPlaylist()
+
 	def reloadList(self, sel=None, home=False):
 		self.reload_sel = sel
 		self.reload_home = home
@@ -1906,8 +1917,11 @@ class MovieSelection(Screen, HelpableScreen, SelectionEventInfo, InfoBarBase, Pr
 						trash = os.path.join(trash, os.path.split(cur_path)[1])
 						os.mkdir(trash)
 						for root, dirnames, filenames in os.walk(cur_path):
+							movieCache.removeDirectory(root) # the movie cache is not moved along
 							trashroot = os.path.join(trash, root[len(cur_path) + 1:])
 							for fn in filenames:
+								if fn == MOVIE_CACHE_FILE:
+									continue
 								print("Move %s -> %s" % (os.path.join(root, fn), os.path.join(trashroot, fn)))
 								os.rename(os.path.join(root, fn), os.path.join(trashroot, fn))
 							for dn in dirnames:
@@ -1938,7 +1952,7 @@ class MovieSelection(Screen, HelpableScreen, SelectionEventInfo, InfoBarBase, Pr
 				self.session.open(MessageBox, msg, MessageBox.TYPE_ERROR)
 				return
 			for fn in os.listdir(cur_path):
-				if (fn != '.') and (fn != '..'):
+				if fn not in ('.', '..', MOVIE_CACHE_FILE):
 					ffn = os.path.join(cur_path, fn)
 					if os.path.isdir(ffn):
 						subdirs += 1
@@ -1956,6 +1970,7 @@ class MovieSelection(Screen, HelpableScreen, SelectionEventInfo, InfoBarBase, Pr
 				return
 			else:
 				try:
+					movieCache.removeDirectory(cur_path)
 					os.rmdir(cur_path)
 				except Exception as e:
 					print("[MovieSelection] Failed delete", e)
@@ -2052,6 +2067,8 @@ class MovieSelection(Screen, HelpableScreen, SelectionEventInfo, InfoBarBase, Pr
 		item = self.getCurrentSelection()
 		current = item[0]
 		cur_path = os.path.realpath(current.getPath())
+		for root, dirnames, filenames in os.walk(cur_path):
+			movieCache.removeDirectory(root)
 		Tools.Trashcan.cleanAll(cur_path)
 
 	def showNetworkSetup(self):
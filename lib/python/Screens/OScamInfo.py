@@ -14,6 +14,7 @@ from Tools.Directories import SCOPE_CURRENT_SKIN, resolveFilename, fileExists
 
 from enigma import eTimer, RT_HALIGN_LEFT, eListboxPythonMultiContent, gFont, getDesktop, eSize, ePoint
 from xml.etree import ElementTree
+from twisted.internet.defer import succeed
 
 from operator import itemgetter
 import os
@@ -152,7 +153,7 @@ class OscamInfo:
 
 		return ret
 
-	def openWebIF(self, part=None, reader=None):
+	def getWebIFUrl(self, part=None, reader=None):
 		NAMEBIN = check_NAMEBIN()
 		self.proto = "http"
 		if config.oscaminfo.userdatafromconf.value:
@@ -188,6 +189,12 @@ class OscamInfo:
 			self.url = "%s://%s:%s/%sapi.html?part=%s&label=%s" % (self.proto, self.ip, self.port, NAMEBIN, part, reader)
 		print("[openWebIF] NAMEBIN=%s, NAMEBIN=%s url=%s" % (NAMEBIN, NAMEBIN, self.url))
 		print("[OscamInfo] self.url=%s" % self.url)
+		return True, self.url
+
+	def openWebIF(self, part=None, reader=None):
+		result = self.getWebIFUrl(part, reader)
+		if not result[0]:
+			return result
 		opener = build_opener(HTTPHandler)
 		if not self.username == "":
 			pwman = HTTPPasswordMgrWithDefaultRealm()
@@ -198,7 +205,7 @@ class OscamInfo:
 		request = Request(self.url)
 		err = False
 		try:
-			data = urlopen(request).read()
+			data = urlopen(request, timeout=10).read()
 			# print data
 		except URLError as e:
 			if hasattr(e, "reason"):
@@ -212,24 +219,34 @@ class OscamInfo:
 			return True, data
 
 	def readXML(self, typ):
-		if typ == "l":
-			self.showLog = True
-			part = "status&appendlog=1"
-		else:
-			self.showLog = False
-			part = None
-		result = self.openWebIF(part)
+		return self.parseXML(typ, self.openWebIF(self.getXMLPart(typ)))
+
+	def fetchXML(self, typ):
+		"""Non-blocking readXML(), returns a Deferred firing with the same
+		result. self.version is taken from the same answer."""
+		result = self.getWebIFUrl(self.getXMLPart(typ))
+		if not result[0]:
+			return succeed(result[1])
+		from Tools.HttpClient import httpClient
+
+		def failed(failure):
+			print("[openWebIF] error: %s" % failure.getErrorMessage())
+			return False, failure.getErrorMessage()
+
+		auth = (self.username, self.password) if self.username else None
+		return httpClient.get(self.url, auth=auth, owner=self if isinstance(self, Screen) else None).addCallbacks(lambda data: (True, data), failed).addCallback(lambda result: self.parseXML(typ, result))
+
+	def getXMLPart(self, typ):
+		return "status&appendlog=1" if typ == "l" else None
+
+	def parseXML(self, typ, result):
+		self.showLog = typ == "l"
 		retval = []
 		tmp = {}
 		if result[0]:
 			if not self.showLog:
 				data = ElementTree.XML(result[1])
-#				if typ=="version":
-#					if "version" in data.attrib:
-#						self.version = data.attrib["version"]
-#					else:
-#						self.version = "n/a"
-#					return self.version
+				self.version = data.attrib.get("version", _("-"))
 				status = data.find("status")
 				clients = status.findall("client")
 				for cl in clients:
@@ -279,6 +296,7 @@ class OscamInfo:
 				else:
 					tmp = result[1]
 				data = ElementTree.XML(tmp)
+				self.version = data.attrib.get("version", _("-"))
 				log = data.find("log")
 				logtext = log.text
 			if typ == "s":
@@ -646,7 +664,7 @@ class oscInfo(Screen, OscamInfo):
 		self.firstrun = True
 		self.listchange = True
 		self.scrolling = False
-		self.webif_data = self.readXML(typ=self.what)
+		self.fetching = False
 		ypos = 10
 		if f == 1.5 or f == 3:
 			ysize = 800
@@ -824,13 +842,15 @@ class oscInfo(Screen, OscamInfo):
 		return res
 
 	def showData(self):
-		NAMEBIN = check_NAMEBIN()
+		# the answer is shown when it arrives, an update is skipped while one is running
+		if not self.fetching:
+			self.fetching = True
+			self.fetchXML(self.what).addCallback(self.gotData)
+
+	def gotData(self, data):
+		self.fetching = False
 		NAMEBIN2 = check_NAMEBIN2()
-		if self.firstrun:
-			data = self.webif_data
-			self.firstrun = False
-		else:
-			data = self.readXML(typ=self.what)
+		self.firstrun = False
 		self.out = []
 		self.itemheight = 25
 		if not isinstance(data, str):
@@ -845,17 +865,17 @@ class oscInfo(Screen, OscamInfo):
 					if i != "":
 						self.out.append(self.buildLogListEntry((i,)))
 			if self.what == "c":
-				self.setTitle(_("Client Info ( %s-Version: %s )") % (NAMEBIN2, self.getVersion()))
+				self.setTitle(_("Client Info ( %s-Version: %s )") % (NAMEBIN2, self.version))
 				self["key_green"].setText("")
 				self["key_yellow"].setText(_("Servers"))
 				self["key_blue"].setText(_("Log"))
 			elif self.what == "s":
-				self.setTitle(_("Server Info ( %s-Version: %s )") % (NAMEBIN2, self.getVersion()))
+				self.setTitle(_("Server Info ( %s-Version: %s )") % (NAMEBIN2, self.version))
 				self["key_green"].setText(_("Clients"))
 				self["key_yellow"].setText("")
 				self["key_blue"].setText(_("Log"))
 			elif self.what == "l":
-				self.setTitle(_("%s Log ( %s-Version: %s )") % (NAMEBIN2, NAMEBIN2, self.getVersion()))
+				self.setTitle(_("%s Log ( %s-Version: %s )") % (NAMEBIN2, NAMEBIN2, self.version))
 				self["key_green"].setText(_("Clients"))
 				self["key_yellow"].setText(_("Servers"))
 				self["key_blue"].setText("")
@@ -4,7 +4,7 @@ from os import system, unlink
 from os.path import normpath
 from Screens.Screen import Screen
 from Screens.ParentalControlSetup import ProtectedScreen
-from enigma import eConsoleAppContainer, eDVBDB, eTimer, eSize, ePoint, getDesktop
+from enigma import eConsoleAppContainer, eTimer, eSize, ePoint, getDesktop
 
 from Components.ActionMap import ActionMap, NumberActionMap, HelpableActionMap
 from Components.config import config, ConfigSubsection, ConfigSelection, ConfigYesNo, ConfigText, configfile
@@ -14,6 +14,7 @@ from Components.PluginList import *
 from Components.Label import Label
 from Components.Language import language
 from Components.ServiceList import refreshServiceList
+from Components.BouquetIndex import reloadBouquets, reloadServicelist
 from Components.Harddisk import harddiskmanager
 from Components.Sources.StaticText import StaticText
 from Components.SystemInfo import SystemInfo, hassoftcaminstalled
@@ -455,8 +456,8 @@ class PluginDownloadBrowser(Screen):
 			plugins.readPluginList(resolveFilename(SCOPE_PLUGINS))
 		if self.reload_settings:
 			self["text"].setText(_("Reloading bouquets and services..."))
-			eDVBDB.getInstance().reloadBouquets()
-			eDVBDB.getInstance().reloadServicelist()
+			reloadBouquets()
+			reloadServicelist()
 		plugins.readPluginList(resolveFilename(SCOPE_PLUGINS))
 		self.container.appClosed.remove(self.runFinished)
 		self.container.dataAvail.remove(self.dataAvail)
@@ -1,4 +1,4 @@
-from enigma import eRCInput, eTimer, eWindow  # , getDesktop
+from enigma import eGetEnigmaDebugLvl, eRCInput, eTimer, eWindow  # , getDesktop
 
 from skin import GUI_SKIN_ID, applyAllAttributes
 from Components.config import config
@@ -93,6 +93,10 @@ class Screen(dict):
 			x()
 
 	def doClose(self):  # Never call this directly - it will be called from the session!
+		if eGetEnigmaDebugLvl() >= 4:
+			pushed, saved = self.getChangeStatistics()
+			if pushed or saved:
+				print("[Screen] Screen '%s' pushed %d changes, %d saved by batching." % (self.skinName, pushed, saved))
 		self.hide()
 		for x in self.onClose:
 			x()
@@ -141,6 +145,19 @@ class Screen(dict):
 			if isinstance(val, GUIComponent) or isinstance(val, Source):
 				val.onHide()
 
+	def getChangeStatistics(self):
+		# Returns the changes pushed by the sources of the renderers and the ones saved by batching them.
+		pushed = saved = 0
+		sources = set()
+		for val in self.renderer:
+			while getattr(val, "source", None) is not None:  # up to the source, destroyed ones have no attributes left
+				val = val.source
+			if val not in sources:
+				sources.add(val)
+				pushed += val.changes_pushed
+				saved += val.changes_saved
+		return pushed, saved
+
 	def getScreenPath(self):
 		return self.screenPath
 
@@ -1,11 +1,10 @@
 from calendar import timegm
 from datetime import datetime
-from json import load
+from email.utils import parsedate
 from os import listdir
 from time import altzone, gmtime, strftime
-from urllib.request import urlopen
 
-from enigma import eTimer, eDVBDB
+from enigma import eTimer
 from Screens.ChoiceBox import ChoiceBox
 from Screens.MessageBox import MessageBox
 from Screens.ParentalControlSetup import ProtectedScreen
@@ -14,6 +13,7 @@ from Screens.Standby import TryQuitMainloop
 from Screens.TextBox import TextBox
 from Screens.About import CommitInfo
 from Components.config import config
+from Components.BouquetIndex import reloadBouquets, reloadServicelist
 from Components.ActionMap import ActionMap
 from Components.Opkg import OpkgComponent
 from Components.Language import language
@@ -22,6 +22,7 @@ from Components.Slider import Slider
 from Tools.BoundFunction import boundFunction
 from Tools.Directories import fileExists
 from Tools.HardwareInfo import HardwareInfo
+from Tools.HttpClient import httpClient
 
 
 class UpdatePlugin(Screen, ProtectedScreen):
@@ -72,18 +73,24 @@ class UpdatePlugin(Screen, ProtectedScreen):
 	def checkTraficLight(self):
 		self.activityTimer.callback.remove(self.checkTraficLight)
 		self.activityTimer.start(100, False)
-		status = None
+		# fetch the trafficlight json from the website, the activity slider keeps moving meanwhile
+		httpClient.getJson("https://openpli.org/trafficlight", timeout=5, owner=self).addCallbacks(self.gotTraficLight, self.gotTraficLightError)
+
+	def gotTraficLightError(self, failure):
+		print('[UpdatePlugin] Error in get status', failure.getErrorMessage())
+		self.gotTraficLight(None)
+
+	def gotTraficLight(self, status):
 		message = None
 		abort = False
 		picon = MessageBox.TYPE_ERROR
-		url = "https://openpli.org/trafficlight"
-
-		# try to fetch the trafficlight json from the website
-		try:
-			status = dict(load(urlopen(url, timeout=5)))
-			print("[SoftwareUpdate] status is: ", status)
-		except Exception as er:
-			print('[UpdatePlugin] Error in get status', er)
+		if status is not None:
+			try:
+				status = dict(status)
+				print("[SoftwareUpdate] status is: ", status)
+			except Exception as er:
+				print('[UpdatePlugin] Error in get status', er)
+				status = None
 
 		# process the status fetched
 		if status is not None:
@@ -140,13 +147,18 @@ class UpdatePlugin(Screen, ProtectedScreen):
 			self.startActualUpdate(True)
 
 	def getLatestImageTimestamp(self):
-		def gettime(url):
-			try:
-				return strftime("%Y-%m-%d %H:%M:%S", gmtime(timegm(urlopen("%s/Packages.gz" % url).info().getdate('Last-Modified')) - altzone))
-			except Exception as er:
-				print('[UpdatePlugin] Error in get timestamp', er)
-				return ""
-		return sorted([gettime(open("/etc/opkg/%s" % file, "r").readlines()[0].split()[2]) for file in listdir("/etc/opkg") if not file.startswith("3rd-party") and file not in ("arch.conf", "opkg.conf", "picons-feed.conf")], reverse=True)[0]
+		# the feeds are asked at the same time, returns a Deferred firing with the newest date
+		from twisted.internet.defer import gatherResults
+
+		def gettime(response):
+			return strftime("%Y-%m-%d %H:%M:%S", gmtime(timegm(parsedate(response.getHeader('Last-Modified'))) - altzone))
+
+		def failed(failure):
+			print('[UpdatePlugin] Error in get timestamp', failure.getErrorMessage())
+			return ""
+
+		urls = [open("/etc/opkg/%s" % file, "r").readlines()[0].split()[2] for file in listdir("/etc/opkg") if not file.startswith("3rd-party") and file not in ("arch.conf", "opkg.conf", "picons-feed.conf")]
+		return gatherResults([httpClient.request("%s/Packages.gz" % url, method="HEAD", owner=self).addCallback(gettime).addErrback(failed) for url in urls]).addCallback(lambda times: sorted(times, reverse=True)[0] if times else "")
 
 	def startActualUpdate(self, answer):
 		if answer:
@@ -164,6 +176,30 @@ class UpdatePlugin(Screen, ProtectedScreen):
 	def showUpdateCompletedMessage(self):
 		self.setEndMessage(ngettext("Update completed, %d package was installed.", "Update completed, %d packages were installed.", self.packages) % self.packages)
 
+	def showUpgradeChoices(self, latestImageTimestamp):
+		if self.total_packages:
+			if latestImageTimestamp:
+				message = _("Do you want to update your receiver to %s?") % latestImageTimestamp + "\n"
+			else:
+				message = _("Do you want to update your receiver?") + "\n"
+			message += "(" + (ngettext("%s updated package available", "%s updated packages available", self.total_packages) % self.total_packages) + ")"
+			if self.total_packages > 150:
+				choices = [(_("Update and reboot"), "cold")]
+				message += " " + _("Reflash recommended!")
+			else:
+				choices = [(_("Update and reboot (recommended)"), "cold"),
+				(_("Update and ask to reboot"), "hot")]
+			choices.append((_("Update channel list only"), "channels"))
+			choices.append((_("Show packages to be updated"), "showlist"))
+		else:
+			message = _("No updates available")
+			choices = []
+		if fileExists("/home/root/opkgupgrade.log"):
+			choices.append((_("Show latest update log"), "log"))
+		choices.append((_("Show latest commits"), "commits"))
+		choices.append((_("Cancel"), ""))
+		self.session.openWithCallback(self.startActualUpgrade, ChoiceBox, title=message, list=choices, windowTitle=self.title)
+
 	def opkgCallback(self, event, param):
 		if event == OpkgComponent.EVENT_DOWNLOAD:
 			self.status.text = _("Downloading")
@@ -208,28 +244,9 @@ class UpdatePlugin(Screen, ProtectedScreen):
 				self.total_packages = len(self.opkg.getFetchedList())
 				if self.total_packages:
 					self.update_step = 100 / self.total_packages
-					latestImageTimestamp = self.getLatestImageTimestamp()
-					if latestImageTimestamp:
-						message = _("Do you want to update your receiver to %s?") % latestImageTimestamp + "\n"
-					else:
-						message = _("Do you want to update your receiver?") + "\n"
-					message += "(" + (ngettext("%s updated package available", "%s updated packages available", self.total_packages) % self.total_packages) + ")"
-					if self.total_packages > 150:
-						choices = [(_("Update and reboot"), "cold")]
-						message += " " + _("Reflash recommended!")
-					else:
-						choices = [(_("Update and reboot (recommended)"), "cold"),
-						(_("Update and ask to reboot"), "hot")]
-					choices.append((_("Update channel list only"), "channels"))
-					choices.append((_("Show packages to be updated"), "showlist"))
+					self.getLatestImageTimestamp().addCallback(self.showUpgradeChoices)
 				else:
-					message = _("No updates available")
-					choices = []
-				if fileExists("/home/root/opkgupgrade.log"):
-					choices.append((_("Show latest update log"), "log"))
-				choices.append((_("Show latest commits"), "commits"))
-				choices.append((_("Cancel"), ""))
-				self.session.openWithCallback(self.startActualUpgrade, ChoiceBox, title=message, list=choices, windowTitle=self.title)
+					self.showUpgradeChoices(None)
 			elif self.channellist_only > 0:
 				if self.channellist_only == 1:
 					self.setEndMessage(_("Could not find installed channel list."))
@@ -243,8 +260,8 @@ class UpdatePlugin(Screen, ProtectedScreen):
 					self.channellist_only += 1
 				elif self.channellist_only == 4:
 					self.showUpdateCompletedMessage()
-					eDVBDB.getInstance().reloadBouquets()
-					eDVBDB.getInstance().reloadServicelist()
+					reloadBouquets()
+					reloadServicelist()
 			elif self.error == 0:
 				self.showUpdateCompletedMessage()
 			else:
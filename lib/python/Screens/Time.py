@@ -56,7 +56,9 @@ class Time(Setup):
 		Setup.selectionChanged(self)
 
 	def useGeolocation(self):
-		geolocationData = geolocation.getGeolocationData(fields="status,message,timezone,proxy")
+		geolocation.fetchGeolocationData(fields="status,message,timezone,proxy", owner=self).addCallback(self.gotGeolocationData)
+
+	def gotGeolocationData(self, geolocationData):
 		if geolocationData.get("proxy", True):
 			self.session.open(MessageBox, 'Geolocation is not available.', MessageBox.TYPE_INFO, timeout=3)
 			return
@@ -238,7 +240,10 @@ class TimeWizard(ConfigListScreen, Screen, Rc):
 		self["config"].setList(self.list)
 
 	def useGeolocation(self):
-		geolocationData = geolocation.getGeolocationData(fields="status,message,timezone,proxy")
+		self["text"].setText(_("Retrieving geolocation..."))
+		geolocation.fetchGeolocationData(fields="status,message,timezone,proxy", owner=self).addCallback(self.gotGeolocationData)
+
+	def gotGeolocationData(self, geolocationData):
 		if geolocationData.get("proxy", True):
 			self["text"].setText(_("Geolocation is not available."))
 			return
@@ -1,7 +1,7 @@
 import sys
 import os
 from time import time
-from Tools.Profile import profile, profile_final
+from Tools.Profile import profile, profile_final, profiled
 profile("PYTHON_START")
 
 # Don't remove this line. It may seem to do nothing, but if removed,
@@ -275,6 +275,7 @@ class Session:
 			self.summary.show()
 			screen.addSummary(self.summary)
 
+	@profiled(lambda self, screen, *args: "screen " + screen.__name__)
 	def doInstantiateDialog(self, screen, arguments, kwargs, desktop):
 		# create dialog
 		dlg = screen(self, *arguments, **kwargs)
@@ -563,7 +564,7 @@ def runScreenTest():
 	session.nav.shutdown()
 
 	profile("configfile.save")
-	configfile.save()
+	configfile.save(compact=True)
 	from Screens import InfoBarGenerics
 	InfoBarGenerics.saveResumePoints()
 
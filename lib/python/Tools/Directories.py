@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 import errno
+from functools import lru_cache
 from inspect import stack
 import os
 from os import F_OK, R_OK, W_OK, access, chmod, listdir, makedirs, mkdir, readlink, rename, rmdir, sep, stat, statvfs, symlink, utime, walk
@@ -8,6 +9,7 @@ from enigma import eEnv, getDesktop, eGetEnigmaDebugLvl
 from errno import ENOENT, EXDEV
 from re import compile
 from stat import S_IMODE
+from sys import _getframe
 from unicodedata import normalize
 from xml.etree.cElementTree import Element, ParseError, fromstring, parse
 
@@ -98,71 +100,87 @@ def addInList(*paths):
 skinResolveList = []
 lcdskinResolveList = []
 fontsResolveList = []
+resolveDirIndex = {}  # Directory -> frozenset of entry names, used by itemExists().
+pluginPaths = {}  # Calling module file -> plugin directory, used by getPluginPath().
+RESOLVE_CACHE_SIZE = 2048
 
 
-def resolveFilename(scope, base="", path_prefix=None):
-	# You can only use the ~/ if we have a prefix directory.
-	if base.startswith("~/"):
-		assert path_prefix is not None  # Assert only works in debug mode!
-		if path_prefix:
-			base = pathjoin(path_prefix, base[2:])
-		else:
-			print("[Directories] Warning: resolveFilename called with base starting with '~/' but 'path_prefix' is None!")
-	# Don't further resolve absolute paths.
-	if base.startswith("/"):
-		return normpath(base)
-	# If an invalid scope is specified log an error and return None.
-	if scope not in defaultPaths:
-		print("[Directories] Error: Invalid scope=%d provided to resolveFilename!" % scope)
-		return None
-	# Ensure that the defaultPaths directories that should exist do exist.
-	path, flag = defaultPaths.get(scope)
-	if flag == PATH_CREATE and not pathExists(path):
+# The skin and font resolve lists, the directory index and the cache of
+# resolved names are built lazily and must be cleared whenever the selected
+# skins change or files may have been added to or removed from the lists.
+#
+def clearResolveLists():
+	global skinResolveList, lcdskinResolveList, fontsResolveList
+	skinResolveList = []
+	lcdskinResolveList = []
+	fontsResolveList = []
+	resolveDirIndex.clear()
+	resolveScopeItem.cache_clear()
+
+
+def getResolveStats():
+	info = resolveScopeItem.cache_info()
+	return {
+		"hits": info.hits,
+		"misses": info.misses,
+		"size": info.currsize,
+		"directories": len(resolveDirIndex)
+	}
+
+
+def dirEntries(path):
+	entries = resolveDirIndex.get(path)
+	if entries is None:
 		try:
-			makedirs(path)
-		except (IOError, OSError) as err:
-			print("[Directories] Error %d: Couldn't create directory '%s' (%s)" % (err.errno, path, err.strerror))
-			return None
-	# Remove any suffix data and restore it at the end.
-	suffix = None
-	data = base.split(":", 1)
-	if len(data) > 1:
-		base = data[0]
-		suffix = data[1]
-	path = base
+			with os.scandir(path) as it:
+				entries = frozenset([entry.name for entry in it])
+		except OSError:
+			entries = frozenset()
+		resolveDirIndex[path] = entries
+	return entries
+
+
+def itemExists(resolveList, base):
+	baseList = [base]
+	if base.endswith(".png"):
+		baseList.append("%s%s" % (base[:-3], "svg"))
+	elif base.endswith(".svg"):
+		baseList.append("%s%s" % (base[:-3], "png"))
+	for item in resolveList:
+		for base in baseList:
+			file = pathjoin(item, base)
+			directory, name = os.path.split(file)
+			if name in dirEntries(directory) if name else pathExists(file):
+				return file
 
-	def itemExists(resolveList, base):
-		baseList = [base]
-		if base.endswith(".png"):
-			baseList.append("%s%s" % (base[:-3], "svg"))
-		elif base.endswith(".svg"):
-			baseList.append("%s%s" % (base[:-3], "png"))
-		for item in resolveList:
-			for base in baseList:
-				file = pathjoin(item, base)
-				if pathExists(file):
-					return file
 
-	# If base is "" then set path to the scope.  Otherwise use the scope to resolve the base filename.
-	if base == "":
-		path, flags = defaultPaths.get(scope)
-		# If the scope is SCOPE_CURRENT_SKIN or SCOPE_ACTIVE_SKIN append the current skin to the scope path.
-		if scope in (SCOPE_CURRENT_SKIN, SCOPE_ACTIVE_SKIN):
-			# This import must be here as this module finds the config file as part of the config initialisation.
-			from Components.config import config
-			skin = dirname(config.skin.primary_skin.value)
-			path = pathjoin(path, skin)
-		elif scope in (SCOPE_CURRENT_PLUGIN_ABSOLUTE, SCOPE_CURRENT_PLUGIN_RELATIVE):
-			callingCode = normpath(stack()[1][1])
-			plugins = normpath(defaultPaths[SCOPE_PLUGINS][0])
-			path = None
-			if comparePath(plugins, callingCode):
-				pluginCode = callingCode[len(plugins) + 1:].split(sep)
-				if len(pluginCode) > 2:
-					relative = "%s%s%s" % (pluginCode[0], sep, pluginCode[1])
-					path = pathjoin(plugins, relative)
-	elif scope in (SCOPE_CURRENT_SKIN, SCOPE_ACTIVE_SKIN):
-		global skinResolveList
+# Return the directory of the plugin that contains the module file
+# callingCode, or None if the file is not part of a plugin.  The result
+# is cached per module file.
+#
+def getPluginPath(callingCode):
+	if callingCode in pluginPaths:
+		return pluginPaths[callingCode]
+	plugins = normpath(defaultPaths[SCOPE_PLUGINS][0])
+	path = None
+	callingPath = normpath(callingCode)
+	if comparePath(plugins, callingPath):
+		pluginCode = callingPath[len(plugins) + 1:].split(sep)
+		if len(pluginCode) > 2:
+			path = pathjoin(plugins, "%s%s%s" % (pluginCode[0], sep, pluginCode[1]))
+	pluginPaths[callingCode] = path
+	return path
+
+
+# Resolve a file in one of the scopes that search a list of directories.
+# The result, including misses, is cached as this is done for every pixmap
+# and font a skin uses.
+#
+@lru_cache(maxsize=RESOLVE_CACHE_SIZE)
+def resolveScopeItem(scope, base):
+	global skinResolveList, lcdskinResolveList, fontsResolveList
+	path = base
+	if scope in (SCOPE_CURRENT_SKIN, SCOPE_ACTIVE_SKIN):
 		if not skinResolveList:
 			# This import must be here as this module finds the config file as part of the config initialisation.
 			from Components.config import config
@@ -179,7 +197,6 @@ def resolveFilename(scope, base="", path_prefix=None):
 		if file:
 			path = file
 	elif scope == SCOPE_CURRENT_LCDSKIN:
-		global lcdskinResolveList
 		if not lcdskinResolveList:
 			# This import must be here as this module finds the config file as part of the config initialisation.
 			from Components.config import config
@@ -199,7 +216,6 @@ def resolveFilename(scope, base="", path_prefix=None):
 		if file:
 			path = file
 	elif scope == SCOPE_FONTS:
-		global fontsResolveList
 		if not fontsResolveList:
 			# This import must be here as this module finds the config file as part of the config initialisation.
 			from Components.config import config
@@ -228,22 +244,76 @@ def resolveFilename(scope, base="", path_prefix=None):
 				)
 		for item in fontsResolveList:
 			file = pathjoin(item, base)
-			if pathExists(file):
+			directory, name = os.path.split(file)
+			if name in dirEntries(directory) if name else pathExists(file):
 				path = file
 				break
+	path = normpath(path)
+	# If the path is a directory then ensure that it ends with a "/".
+	if isdir(path) and not path.endswith("/"):
+		path += "/"
+	return path
+
+
+def resolveFilename(scope, base="", path_prefix=None):
+	# You can only use the ~/ if we have a prefix directory.
+	if base.startswith("~/"):
+		assert path_prefix is not None  # Assert only works in debug mode!
+		if path_prefix:
+			base = pathjoin(path_prefix, base[2:])
+		else:
+			print("[Directories] Warning: resolveFilename called with base starting with '~/' but 'path_prefix' is None!")
+	# Don't further resolve absolute paths.
+	if base.startswith("/"):
+		return normpath(base)
+	# If an invalid scope is specified log an error and return None.
+	if scope not in defaultPaths:
+		print("[Directories] Error: Invalid scope=%d provided to resolveFilename!" % scope)
+		return None
+	# Ensure that the defaultPaths directories that should exist do exist.
+	path, flag = defaultPaths.get(scope)
+	if flag == PATH_CREATE and not pathExists(path):
+		try:
+			makedirs(path)
+		except (IOError, OSError) as err:
+			print("[Directories] Error %d: Couldn't create directory '%s' (%s)" % (err.errno, path, err.strerror))
+			return None
+	# Remove any suffix data and restore it at the end.
+	suffix = None
+	data = base.split(":", 1)
+	if len(data) > 1:
+		base = data[0]
+		suffix = data[1]
+	path = base
+
+	# If base is "" then set path to the scope.  Otherwise use the scope to resolve the base filename.
+	if base == "":
+		path, flags = defaultPaths.get(scope)
+		# If the scope is SCOPE_CURRENT_SKIN or SCOPE_ACTIVE_SKIN append the current skin to the scope path.
+		if scope in (SCOPE_CURRENT_SKIN, SCOPE_ACTIVE_SKIN):
+			# This import must be here as this module finds the config file as part of the config initialisation.
+			from Components.config import config
+			skin = dirname(config.skin.primary_skin.value)
+			path = pathjoin(path, skin)
+		elif scope in (SCOPE_CURRENT_PLUGIN_ABSOLUTE, SCOPE_CURRENT_PLUGIN_RELATIVE):
+			# Only the file name of the calling frame is needed, inspect.stack() is far too expensive.
+			plugins = normpath(defaultPaths[SCOPE_PLUGINS][0])
+			path = getPluginPath(_getframe(1).f_code.co_filename)
+	elif scope in (SCOPE_CURRENT_SKIN, SCOPE_ACTIVE_SKIN, SCOPE_CURRENT_LCDSKIN, SCOPE_FONTS):
+		path = resolveScopeItem(scope, base)
+		# If a suffix was supplied restore it.
+		if suffix is not None:
+			path = "%s:%s" % (path, suffix)
+		return path
 	elif scope == SCOPE_CURRENT_PLUGIN:
 		file = pathjoin(defaultPaths[SCOPE_PLUGINS][0], base)
 		if pathExists(file):
 			path = file
 	elif scope in (SCOPE_CURRENT_PLUGIN_ABSOLUTE, SCOPE_CURRENT_PLUGIN_RELATIVE):
-		callingCode = normpath(stack()[1][1])
 		plugins = normpath(defaultPaths[SCOPE_PLUGINS][0])
-		path = None
-		if comparePath(plugins, callingCode):
-			pluginCode = callingCode[len(plugins) + 1:].split(sep)
-			if len(pluginCode) > 2:
-				relative = pathjoin("%s%s%s" % (pluginCode[0], sep, pluginCode[1]), base)
-				path = pathjoin(plugins, relative)
+		path = getPluginPath(_getframe(1).f_code.co_filename)
+		if path is not None:
+			path = pathjoin(path, base)
 	else:
 		path, flags = defaultPaths.get(scope)
 		path = pathjoin(path, base)
@@ -83,28 +83,47 @@ class Geolocation:
 			print("[Geolocation] Using cached data.")
 			return self.geolocation
 		try:
-			response = urlopen("http://ip-api.com/json/?fields=%s" % fields, data=None, timeout=10).read()
-			if response:
-				geolocation = loads(response)
-			status = geolocation.get("status", "unknown/undefined")
-			if status and status == "success":
-				print("[Geolocation] Geolocation data retreived.")
-				for key in geolocation.keys():
-					self.geolocation[key] = geolocation[key]
-				return self.geolocation
-			else:
-				print("[Geolocation] Error: Geolocation lookup returned '%s' status!  Message '%s' returned." % (status, geolocation.get("message", None)))
+			return self.processGeolocationData(urlopen("http://ip-api.com/json/?fields=%s" % fields, data=None, timeout=10).read())
 		except URLError as err:
 			if hasattr(err, "code"):
 				print("[Geolocation] Error: Geolocation data not available! (Code: %s)" % err.code)
 			if hasattr(err, "reason"):
 				print("[Geolocation] Error: Geolocation data not available! (Reason: %s)" % err.reason)
-		except ValueError:
-			print("[Geolocation] Error: Geolocation data returned can not be processed!")
 		except Exception:
 			print("[Geolocation] Error: Geolocation network connection failed!")
 		return {}
 
+	def fetchGeolocationData(self, fields=None, useCache=True, owner=None):
+		"""Non-blocking getGeolocationData(), returns a Deferred firing with
+		the same result. A screen passed as owner cancels the lookup on close."""
+		from twisted.internet.defer import succeed
+		from Tools.HttpClient import httpClient
+		fields = self.fieldsToNumber(fields)
+		if useCache and self.checkGeolocationData(fields):
+			print("[Geolocation] Using cached data.")
+			return succeed(self.geolocation)
+
+		def fetchFailed(failure):
+			print("[Geolocation] Error: Geolocation data not available! (%s)" % failure.getErrorMessage())
+			return {}
+
+		return httpClient.get("http://ip-api.com/json/?fields=%s" % fields, owner=owner).addCallbacks(self.processGeolocationData, fetchFailed)
+
+	def processGeolocationData(self, response):
+		try:
+			geolocation = loads(response) if response else {}
+		except ValueError:
+			print("[Geolocation] Error: Geolocation data returned can not be processed!")
+			return {}
+		status = geolocation.get("status", "unknown/undefined")
+		if status and status == "success":
+			print("[Geolocation] Geolocation data retreived.")
+			for key in geolocation.keys():
+				self.geolocation[key] = geolocation[key]
+			return self.geolocation
+		print("[Geolocation] Error: Geolocation lookup returned '%s' status!  Message '%s' returned." % (status, geolocation.get("message", None)))
+		return {}
+
 	def fieldsToNumber(self, fields):
 		if fields is None:
 			fields = [x for x in geolocationFields.keys() if x not in ("message", "reverse", "status")]  # Don't include "reverse" by default as there is a performance hit!
@@ -1,8 +1,11 @@
 import os
 import time
 
+from enigma import eTimer
+
 ECM_INFO = '/tmp/ecm.info'
 EMPTY_ECM_INFO = '', '0', '0', '0'
+ECM_INFO_TICK = 1000  # Interval in ms between checks for a changed ecm.info file.
 
 old_ecm_time = time.time()
 info = {}
@@ -10,15 +13,119 @@ ecm = ''
 data = EMPTY_ECM_INFO
 
 
+# A single reader for an ecm info file shared by all users.  The file is
+# checked with one stat() per tick and only read again when its mtime or
+# size has changed, however many converters ask for it.  Users that add a
+# callback are notified when the content has changed, the file is then
+# checked by a timer which only runs while there are callbacks.  Callbacks
+# are only called from that timer, never from within a getter.
+#
+class EcmInfoFile:
+	def __init__(self, path):
+		self.path = path
+		self.stat = None
+		self.lastCheck = 0
+		self.lines = []
+		self.content = ''
+		self.info = {}
+		self.changed = False
+		self.callbacks = []
+		self.timer = None
+
+	def check(self, force=False):
+		now = time.time()
+		if not force and now - self.lastCheck < ECM_INFO_TICK / 1000.0:
+			return False
+		self.lastCheck = now
+		try:
+			st = os.stat(self.path)
+			stat = (st.st_mtime, st.st_size)
+		except OSError:
+			stat = None
+		if stat == self.stat:
+			return False
+		self.stat = stat
+		lines = []
+		if stat is not None:
+			try:
+				with open(self.path, 'r') as fd:
+					lines = fd.readlines()
+			except (IOError, OSError, UnicodeDecodeError):
+				pass
+		self.lines = lines
+		self.content = ''.join(lines)
+		self.info = {}
+		for line in lines:
+			d = line.split(':', 1)
+			if len(d) > 1:
+				self.info[d[0].strip()] = d[1].strip()
+		self.changed = True
+		return True
+
+	def poll(self):
+		self.check(force=True)
+		# also announce a change a getter has seen first
+		if self.changed:
+			self.changed = False
+			for callback in self.callbacks[:]:
+				callback()
+
+	def getStat(self):
+		self.check()
+		return self.stat
+
+	def getMtime(self):
+		self.check()
+		return self.stat and self.stat[0]
+
+	def getLines(self):
+		self.check()
+		return self.lines
+
+	def getContent(self):
+		self.check()
+		return self.content
+
+	def getInfo(self):
+		self.check()
+		return self.info
+
+	def addCallback(self, callback):
+		if callback not in self.callbacks:
+			self.callbacks.append(callback)
+		if self.timer is None:
+			self.timer = eTimer()
+			self.timer.callback.append(self.poll)
+		self.timer.start(ECM_INFO_TICK)
+
+	def removeCallback(self, callback):
+		if callback in self.callbacks:
+			self.callbacks.remove(callback)
+		if not self.callbacks and self.timer is not None:
+			self.timer.stop()
+
+
+ecmInfoFiles = {}
+
+
+def getEcmInfoFile(path=ECM_INFO):
+	ecmInfoFile = ecmInfoFiles.get(path)
+	if ecmInfoFile is None:
+		ecmInfoFile = ecmInfoFiles[path] = EcmInfoFile(path)
+	return ecmInfoFile
+
+
+ecmInfoFile = getEcmInfoFile()
+
+
 class GetEcmInfo:
 	def pollEcmData(self):
 		global data
 		global old_ecm_time
 		global info
 		global ecm
-		try:
-			ecm_time = os.stat(ECM_INFO).st_mtime
-		except:
+		ecm_time = ecmInfoFile.getMtime()
+		if ecm_time is None:
 			ecm_time = old_ecm_time
 			data = EMPTY_ECM_INFO
 			info = {}
@@ -30,14 +137,8 @@ class GetEcmInfo:
 			info['ecminterval2'] = oecmi1
 			info['ecminterval1'] = oecmi0
 			old_ecm_time = ecm_time
-			try:
-				ecm = open(ECM_INFO, 'r').readlines()
-			except:
-				ecm = ''
-			for line in ecm:
-				d = line.split(':', 1)
-				if len(d) > 1:
-					info[d[0].strip()] = d[1].strip()
+			ecm = ecmInfoFile.getLines() or ''
+			info.update(ecmInfoFile.getInfo())
 			data = self.getText()
 			return True
 		else:
@@ -0,0 +1,204 @@
+from base64 import b64encode
+from hashlib import md5
+from json import loads
+from os import urandom
+from re import findall
+from time import time
+from urllib.parse import urlsplit
+
+from twisted.internet import defer, reactor
+from twisted.web.client import Agent, HTTPConnectionPool, readBody
+from twisted.web.http_headers import Headers
+from twisted.web.iweb import IPolicyForHTTPS
+from zope.interface import implementer
+
+MAX_REQUESTS = 4 # requests running at the same time, the others wait
+MAX_CACHE = 64 # cached responses
+USER_AGENT = b"Enigma2 HbbTV/1.1.1 (+PVR+RTSP+DL;OpenPLi;;;)"
+
+
+class HttpError(Exception):
+	def __init__(self, code, body=b""):
+		Exception.__init__(self, "HTTP error %d" % code)
+		self.code = code
+		self.body = body
+
+
+class HttpResponse:
+	def __init__(self, code, headers, body):
+		self.code = code
+		self.headers = headers # lower case name -> value
+		self.body = body
+
+	def getHeader(self, name, default=None):
+		return self.headers.get(name.lower(), default)
+
+
+@implementer(IPolicyForHTTPS)
+class HttpsPolicy:
+	# like the other downloads certificates are not verified, many receivers lack a CA bundle
+	def creatorForNetloc(self, hostname, port):
+		from twisted.internet._sslverify import ClientTLSOptions
+		from twisted.internet.ssl import CertificateOptions
+		return ClientTLSOptions(hostname.decode("ascii"), CertificateOptions().getContext())
+
+
+class HttpClient:
+	"""Non-blocking HTTP client on the enigma2 reactor.
+
+	Connections are kept open and reused per host. At most max_requests
+	requests run at once, the others wait in order. A response can be
+	cached for ttl seconds; afterwards it is revalidated with its ETag or
+	Last-Modified date. Requests may be bound to a screen, they are then
+	cancelled on close and their callbacks never run."""
+
+	def __init__(self, max_requests=MAX_REQUESTS):
+		self.pool = HTTPConnectionPool(reactor, persistent=True)
+		self.pool.maxPersistentPerHost = 2
+		self.agent = Agent(reactor, HttpsPolicy(), pool=self.pool)
+		self.max_requests = max_requests
+		self.running = 0
+		self.waiting = [] # (Deferred, start function)
+		self.cache = {} # url -> (expires, etag, last modified, HttpResponse)
+
+	def request(self, url, method="GET", headers=None, timeout=10, ttl=0, auth=None, owner=None):
+		"""Returns a Deferred firing with a HttpResponse, or failing with a
+		HttpError for status codes from 400 on. auth is a (user, password)
+		tuple for basic or digest authentication. owner is a screen whose
+		close cancels the request."""
+		if isinstance(url, str):
+			url = url.encode("UTF-8")
+		cached = self.cache.get(url) if method == "GET" else None
+		if cached and cached[0] > time():
+			result = defer.succeed(cached[3])
+		else:
+			result = self.run(lambda: self.fetch(url, method, headers or {}, timeout, ttl, auth, cached))
+		if owner is None:
+			return result
+		return self.bind(owner, result)
+
+	def get(self, url, **kwargs):
+		return self.request(url, **kwargs).addCallback(lambda response: response.body)
+
+	def getJson(self, url, **kwargs):
+		return self.get(url, **kwargs).addCallback(lambda body: loads(body))
+
+	def bind(self, owner, request):
+		# the returned Deferred is left unfired when the owner closes first
+		result = defer.Deferred()
+
+		def cancel():
+			result.orphaned = True
+			request.cancel()
+
+		def done(value):
+			if cancel in owner.onClose:
+				owner.onClose.remove(cancel)
+			if not getattr(result, "orphaned", False):
+				result.callback(value)
+
+		result.orphaned = False
+		owner.onClose.append(cancel)
+		request.addBoth(done)
+		return result
+
+	def run(self, start):
+		def cancel(deferred):
+			for entry in self.waiting:
+				if entry[0] is deferred:
+					self.waiting.remove(entry)
+					break
+
+		deferred = defer.Deferred(cancel)
+		deferred.addCallback(self.started, start)
+		self.waiting.append((deferred, start))
+		self.next()
+		return deferred
+
+	def next(self):
+		while self.waiting and self.running < self.max_requests:
+			deferred, start = self.waiting.pop(0)
+			self.running += 1
+			deferred.callback(None)
+
+	def started(self, ignore, start):
+		try:
+			request = start()
+		except Exception:
+			request = defer.fail()
+		return request.addBoth(self.finished)
+
+	def finished(self, result):
+		self.running -= 1
+		self.next()
+		return result
+
+	def fetch(self, url, method, headers, timeout, ttl, auth, cached, authorization=None):
+		request = Headers({b"User-Agent": [USER_AGENT]})
+		for name, value in headers.items():
+			request.setRawHeaders(name, [value])
+		if cached:
+			if cached[1]:
+				request.setRawHeaders(b"If-None-Match", [cached[1]])
+			if cached[2]:
+				request.setRawHeaders(b"If-Modified-Since", [cached[2]])
+		if authorization:
+			request.setRawHeaders(b"Authorization", [authorization])
+		deferred = self.agent.request(method.encode("ascii"), url, request)
+		deferred.addTimeout(timeout, reactor)
+		deferred.addCallback(self.gotResponse, url, method, headers, timeout, ttl, auth, cached, authorization)
+		return deferred
+
+	def gotResponse(self, response, url, method, headers, timeout, ttl, auth, cached, authorization):
+		if response.code == 401 and auth and not authorization:
+			challenge = (response.headers.getRawHeaders(b"WWW-Authenticate") or [b""])[0]
+			authorization = self.authorize(challenge, url, method, auth)
+			if authorization: # read the body to keep the connection, then ask again
+				return readBody(response).addCallback(lambda ignore: self.fetch(url, method, headers, timeout, ttl, auth, cached, authorization))
+		return readBody(response).addCallback(self.gotBody, response, url, method, ttl, cached)
+
+	def gotBody(self, body, response, url, method, ttl, cached):
+		if response.code == 304 and cached:
+			result = cached[3]
+		elif response.code >= 400:
+			raise HttpError(response.code, body)
+		else:
+			result = HttpResponse(response.code, dict((name.decode("latin-1").lower(), values[-1].decode("latin-1")) for name, values in response.headers.getAllRawHeaders()), body)
+		etag = result.getHeader("etag")
+		modified = result.getHeader("last-modified")
+		if method == "GET" and (ttl or etag or modified):
+			if len(self.cache) >= MAX_CACHE and url not in self.cache:
+				del self.cache[min(self.cache, key=lambda key: self.cache[key][0])]
+			self.cache[url] = (time() + ttl, etag and etag.encode("latin-1"), modified and modified.encode("latin-1"), result)
+		return result
+
+	def authorize(self, challenge, url, method, auth):
+		user, password = auth
+		scheme, sep, params = challenge.decode("latin-1").partition(" ")
+		if scheme.lower() == "basic":
+			return b"Basic " + b64encode(("%s:%s" % (user, password)).encode("UTF-8"))
+		if scheme.lower() != "digest":
+			return None
+		fields = dict((name.lower(), value.strip('"')) for name, value in findall(r'(\w+)=("[^"]*"|[^,\s]*)', params))
+		split = urlsplit(url.decode("latin-1"))
+		uri = (split.path or "/") + (split.query and "?" + split.query)
+		ha1 = md5(("%s:%s:%s" % (user, fields.get("realm", ""), password)).encode("UTF-8")).hexdigest()
+		ha2 = md5(("%s:%s" % (method, uri)).encode("UTF-8")).hexdigest()
+		nonce = fields.get("nonce", "")
+		values = [("username", user), ("realm", fields.get("realm", "")), ("nonce", nonce), ("uri", uri)]
+		if "auth" in fields.get("qop", "").split(","):
+			cnonce = urandom(8).hex()
+			digest = md5(("%s:%s:00000001:%s:auth:%s" % (ha1, nonce, cnonce, ha2)).encode("UTF-8")).hexdigest()
+			values += [("qop", "auth"), ("nc", "00000001"), ("cnonce", cnonce)]
+		else:
+			digest = md5(("%s:%s:%s" % (ha1, nonce, ha2)).encode("UTF-8")).hexdigest()
+		values.append(("response", digest))
+		if "opaque" in fields:
+			values.append(("opaque", fields["opaque"]))
+		return ("Digest " + ", ".join('%s="%s"' % (name, value) if name not in ("qop", "nc") else "%s=%s" % (name, value) for name, value in values)).encode("latin-1")
+
+	def clearCache(self):
+		self.cache = {}
+
+
+httpClient = HttpClient()
@@ -358,6 +358,11 @@ def removeKeyBinding(key, context, action, wild=True):
 		else:
 			del keyBindings[contextAction]
 
+
+def hasKeyBinding(context, action):
+	return (context, action) in keyBindings
+
+
 # Returns a list of (key, flags) for a specified action.
 #
 
@@ -389,5 +394,9 @@ def getKeyBindingKeys(filterfn=lambda key: True):
 
 
 def removeKeyBindings(domain):
-	for x in keyBindings:
-		keyBindings[x] = [e for e in keyBindings[x] if e[1] != domain]
+	for x in list(keyBindings):
+		bind = [e for e in keyBindings[x] if e[1] != domain]
+		if bind:
+			keyBindings[x] = bind
+		else:
+			del keyBindings[x]
@@ -1,23 +1,162 @@
 import threading
+from heapq import heappop, heappush
+from time import time
+
 lock = threading.Lock()
 
-notifications = []
+COALESCE_WINDOW = 10 # seconds in which an identical queued notification is not added again
+
+
+class NotificationQueue:
+	"""The pending notifications as (fnc, screen, args, kwargs, id) tuples.
+
+	Entries are handed out by priority, and in order of arrival within
+	the same priority. The queue is indexed by id, so removing a popup
+	does not scan it. Callers hold lock while using the queue.
+	Consumers use notifications[0] and del notifications[0], as they did
+	with the plain list."""
+
+	def __init__(self):
+		self.heap = [] # (-priority, sequence, entry), removed entries are dropped lazily
+		self.sequence = 0
+		self.queued = set() # sequences of the entries still waiting
+		self.ids = {} # id -> set of sequences
+		self.recent = {} # coalescing key -> (time, sequence)
+		self.pruned = 0
+
+	def __len__(self):
+		return len(self.queued)
+
+	def __iter__(self):
+		return iter([item[2] for item in sorted(self.heap) if item[1] in self.queued])
+
+	def __getitem__(self, index):
+		if index != 0:
+			raise IndexError("only the first notification is accessible")
+		self.dropRemoved()
+		if not self.heap:
+			raise IndexError("no notifications")
+		return self.heap[0][2]
+
+	def __delitem__(self, index):
+		if index != 0:
+			raise IndexError("only the first notification is accessible")
+		self.pop()
+
+	def dropRemoved(self):
+		while self.heap and self.heap[0][1] not in self.queued:
+			heappop(self.heap)
+
+	def pop(self):
+		self.dropRemoved()
+		if not self.heap:
+			raise IndexError("no notifications")
+		item = heappop(self.heap)
+		self.queued.discard(item[1])
+		self.forget(item[1], item[2][4])
+		return item[2]
+
+	def forget(self, sequence, id):
+		if id is not None:
+			sequences = self.ids.get(id)
+			if sequences is not None:
+				sequences.discard(sequence)
+				if not sequences:
+					del self.ids[id]
+
+	def getCoalesceKey(self, entry):
+		fnc, screen, args, kwargs, id = entry
+		if fnc is not None: # every callback wants its own answer
+			return None
+		try:
+			key = (screen, id, args, frozenset(kwargs.items()))
+			hash(key)
+		except TypeError:
+			return None
+		return key
+
+	def add(self, entry, priority=0):
+		"""Queue entry unless an identical one was queued in the last
+		COALESCE_WINDOW seconds and is still waiting. Returns True when the
+		entry was queued."""
+		now = time()
+		key = self.getCoalesceKey(entry)
+		if key is not None:
+			recent = self.recent.get(key)
+			if recent and now - recent[0] < COALESCE_WINDOW and recent[1] in self.queued:
+				return False
+			if now - self.pruned > COALESCE_WINDOW:
+				self.recent = dict((k, v) for k, v in self.recent.items() if now - v[0] < COALESCE_WINDOW)
+				self.pruned = now
+			self.recent[key] = (now, self.sequence)
+		heappush(self.heap, (-priority, self.sequence, entry))
+		self.queued.add(self.sequence)
+		if entry[4] is not None:
+			self.ids.setdefault(entry[4], set()).add(self.sequence)
+		self.sequence += 1
+		return True
+
+	def append(self, entry):
+		self.add(entry)
+
+	def hasId(self, id):
+		return id in self.ids
+
+	def removeId(self, id):
+		sequences = self.ids.pop(id, None)
+		if sequences:
+			self.queued -= sequences
+			self.dropRemoved()
+		return bool(sequences)
+
+
+notifications = NotificationQueue()
 notificationAdded = []
+dispatchPending = False
 
 # notifications which are currently on screen (and might be closed by similiar notifications)
 current_notifications = []
 
+screenFlags = {} # screen -> (is MessageBox, is Standby)
+
+
+def __getScreenFlags(screen):
+	flags = screenFlags.get(screen)
+	if flags is None:
+		name = repr(screen)
+		flags = screenFlags[screen] = (".MessageBox'>" in name, ".Standby'>" in name)
+	return flags
+
 
-def __AddNotification(fnc, screen, id, *args, **kwargs):
-	if ".MessageBox'>" in repr(screen):
+def __dispatch():
+	global dispatchPending
+	lock.acquire(True)
+	dispatchPending = False
+	lock.release()
+	# listeners take one notification per call, call them again as long as they do
+	count = None
+	while notifications and len(notifications) != count:
+		count = len(notifications)
+		for x in notificationAdded[:]:
+			x()
+
+
+def __AddNotification(fnc, screen, id, priority, *args, **kwargs):
+	global dispatchPending
+	isMessageBox, isStandby = __getScreenFlags(screen)
+	if isMessageBox:
 		kwargs["simple"] = True
-	if ".Standby'>" in repr(screen):
+	if isStandby:
 		removeCIdialog()
 	lock.acquire(True)
-	notifications.append((fnc, screen, args, kwargs, id))
+	dispatch = notifications.add((fnc, screen, args, kwargs, id), priority) and not dispatchPending
+	if dispatch:
+		dispatchPending = True
 	lock.release()
-	for x in notificationAdded:
-		x()
+	# all notifications added until the main loop runs again are announced once
+	if dispatch:
+		from twisted.internet import reactor
+		reactor.callFromThread(__dispatch)
 
 
 def AddNotification(screen, *args, **kwargs):
@@ -25,16 +164,16 @@ def AddNotification(screen, *args, **kwargs):
 
 
 def AddNotificationWithCallback(fnc, screen, *args, **kwargs):
-	__AddNotification(fnc, screen, None, *args, **kwargs)
+	__AddNotification(fnc, screen, None, 0, *args, **kwargs)
 
 
 def AddNotificationParentalControl(fnc, screen, *args, **kwargs):
 	RemovePopup("Parental control")
-	__AddNotification(fnc, screen, "Parental control", *args, **kwargs)
+	__AddNotification(fnc, screen, "Parental control", 0, *args, **kwargs)
 
 
 def AddNotificationWithID(id, screen, *args, **kwargs):
-	__AddNotification(None, screen, id, *args, **kwargs)
+	__AddNotification(None, screen, id, 0, *args, **kwargs)
 
 # we don't support notifications with callback and ID as this
 # would require manually calling the callback on cancelled popups.
@@ -43,27 +182,26 @@ def AddNotificationWithID(id, screen, *args, **kwargs):
 def RemovePopup(id):
 	# remove similiar notifications
 	print("RemovePopup, id =", id)
-	for x in notifications:
-		if x[4] and x[4] == id:
-			print("(found in notifications)")
-			lock.acquire(True)
-			notifications.remove(x)
-			lock.release()
+	lock.acquire(True)
+	if notifications.removeId(id):
+		print("(found in notifications)")
+	lock.release()
 
-	for x in current_notifications:
-		if x[0] == id:
-			print("(found in current notifications)")
-			x[1].close()
+	for x in [x for x in current_notifications if x[0] == id]:
+		print("(found in current notifications)")
+		x[1].close()
 
 
 from Screens.MessageBox import MessageBox
 
 
-def AddPopup(text, type, timeout, id=None):
+def AddPopup(text, type, timeout, id=None, priority=None):
 	if id is not None:
 		RemovePopup(id)
+	if priority is None: # errors first
+		priority = 1 if type == MessageBox.TYPE_ERROR else 0
 	print("AddPopup, id =", id)
-	AddNotificationWithID(id, MessageBox, text=text, type=type, timeout=timeout, close_on_any_key=True)
+	__AddNotification(None, MessageBox, id, priority, text=text, type=type, timeout=timeout, close_on_any_key=True)
 
 
 def removeCIdialog():
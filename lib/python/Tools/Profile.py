@@ -1,10 +1,18 @@
 # the implementation here is a bit crappy.
+import builtins
+import os
+import sys
 import time
+from _thread import get_ident
+from json import dump, load
 from Tools.Directories import resolveFilename, SCOPE_CONFIG
 
 PERCENTAGE_START = 0
 PERCENTAGE_END = 100
 
+REPORT_MIN_TIME = 0.005 # spans shorter than this are left out of the timeline
+REPORT_TOP = 25 # lines in the lists of slow imports and changes
+
 profile_start = time.time()
 
 profile_data = {}
@@ -29,8 +37,159 @@ except IOError:
 	print("WARNING: couldn't open profile file!")
 
 
+class Span:
+	__slots__ = ("name", "start", "duration", "children")
+
+	def __init__(self, name, start):
+		self.name = name
+		self.start = start
+		self.duration = 0
+		self.children = []
+
+
+class NullSpan:
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *args):
+		return False
+
+
+nullSpan = NullSpan()
+
+
+class BootProfiler:
+	"""Records the boot as a tree of timed spans.
+
+	The checkpoints of profile() start the top level phases, everything
+	timed while a phase runs is nested below it: imports of modules,
+	plugins, skin files and screens. Only the main thread is recorded.
+	profile_final() ends the recording and writes the report, compared
+	with the previous boot."""
+
+	def __init__(self, start):
+		self.thread = get_ident()
+		self.root = Span("boot", start)
+		self.stack = [self.root]
+		self.originalImport = builtins.__import__
+		builtins.__import__ = self.timedImport
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *args):
+		self.end()
+		return False
+
+	def span(self, name):
+		return self.begin(name) if get_ident() == self.thread else nullSpan
+
+	def begin(self, name):
+		span = Span(name, time.time())
+		self.stack[-1].children.append(span)
+		self.stack.append(span)
+		return self
+
+	def end(self):
+		span = self.stack.pop()
+		span.duration = time.time() - span.start
+
+	def checkpoint(self, id):
+		if len(self.stack) > 2: # inside a nested span, the phase goes on
+			self.stack[-1].children.append(Span("@" + id, time.time()))
+			return
+		if len(self.stack) == 2:
+			self.end()
+		self.begin(id)
+
+	def timedImport(self, name, globals=None, locals=None, fromlist=(), level=0):
+		if level and globals:
+			try:
+				package = globals.get("__package__") or globals["__name__"].rpartition(".")[0]
+				module = package.rsplit(".", level - 1)[0] + "." + name if name else package.rsplit(".", level - 1)[0]
+			except Exception:
+				module = name
+		else:
+			module = name
+		if module in sys.modules or get_ident() != self.thread:
+			return self.originalImport(name, globals, locals, fromlist, level)
+		self.begin("import " + module)
+		try:
+			return self.originalImport(name, globals, locals, fromlist, level)
+		finally:
+			self.end()
+
+	def finish(self):
+		builtins.__import__ = self.originalImport
+		while len(self.stack) > 1:
+			self.end()
+		self.root.duration = time.time() - self.root.start
+		self.writeReport()
+
+	def writeReport(self):
+		times = {}
+		imports = []
+
+		def collect(span, path):
+			key = path + span.name
+			times[key] = times.get(key, 0) + span.duration
+			if span.name.startswith("import "):
+				imports.append((span.duration - sum(child.duration for child in span.children), span.name[7:]))
+			for child in span.children:
+				collect(child, key + " > ")
+
+		for child in self.root.children:
+			collect(child, "")
+		filename = resolveFilename(SCOPE_CONFIG, "bootprofile")
+		try:
+			with open(filename + ".json", "r") as f:
+				previous = load(f)
+		except Exception:
+			previous = {}
+		try:
+			with open(filename + ".json", "w") as f:
+				dump({"total": self.root.duration, "spans": times}, f)
+		except Exception as e:
+			print("[Profile] Failed to save boot profile data:", e)
+		before = previous.get("spans", {})
+
+		def delta(key, duration):
+			return "%+8.3f" % (duration - before[key]) if key in before else "%8s" % "new"
+
+		lines = ["Boot profile, %.3fs in total" % self.root.duration + (", previous boot %.3fs" % previous["total"] if "total" in previous else ""), "", "   total     self    delta  span"]
+
+		def report(span, path, depth):
+			key = path + span.name
+			if span.duration >= REPORT_MIN_TIME or span.name.startswith("@"):
+				lines.append("%8.3f %8.3f %s  %s%s" % (span.duration, span.duration - sum(child.duration for child in span.children), delta(key, span.duration), "  " * depth, span.name))
+				for child in span.children:
+					report(child, key + " > ", depth + 1)
+
+		for child in self.root.children:
+			report(child, "", 0)
+		lines += ["", "Slowest imports (self time):"]
+		lines += ["%8.3f  %s" % item for item in sorted(imports, reverse=True)[:REPORT_TOP]]
+		if before:
+			changes = sorted(((duration - before.get(key, 0), key) for key, duration in times.items()), key=lambda item: -abs(item[0]))
+			changes = ["%+8.3f  %s" % item for item in changes[:REPORT_TOP] if abs(item[0]) >= REPORT_MIN_TIME]
+			if changes:
+				lines += ["", "Largest changes against the previous boot:"] + changes
+		try:
+			with open(filename + ".txt", "w") as f:
+				f.write("\n".join(lines) + "\n")
+			print("[Profile] Boot profile written to %s.txt" % filename)
+		except Exception as e:
+			print("[Profile] Failed to write boot profile:", e)
+
+
+# the detailed profile is only recorded when asked for, otherwise the spans cost a function call
+boot_profiler = BootProfiler(profile_start) if os.environ.get("ENIGMA_BOOT_PROFILE") else None
+
+
 def profile(id):
 	now = time.time() - profile_start
+	if boot_profiler:
+		boot_profiler.checkpoint(id)
 	if profile_file:
 		profile_file.write("%7.3f\t%s\n" % (now, id))
 
@@ -46,8 +205,35 @@ def profile(id):
 				pass
 
 
+def profileSpan(name):
+	"""Context manager timing a nested part of the boot."""
+	return boot_profiler.span(name) if boot_profiler else nullSpan
+
+
+def profiled(getName):
+	"""Decorator timing each call during the boot. getName gets the
+	arguments of the call and returns the name of the span. Without
+	ENIGMA_BOOT_PROFILE the function is returned unchanged."""
+	def decorate(function):
+		if not boot_profiler:
+			return function
+
+		def wrapper(*args, **kwargs):
+			if not boot_profiler:
+				return function(*args, **kwargs)
+			with boot_profiler.span(getName(*args, **kwargs)):
+				return function(*args, **kwargs)
+		wrapper.__name__ = function.__name__
+		wrapper.__doc__ = function.__doc__
+		return wrapper
+	return decorate
+
+
 def profile_final():
-	global profile_file
+	global profile_file, boot_profiler
 	if profile_file is not None:
 		profile_file.close()
 		profile_file = None
+	if boot_profiler:
+		boot_profiler.finish()
+		boot_profiler = None
@@ -1,10 +1,28 @@
 import enigma
+import os
+import pickle
 import xml.etree.ElementTree
 
+import keyids
 from keyids import KEYIDS
+from Tools.Directories import resolveFilename, SCOPE_CONFIG
 
 # these are only informational (for help)...
-from Tools.KeyBindings import addKeyBinding
+from Tools.KeyBindings import addKeyBinding, removeKeyBindings
+
+KEYMAP_CACHE_FILE = "keymaps.pkl"
+KEYMAP_CACHE_VERSION = 1
+KEYMAP_CACHE_SAVE_DELAY = 1000 # ms, the keymaps read at start are written at once
+
+FLAGS = {'m': 1, 'b': 2, 'r': 4, 'l': 8}
+
+# compiled keymap entries
+BIND_KEY = 0 # device, key id, flags, context, action
+BIND_TOGGLE = 1 # device, key id
+BIND_TRANSLATION = 2 # device, key in, key out, toggle
+
+keymapCache = None # filename -> ((mtime, size), bindings)
+keymapCacheTimer = None
 
 
 class KeymapError(Exception):
@@ -34,16 +52,14 @@ def getKeyId(id):
 	return keyid
 
 
-def parseKeys(context, filename, actionmap, device, keys):
+def parseKeys(context, filename, bindings, device, keys):
 	for x in keys.findall("key"):
 		get_attr = x.attrib.get
 		mapto = get_attr("mapto")
 		id = get_attr("id")
 		flags = get_attr("flags")
 
-		flag_ascii_to_id = lambda x: {'m': 1, 'b': 2, 'r': 4, 'l': 8}[x]
-
-		flags = sum(map(flag_ascii_to_id, flags))
+		flags = sum(FLAGS[flag] for flag in flags)
 
 		assert mapto, "[keymapparser] %s: must specify mapto in context %s, id '%s'" % (filename, context, id)
 		assert id, "[keymapparser] %s: must specify id in context %s, mapto '%s'" % (filename, context, mapto)
@@ -51,16 +67,15 @@ def parseKeys(context, filename, actionmap, device, keys):
 
 		keyid = getKeyId(id)
 #				print "[keymapparser] " + context + "::" + mapto + " -> " + device + "." + hex(keyid)
-		actionmap.bindKey(filename, device, keyid, flags, context, mapto)
-		addKeyBinding(filename, keyid, context, mapto, flags)
+		bindings.append((BIND_KEY, device, keyid, flags, context, mapto))
 
 
-def parseTrans(filename, actionmap, device, keys):
+def parseTrans(filename, bindings, device, keys):
 	for x in keys.findall("toggle"):
 		get_attr = x.attrib.get
 		toggle_key = get_attr("from")
 		toggle_key = getKeyId(toggle_key)
-		actionmap.bindToggle(filename, device, toggle_key)
+		bindings.append((BIND_TOGGLE, device, toggle_key))
 
 	for x in keys.findall("key"):
 		get_attr = x.attrib.get
@@ -73,40 +88,113 @@ def parseTrans(filename, actionmap, device, keys):
 		keyin = getKeyId(keyin)
 		keyout = getKeyId(keyout)
 		toggle = int(toggle)
-		actionmap.bindTranslation(filename, device, keyin, keyout, toggle)
-
-
-def readKeymap(filename):
-	p = enigma.eActionMap.getInstance()
-	assert p
+		bindings.append((BIND_TRANSLATION, device, keyin, keyout, toggle))
 
-	try:
-		source = open(filename)
-	except:
-		print("[keymapparser] keymap file " + filename + " not found")
-		return
 
+def compileKeymap(filename, source):
+	"""Parse a keymap into the list of bindings readKeymap() applies."""
 	try:
 		dom = xml.etree.ElementTree.parse(source)
 	except:
 		raise KeymapError("[keymapparser] keymap %s not well-formed." % filename)
 
 	keymap = dom.getroot()
+	bindings = []
 
 	for cmap in keymap.findall("map"):
 		context = cmap.attrib.get("context")
 		assert context, "[keymapparser] map must have context"
 
-		parseKeys(context, filename, p, "generic", cmap)
+		parseKeys(context, filename, bindings, "generic", cmap)
 
 		for device in cmap.findall("device"):
-			parseKeys(context, filename, p, device.attrib.get("name"), device)
+			parseKeys(context, filename, bindings, device.attrib.get("name"), device)
 
 	for ctrans in keymap.findall("translate"):
 		for device in ctrans.findall("device"):
-			parseTrans(filename, p, device.attrib.get("name"), device)
+			parseTrans(filename, bindings, device.attrib.get("name"), device)
+
+	return bindings
+
+
+def getKeyIdsStamp():
+	try:
+		return os.stat(keyids.__file__).st_mtime
+	except (AttributeError, TypeError, OSError):
+		return None
+
+
+def loadKeymapCache():
+	global keymapCache
+	keymapCache = {}
+	try:
+		with open(resolveFilename(SCOPE_CONFIG, KEYMAP_CACHE_FILE), "rb") as f:
+			data = pickle.load(f)
+		# key names are resolved when compiling, a new keyids.py invalidates everything
+		if data.get("version") == KEYMAP_CACHE_VERSION and data.get("keyids") == getKeyIdsStamp():
+			keymapCache = data["keymaps"]
+	except FileNotFoundError:
+		pass
+	except Exception as e:
+		print("[keymapparser] Failed to load keymap cache:", e)
+
+
+def saveKeymapCache():
+	filename = resolveFilename(SCOPE_CONFIG, KEYMAP_CACHE_FILE)
+	try:
+		with open(filename + ".tmp", "wb") as f:
+			pickle.dump({"version": KEYMAP_CACHE_VERSION, "keyids": getKeyIdsStamp(), "keymaps": keymapCache}, f, pickle.HIGHEST_PROTOCOL)
+		os.rename(filename + ".tmp", filename)
+	except Exception as e:
+		print("[keymapparser] Failed to save keymap cache:", e)
+
+
+def saveKeymapCacheLater():
+	# the timer only runs once the main loop does, after all keymaps of the start are read
+	global keymapCacheTimer
+	if keymapCacheTimer is None:
+		keymapCacheTimer = enigma.eTimer()
+		keymapCacheTimer.callback.append(saveKeymapCache)
+	if not keymapCacheTimer.isActive():
+		keymapCacheTimer.start(KEYMAP_CACHE_SAVE_DELAY, True)
+
+
+def readKeymap(filename):
+	p = enigma.eActionMap.getInstance()
+	assert p
+
+	try:
+		source = open(filename)
+	except:
+		print("[keymapparser] keymap file " + filename + " not found")
+		return
+
+	# a keymap is only parsed again when the file changed
+	with source:
+		stat = os.fstat(source.fileno())
+		stamp = (stat.st_mtime, stat.st_size)
+		if keymapCache is None:
+			loadKeymapCache()
+		cached = keymapCache.get(filename)
+		if cached and cached[0] == stamp:
+			bindings = cached[1]
+		else:
+			bindings = compileKeymap(filename, source)
+			keymapCache[filename] = (stamp, bindings)
+			saveKeymapCacheLater()
+
+	for binding in bindings:
+		if binding[0] == BIND_KEY:
+			device, keyid, flags, context, mapto = binding[1:]
+			p.bindKey(filename, device, keyid, flags, context, mapto)
+			addKeyBinding(filename, keyid, context, mapto, flags)
+		elif binding[0] == BIND_TOGGLE:
+			p.bindToggle(filename, binding[1], binding[2])
+		else:
+			p.bindTranslation(filename, *binding[1:])
 
 
 def removeKeymap(filename):
 	p = enigma.eActionMap.getInstance()
 	p.unbindKeyDomain(filename)
+	removeKeyBindings(filename)
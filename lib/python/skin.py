@@ -5,12 +5,14 @@ from enigma import addFont, eLabel, ePixmap, ePoint, eRect, eSize, eWindow, eWin
 from os.path import basename, dirname, isfile, join
 
 from Components.config import ConfigSubsection, ConfigText, config
+from Components.Harddisk import harddiskmanager
 from Components.RcModel import rc_model
 from Components.Sources.Source import ObsoleteSource
 from Components.SystemInfo import SystemInfo
-from Tools.Directories import SCOPE_CONFIG, SCOPE_CURRENT_LCDSKIN, SCOPE_CURRENT_SKIN, SCOPE_FONTS, SCOPE_SKIN, SCOPE_SKIN_IMAGE, resolveFilename, fileExists
+from Tools.Directories import SCOPE_CONFIG, SCOPE_CURRENT_LCDSKIN, SCOPE_CURRENT_SKIN, SCOPE_FONTS, SCOPE_SKIN, SCOPE_SKIN_IMAGE, clearResolveLists, resolveFilename, fileExists
 from Tools.Import import my_import
 from Tools.LoadPixmap import LoadPixmap
+from Tools.Profile import profiled
 
 DEFAULT_SKIN = SystemInfo["HasFullHDSkinSupport"] and "PLi-FullNightHD/skin.xml" or "PLi-HD/skin.xml"  # SD hardware is no longer supported by the default skin.
 EMERGENCY_SKIN = "skin_default/skin.xml"
@@ -24,6 +26,10 @@ GUI_SKIN_ID = 0  # Main frame-buffer.
 DISPLAY_SKIN_ID = 1  # Front panel / display / LCD.
 
 domScreens = {}  # Dictionary of skin based screens.
+compiledAttributes = {}  # Dictionary of resolved widget attributes, see collectAttributes().
+compiledScreens = {}  # Dictionary of parsed embedded screen skins.
+compiledWidgets = {}  # Dictionary of widget name sets, see findWidgets().
+COMPILED_LIMIT = 4000  # Maximum number of entries in each compiled dictionary before it is flushed.
 colors = {  # Dictionary of skin color names.
 	"key_back": gRGB(0x00313131),
 	"key_blue": gRGB(0x0018188b),
@@ -50,6 +56,17 @@ if not isfile(skin):
 config.skin.primary_skin = ConfigText(default=DEFAULT_SKIN)
 config.skin.display_skin = ConfigText(default=DEFAULT_DISPLAY_SKIN)
 
+
+# The skin file resolve lists and their caches depend on the selected skins.
+#
+def skinResolveChanged(*args):
+	clearResolveLists()
+
+
+config.skin.primary_skin.addNotifier(skinResolveChanged, initial_call=False)
+config.skin.display_skin.addNotifier(skinResolveChanged, initial_call=False)
+harddiskmanager.on_partition_list_change.append(skinResolveChanged)
+
 currentPrimarySkin = None
 currentDisplaySkin = None
 callbacks = []
@@ -75,6 +92,7 @@ def InitSkins(booting=True):
 	# Reset skin dictionaries. We can reload skins without a restart
 	# Make sure we keep the original dictionaries as many modules now import skin globals explicitly
 	domScreens.clear()
+	clearCompiledSkin()
 	colors.clear()
 	fonts.clear()
 	fonts.update({
@@ -145,10 +163,12 @@ def loadSkinData(desktop):
 #
 
 
+@profiled(lambda filename, *args, **kwargs: "skin " + filename)
 def loadSkin(filename, scope=SCOPE_SKIN, desktop=getDesktop(GUI_SKIN_ID), screenID=GUI_SKIN_ID):
 	global windowStyles
 	filename = resolveFilename(scope, filename)
 	print("[Skin] Loading skin file '%s'." % filename)
+	clearCompiledSkin()  # Screens, fonts or colors may be replaced by this skin.
 	try:
 		with open(filename, "r") as fd:  # This open gets around a possible file handle leak in Python's XML parser.
 			try:
@@ -203,6 +223,16 @@ def loadSkin(filename, scope=SCOPE_SKIN, desktop=getDesktop(GUI_SKIN_ID), screen
 	return False
 
 
+# The compiled dictionaries cache the results of parsing screen attributes
+# so that opening the same screen again does not repeat the work.  They
+# depend on the loaded skin data and must be flushed when it changes.
+#
+def clearCompiledSkin():
+	compiledAttributes.clear()
+	compiledScreens.clear()
+	compiledWidgets.clear()
+
+
 def addOnLoadCallback(callback):
 	if callback not in onLoadCallbacks:
 		onLoadCallbacks.append(callback)
@@ -419,7 +449,29 @@ def loadPixmap(path, desktop, width=0, height=0):
 	return pixmap
 
 
+# The resolved attributes of a node only depend on the node, the skin path
+# and the state of the context when the node is processed.  As the context
+# may be moved by the node ("top", "fill", etc) the resulting context state
+# is cached as well.
+#
 def collectAttributes(skinAttributes, node, context, skinPath=None, ignore=(), filenames=frozenset(("pixmap", "pointer", "seek_pointer", "backgroundPixmap", "selectionPixmap", "sliderPixmap", "scrollbarSliderPicture", "scrollbarbackgroundPixmap", "scrollbarBackgroundPicture"))):
+	if isinstance(context, SkinContext):
+		key = (node, skinPath, ignore, context.__class__, getattr(context, "x", None), getattr(context, "y", None), getattr(context, "w", None), getattr(context, "h", None))
+		compiled = compiledAttributes.get(key)
+		if compiled is None:
+			attributes = []
+			collectNodeAttributes(attributes, node, context, skinPath, ignore, filenames)
+			if len(compiledAttributes) >= COMPILED_LIMIT:
+				compiledAttributes.clear()
+			compiledAttributes[key] = compiled = (attributes, (getattr(context, "x", None), getattr(context, "y", None), getattr(context, "w", None), getattr(context, "h", None)))
+		else:
+			context.x, context.y, context.w, context.h = compiled[1]
+		skinAttributes.extend(compiled[0])
+	else:
+		collectNodeAttributes(skinAttributes, node, context, skinPath, ignore, filenames)
+
+
+def collectNodeAttributes(skinAttributes, node, context, skinPath, ignore, filenames):
 	size = None
 	pos = None
 	font = None
@@ -1166,7 +1218,7 @@ def readSkin(screen, skin, names, desktop):
 		print("[Skin] Parsing embedded skin '%s'." % name)
 		if isinstance(skin, tuple):
 			for s in skin:
-				candidate = xml.etree.cElementTree.fromstring(s)
+				candidate = parseScreenSkin(s)
 				if candidate.tag == "screen":
 					screenID = candidate.attrib.get("id", None)
 					if (not screenID) or (int(screenID) == DISPLAY_SKIN_ID):
@@ -1175,7 +1227,7 @@ def readSkin(screen, skin, names, desktop):
 			else:
 				print("[Skin] No suitable screen found!")
 		else:
-			myScreen = xml.etree.cElementTree.fromstring(skin)
+			myScreen = parseScreenSkin(skin)
 		if myScreen:
 			screen.parsedSkin = myScreen
 	if myScreen is None:
@@ -1400,30 +1452,48 @@ def readSkin(screen, skin, names, desktop):
 	usedComponents = None
 
 
+# Embedded skins are parsed once per skin text and the parsed element is
+# shared between all screens using it.  This also keeps the elements alive
+# so the attributes collected from them can be reused.
+#
+def parseScreenSkin(skin):
+	element = compiledScreens.get(skin)
+	if element is None:
+		element = xml.etree.cElementTree.fromstring(skin)
+		if len(compiledScreens) >= COMPILED_LIMIT:
+			compiledScreens.clear()
+		compiledScreens[skin] = element
+	return element
+
+
 def findWidgets(name):
 	"""
 	Return a set of all the widgets found in a screen. Panels will be expanded
 	recursively until all referenced widgets are captured. This code only performs
 	a simple scan of the XML and no skin processing is performed.
 	"""
+	widgetSet = compiledWidgets.get(name)
+	if widgetSet is not None:
+		return widgetSet
 	widgetSet = set()
 	element, path = domScreens.get(name, (None, None))
 	if element is not None:
 		widgets = element.findall("widget")
 		if widgets is not None:
 			for widget in widgets:
-				name = widget.get("name", None)
-				if name is not None:
-					widgetSet.add(name)
+				widgetName = widget.get("name", None)
+				if widgetName is not None:
+					widgetSet.add(widgetName)
 				source = widget.get("source", None)
 				if source is not None:
 					widgetSet.add(source)
 		panels = element.findall("panel")
 		if panels is not None:
 			for panel in panels:
-				name = panel.get("name", None)
-				if name:
-					widgetSet.update(findWidgets(name))
+				panelName = panel.get("name", None)
+				if panelName:
+					widgetSet.update(findWidgets(panelName))
+		compiledWidgets[name] = widgetSet
 	return widgetSet
 
 
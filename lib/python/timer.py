@@ -1,4 +1,5 @@
 from bisect import insort
+from heapq import heapify, heappop, heappush
 from time import time, localtime, mktime
 from enigma import eTimer
 import datetime
@@ -24,6 +25,7 @@ class TimerEntry:
 		self.backoff = 0
 
 		self.disabled = False
+		self.heap_key = None
 
 	def resetState(self):
 		self.state = self.StateWaiting
@@ -149,9 +151,15 @@ class Timer:
 		self.timer_list = []
 		self.processed_timers = []
 
+		# (next activation, sequence, entry) for the entries in timer_list. an item
+		# is only valid while entry.heap_key still holds its (activation, sequence).
+		self.timer_heap = []
+		self.heap_sequence = 0
+
 		self.timer = eTimer()
-		self.timer.callback.append(self.calcNextActivation)
+		self.timer.callback.append(self.pollActivation)
 		self.lastActivation = time()
+		self.lastRebuild = self.lastActivation
 
 		self.calcNextActivation()
 		self.on_state_change = []
@@ -185,6 +193,7 @@ class Timer:
 		else:
 			if entry not in self.timer_list:
 				insort(self.timer_list, entry)
+			self.scheduleEntry(entry)
 			if not noRecalc:
 				self.calcNextActivation()
 
@@ -209,6 +218,42 @@ class Timer:
 #		else:
 #			print "no NAV"
 
+	def scheduleEntry(self, entry):
+		# (re)queue entry with its current next activation, this has to be called
+		# whenever begin, end, state or disabled of an entry in timer_list change
+		self.heap_sequence += 1
+		entry.heap_key = (entry.getNextActivation(), self.heap_sequence)
+		heappush(self.timer_heap, entry.heap_key + (entry,))
+
+	def unscheduleEntry(self, entry):
+		entry.heap_key = None
+
+	def rebuildSchedule(self):
+		self.timer_heap = []
+		for entry in self.timer_list:
+			self.heap_sequence += 1
+			entry.heap_key = (entry.getNextActivation(), self.heap_sequence)
+			self.timer_heap.append(entry.heap_key + (entry,))
+		heapify(self.timer_heap)
+
+	def getNextEntry(self):
+		# the enabled entry with the earliest next activation. stale heap items are
+		# dropped, entries whose activation changed without scheduleEntry() are requeued.
+		heap = self.timer_heap
+		while heap:
+			activation, sequence, entry = heap[0]
+			if getattr(entry, "heap_key", None) != (activation, sequence):
+				heappop(heap)
+			elif entry.disabled:
+				heappop(heap)
+				entry.heap_key = None
+			elif entry.getNextActivation() != activation:
+				heappop(heap)
+				self.scheduleEntry(entry)
+			else:
+				return entry
+		return None
+
 	def setNextActivation(self, now, when):
 		delay = int((when - now) * 1000)
 		self.timer.start(delay, 1)
@@ -230,12 +275,10 @@ class Timer:
 
 		min = int(now) + self.MaxWaitTime
 
-		self.timer_list and self.timer_list.sort() #  resort/refresh list, try to fix hanging timers
-
 		# calculate next activation point
-		timer_list = [t for t in self.timer_list if not t.disabled]
-		if timer_list:
-			w = timer_list[0].getNextActivation()
+		entry = self.getNextEntry()
+		if entry is not None:
+			w = entry.heap_key[0]
 			if w < min:
 				min = w
 
@@ -245,6 +288,15 @@ class Timer:
 
 		self.setNextActivation(now, min)
 
+	def pollActivation(self):
+		# once per MaxWaitTime refresh the schedule and resort the list, try to fix hanging timers
+		now = time()
+		if not 0 <= now - self.lastRebuild < self.MaxWaitTime:
+			self.lastRebuild = now
+			self.rebuildSchedule()
+			self.timer_list.sort(key=lambda entry: entry.heap_key[0])
+		self.calcNextActivation()
+
 	def timeChanged(self, timer):
 		print("time changed")
 		timer.timeChanged()
@@ -257,6 +309,7 @@ class Timer:
 			except:
 				print("[timer] Failed to remove, not in list")
 				return
+			self.unscheduleEntry(timer)
 		# give the timer a chance to re-enqueue
 		if timer.state == TimerEntry.StateEnded:
 			timer.state = TimerEntry.StateWaiting
@@ -264,6 +317,7 @@ class Timer:
 
 	def doActivate(self, w):
 		self.timer_list.remove(w)
+		self.unscheduleEntry(w)
 
 		# when activating a timer which has already passed,
 		# simply abort the timer. don't run trough all the stages.
@@ -280,6 +334,7 @@ class Timer:
 		if w.state < TimerEntry.StateEnded:
 			# no, sort it into active list
 			insort(self.timer_list, w)
+			self.scheduleEntry(w)
 		else:
 			# yes. Process repeated, and re-add.
 			if w.repeated:
@@ -296,8 +351,11 @@ class Timer:
 		t = int(time()) + 1
 		# we keep on processing the first entry until it goes into the future.
 		while True:
-			timer_list = [tmr for tmr in self.timer_list if not tmr.disabled]
-			if timer_list and timer_list[0].getNextActivation() < t:
-				self.doActivate(timer_list[0])
-			else:
+			entry = self.getNextEntry()
+			if entry is None or entry.heap_key[0] >= t:
 				break
+			if entry in self.timer_list:
+				self.doActivate(entry)
+			else:
+				# removed from timer_list behind our back
+				self.unscheduleEntry(entry)
@@ -0,0 +1,57 @@
+import enigma
+import time
+
+import Components.config
+from Components.config import config, ConfigInteger, ConfigSubList, ConfigSubsection, ConfigText
+
+# micro benchmark for importing settings lines into a populated config tree,
+# comparing the old eval() based entry resolution with the path index.
+#
+# run with PYTHONPATH=.:..:../lib/python/ python bench_config.py
+
+
+def bench_import(sections=50, entries=50, repeat=5):
+	config.bench = ConfigSubsection()
+	config.bench.list = ConfigSubList()
+	for i in range(sections):
+		section = ConfigSubsection()
+		for j in range(entries):
+			setattr(section, "int%d" % j, ConfigInteger(default=0))
+			setattr(section, "text%d" % j, ConfigText(default=""))
+		setattr(config.bench, "section%d" % i, section)
+		config.bench.list.append(ConfigSubsection())
+		config.bench.list[i].value = ConfigInteger(default=0)
+
+	lines = []
+	for i in range(sections):
+		for j in range(entries):
+			lines.append("config.bench.section%d.int%d=%d\n" % (i, j, j))
+			lines.append("config.bench.section%d.text%d=text %d\n" % (i, j, j))
+		lines.append("config.bench.list.%d.value=%d\n" % (i, i))
+
+	start = time.time()
+	for x in range(repeat):
+		for line in lines:
+			(name, val) = line.split('=', 1)
+			try:
+				configEntry = eval(name, vars(Components.config))
+				if configEntry is not None:
+					configEntry.value = val.strip()
+			except (SyntaxError, KeyError):
+				pass
+	old = time.time() - start
+
+	start = time.time()
+	for x in range(repeat):
+		config.unpickle(lines, base_file=False)
+	new = time.time() - start
+
+	count = len(lines) * repeat
+	print("eval:   %d lines in %.3fs (%d lines/s)" % (count, old, count / old))
+	print("lookup: %d lines in %.3fs (%d lines/s)" % (count, new, count / new))
+
+	assert str(config.lookup("config.bench.section1.int2").value) == "2"
+	assert str(config.lookup("config.bench.list.3.value").value) == "3"
+
+
+bench_import()
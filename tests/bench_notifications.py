@@ -0,0 +1,96 @@
+import enigma
+import sys
+import threading
+import time
+import types
+
+# benchmark for the notification queue. worker threads add thousands of
+# notifications like a burst of starting and failing recordings would. equal
+# notifications are coalesced, popups with an id replace each other and the
+# listeners are announced once per main loop iteration instead of per add.
+#
+# run with PYTHONPATH=.:..:../lib/python/ python bench_notifications.py
+
+
+class Reactor:
+	def __init__(self):
+		self.calls = []
+
+	def callFromThread(self, fnc, *args):
+		self.calls.append((fnc, args))
+
+	def iterate(self):
+		calls, self.calls = self.calls, []
+		for fnc, args in calls:
+			fnc(*args)
+
+
+reactor = Reactor()
+try:
+	import twisted.internet
+except ImportError:
+	sys.modules["twisted"] = types.ModuleType("twisted")
+	sys.modules["twisted.internet"] = sys.modules["twisted"].internet = types.ModuleType("twisted.internet")
+sys.modules["twisted.internet"].reactor = reactor
+
+import Tools.Notifications
+from Tools.Notifications import AddNotification, AddPopup, AddNotificationWithID, notificationAdded, notifications
+from Screens.MessageBox import MessageBox
+
+
+def worker(number, count):
+	for i in range(count):
+		if i % 4 == 0:
+			AddPopup("Recording failed", type=MessageBox.TYPE_ERROR, timeout=0, id="BenchFailed%d" % (i // 4 % 20))
+		elif i % 4 == 1:
+			AddNotification(MessageBox, "Recording started", type=MessageBox.TYPE_INFO, timeout=5)
+		else:
+			AddNotificationWithID("Bench%d.%d" % (number, i), MessageBox, "Message %d of worker %d" % (i, number), type=MessageBox.TYPE_INFO, timeout=5)
+
+
+def bench_notifications(threads=8, count=2000):
+	workers = [threading.Thread(target=worker, args=(x, count)) for x in range(threads)]
+	stdout = sys.stdout
+	sys.stdout = open("/dev/null", "w") # AddPopup and RemovePopup are chatty
+	try:
+		start = time.time()
+		for x in workers:
+			x.start()
+		for x in workers:
+			x.join()
+		add = time.time() - start
+	finally:
+		sys.stdout = stdout
+	queued = len(notifications)
+	dispatches = len(reactor.calls)
+
+	taken = []
+
+	def listener():
+		Tools.Notifications.lock.acquire(True)
+		n = notifications and notifications[0]
+		if n:
+			del notifications[0]
+		Tools.Notifications.lock.release()
+		if n:
+			taken.append(n)
+
+	notificationAdded.append(listener)
+	start = time.time()
+	reactor.iterate()
+	dispatch = time.time() - start
+	notificationAdded.remove(listener)
+
+	print("%d notifications from %d threads: add %.3fs, %d queued, %d dispatches, dispatch %.3fs" % (threads * count, threads, add, queued, dispatches, dispatch))
+
+	assert dispatches == 1
+	assert not notifications
+	assert len(taken) == queued
+	# one popup per id, errors first, a single coalesced "Recording started"
+	assert set(n[4] for n in taken[:20]) == set("BenchFailed%d" % x for x in range(20))
+	assert all(n[3]["type"] == MessageBox.TYPE_ERROR for n in taken[:20])
+	assert len([n for n in taken if n[2] == ("Recording started",)]) == 1
+	assert queued == 20 + 1 + threads * count // 2
+
+
+bench_notifications()
@@ -0,0 +1,67 @@
+import enigma
+import gc
+import time
+
+from Components.Converter.Poll import Poll, pollScheduler
+from Components.Element import Element
+
+# benchmark for the shared poll timer. an infobar skin has dozens of
+# converters polling every 500ms to 2s. they used to have a timer each,
+# now the polls of all of them are done in a few wakeups of the main loop.
+# suspended converters stay registered and are skipped, converters gone
+# without destroy() are dropped.
+#
+# run with PYTHONPATH=.:..:../lib/python/ python bench_poll.py
+
+
+class Poller(Poll, Element):
+	def __init__(self, interval, name):
+		Poll.__init__(self)
+		Element.__init__(self)
+		self.converter_arguments = name
+		self.polls = 0
+		self.poll_interval = interval
+		self.poll_enabled = True
+
+	def poll(self):
+		self.polls += 1
+		Poll.poll(self)
+
+
+def bench_poll(duration=3):
+	wakeups = []
+	runIteration = enigma.runIteration
+
+	def countedIteration():
+		wakeups.append(time.time())
+		runIteration()
+
+	pollers = [Poller((500, 1000, 2000)[x % 3], "Poller%d" % x) for x in range(42)]
+	for x in pollers:
+		x.suspended = False
+	for x in pollers[:6]:
+		x.suspended = True
+	polls = [x.polls for x in pollers] # each was polled once when it was shown
+	enigma.runIteration = countedIteration
+	start = time.time()
+	enigma.run(duration)
+	taken = time.time() - start
+	enigma.runIteration = runIteration
+
+	separate = sum(int(taken * 1000) // x.poll_interval for x in pollers[6:])
+	print("%d pollers, %d suspended: %d main loop wakeups in %.1fs, separate timers would take %d" % (len(pollers), 6, len(wakeups), taken, separate))
+	pollScheduler.printStatistics(3)
+
+	assert [x.polls for x in pollers[:6]] == polls[:6]
+	for x, before in zip(pollers[6:], polls[6:]):
+		assert abs(x.polls - before - taken * 1000 // x.poll_interval) <= 1, (x.converter_arguments, x.polls)
+	assert len(wakeups) <= taken * 1000 // 500 + 3 # the 500ms bucket and the stop timer
+	for x in pollers[1:]:
+		x.destroy()
+	del x, pollers[:] # the first one goes without destroy()
+	gc.collect()
+	assert not pollScheduler.subscriptions
+	enigma.runIteration()
+	assert not pollScheduler.buckets and not pollScheduler.timer.isActive()
+
+bench_poll()
@@ -0,0 +1,102 @@
+import enigma
+import os
+import tempfile
+import time
+import tracemalloc
+import xml.etree.ElementTree
+
+# benchmark for loading and saving a large timers.xml. a synthetic file with
+# 5000 timers is read with the old DOM parse and with RecordTimer.loadTimer,
+# which streams it and also checks and sorts in the timers, then saved again
+# with saveTimer. unchanged and bursts of changes must not cause further
+# writes.
+#
+# run with PYTHONPATH=.:..:../lib/python/ python bench_recordtimer.py
+
+enigma.init_record_timer()
+enigma.init_record_config()
+
+import RecordTimer
+
+
+def writeTimers(filename, count, logs):
+	base = int(time.time()) + 3600
+	with open(filename, "w") as f:
+		f.write('<?xml version="1.0" ?>\n<timers>\n')
+		for i in range(count):
+			begin = base + i * 1800
+			f.write('<timer begin="%d" end="%d" serviceref="1:0:1:6DD2:44D:1:C00000:0:0:0:" repeated="0" name="Event %d" description="Description of event %d" afterevent="auto" eit="%d" disabled="1" justplay="0">\n' % (begin, begin + 1500, i, i, i))
+			for j in range(logs):
+				f.write('<log code="%d" time="%d">log line %d of timer %d</log>\n' % (j % 20, begin - 1000 + j, j, i))
+			f.write('</timer>\n')
+		f.write('</timers>\n')
+
+
+def measure(function):
+	tracemalloc.start()
+	start = time.process_time()
+	result = function()
+	duration = time.process_time() - start
+	peak = tracemalloc.get_traced_memory()[1]
+	tracemalloc.stop()
+	return result, duration, peak
+
+
+def parseTimers(filename):
+	return [RecordTimer.createTimer(timer) for timer in xml.etree.ElementTree.parse(filename).getroot().findall("timer")]
+
+
+def loadTimers(filename):
+	t = RecordTimer.RecordTimer()
+	t.Filename = filename
+	t.timer_list = []
+	t.processed_timers = []
+	t.loadTimer()
+	return t
+
+
+def bench_recordtimer(count=5000, logs=20):
+	directory = tempfile.mkdtemp()
+	filename = os.path.join(directory, "timers.xml")
+	writeTimers(filename, count, logs)
+	print("timers.xml: %d timers, %d bytes" % (count, os.path.getsize(filename)))
+
+	timers, duration, peak = measure(lambda: parseTimers(filename))
+	print("parse:  %.3fs, peak %.1f MB" % (duration, peak / 1048576.0))
+	t, duration, peak = measure(lambda: loadTimers(filename))
+	print("loadTimer: %.3fs, peak %.1f MB" % (duration, peak / 1048576.0))
+	timers = t.processed_timers + t.timer_list
+	assert len(timers) == count
+
+	writes = []
+	rename = os.rename
+
+	def countingRename(src, dst):
+		writes.append(dst)
+		rename(src, dst)
+
+	os.rename = countingRename
+	try:
+		start = time.process_time()
+		t.saveTimer()
+		first = time.process_time() - start
+
+		start = time.process_time()
+		t.saveTimer()
+		unchanged = time.process_time() - start
+
+		start = time.process_time()
+		for timer in sorted(timers)[:100]:
+			timer.name += " changed"
+			t.saveTimerLater()
+		t.saveTimerTimer.do() # the delayed write
+		burst = time.process_time() - start
+	finally:
+		os.rename = rename
+
+	print("save: %.3fs, unchanged %.3fs, burst of 100 changes %.3fs, %d writes" % (first, unchanged, burst, len(writes)))
+	assert len(writes) == 2
+	assert sorted(loadTimers(filename).processed_timers)[0].name == "Event 0 changed"
+
+
+bench_recordtimer()
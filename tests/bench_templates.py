@@ -0,0 +1,89 @@
+import enigma
+import glob
+import re
+import sys
+import time
+import types
+from xml.etree.ElementTree import fromstring, parse
+
+# benchmark for the templated list converter. every screen with a list
+# creates its converters again when it opens, each evaluated the template
+# source of the skin. converters are now created from the template strings
+# of the default skin and the screens, first evaluating each template like
+# before, then with the evaluated templates shared.
+#
+# run with PYTHONPATH=.:..:../lib/python/ python bench_templates.py
+
+
+class eListbox:
+	orHorizontal = 0
+	orVertical = 1
+
+
+class eListboxPythonMultiContent:
+	TYPE_TEXT, TYPE_PROGRESS, TYPE_PIXMAP, TYPE_PIXMAP_ALPHATEST, TYPE_PIXMAP_ALPHABLEND, TYPE_PROGRESS_PIXMAP = range(6)
+
+
+class gFont:
+	def __init__(self, face, size):
+		self.face = face
+		self.size = size
+
+
+for name, value in (("eListbox", eListbox), ("eListboxPythonMultiContent", eListboxPythonMultiContent), ("gFont", gFont)):
+	setattr(enigma, name, value)
+for index, name in enumerate(("BT_SCALE", "BT_KEEP_ASPECT_RATIO", "BT_ALIGN_CENTER", "BT_HALIGN_CENTER", "BT_VALIGN_CENTER", "RT_HALIGN_CENTER", "RT_HALIGN_LEFT", "RT_HALIGN_RIGHT", "RT_VALIGN_BOTTOM", "RT_VALIGN_CENTER", "RT_VALIGN_TOP", "RT_WRAP")):
+	setattr(enigma, name, 1 << index)
+
+# the skin module would load the whole gui, the converter only needs these
+skin = types.ModuleType("skin")
+skin.getSkinFactor = lambda: 1.5
+skin.parseFont = lambda value, scale=((1, 1), (1, 1)): gFont(*value.split(";"))
+skin.parseColor = lambda value: value
+skin.applySkinFactor = lambda *values: int(sum(values) * 1.5)
+sys.modules["skin"] = skin
+# the entries of the templates, resolving colors and pixmaps needs the gui too
+module = sys.modules["Components.MultiContent"] = types.ModuleType("Components.MultiContent")
+for name in ("MultiContentEntryPixmap", "MultiContentEntryPixmapAlphaBlend", "MultiContentEntryPixmapAlphaTest", "MultiContentEntryProgress", "MultiContentEntryProgressPixmap", "MultiContentEntryText"):
+	setattr(module, name, lambda name=name, **kwargs: (name, tuple(sorted(kwargs.items(), key=str))))
+module.MultiContentTemplateColor = lambda n: 0xff000000 | n
+
+import Components.Converter.TemplatedMultiContent
+from Components.Converter.TemplatedMultiContent import TemplatedMultiContent
+
+
+def skinTemplates():
+	sources = []
+	for convert in parse("../data/skin_default/skin.xml").getroot().iter("convert"):
+		if convert.get("type") == "TemplatedMultiContent":
+			sources.append(convert.text.strip())
+	for filename in sorted(glob.glob("../lib/python/**/*.py", recursive=True)):
+		with open(filename) as f:
+			# skins filled in with % when the screen opens are left out
+			sources += [fromstring(convert).text.strip() for convert in re.findall(r'<convert type="TemplatedMultiContent">.*?</convert>', f.read(), re.S) if "%" not in convert]
+	return sources
+
+
+def bench_templates(count=1000):
+	sources = skinTemplates()
+	templates = Components.Converter.TemplatedMultiContent.templates
+
+	start = time.time()
+	for x in range(count):
+		templates.clear()
+		TemplatedMultiContent(sources[x % len(sources)])
+	old = time.time() - start
+
+	templates.clear()
+	start = time.time()
+	converters = [TemplatedMultiContent(sources[x % len(sources)]) for x in range(count)]
+	new = time.time() - start
+
+	print("%d converters from %d skin templates: evaluated each time %.3fs, shared %.3fs (%.1fx)" % (count, len(sources), old, new, old / new))
+	assert len(templates) == len(set(sources))
+	assert converters[0].template is converters[len(sources)].template
+	for converter in converters[:len(sources)]:
+		assert None in converter.styles and converter.styles[None][0] is converter.template["template"]
+
+
+bench_templates()
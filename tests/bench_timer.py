@@ -0,0 +1,101 @@
+import enigma
+import fake_time
+import io
+import sys
+import time
+
+import timer
+
+# benchmark for the timer scheduler. simulated timers are added to a timer.Timer
+# and then run through the fake enigma reactor until every one of them went
+# through the prepared, running and ended states. the list based scheduler
+# which sorted timer_list on every wake up is kept below for comparison.
+#
+# run with PYTHONPATH=.:..:../lib/python/ python bench_timer.py
+
+
+class BenchTimerEntry(timer.TimerEntry):
+	def __init__(self, begin, end):
+		timer.TimerEntry.__init__(self, begin, end)
+		self.activations = 0
+
+	def activate(self):
+		self.activations += 1
+		return True
+
+	def getNextActivation(self):
+		if self.state == self.StateEnded:
+			return self.end
+		return {self.StatePrepared: self.begin - self.prepare_time,
+				self.StateRunning: self.begin,
+				self.StateEnded: self.end}[self.state + 1]
+
+
+class ListTimer(timer.Timer):
+	def pollActivation(self):
+		self.calcNextActivation()
+
+	def calcNextActivation(self):
+		now = time.time()
+		self.processActivation()
+		self.lastActivation = now
+		min = int(now) + self.MaxWaitTime
+		self.timer_list and self.timer_list.sort()
+		timer_list = [t for t in self.timer_list if not t.disabled]
+		if timer_list:
+			w = timer_list[0].getNextActivation()
+			if w < min:
+				min = w
+		self.setNextActivation(now, min)
+
+	def processActivation(self):
+		t = int(time.time()) + 1
+		while True:
+			timer_list = [tmr for tmr in self.timer_list if not tmr.disabled]
+			if timer_list and timer_list[0].getNextActivation() < t:
+				self.doActivate(timer_list[0])
+			else:
+				break
+
+
+def bench_timer(timerclass, count):
+	stdout = sys.stdout
+	sys.stdout = io.StringIO() # the fake reactor is chatty
+	try:
+		t = timerclass()
+		t.MaxWaitTime = 3600
+		base = int(time.time())
+		entries = []
+		for i in range(count):
+			begin = base + 60 + i * 7
+			entry = BenchTimerEntry(begin, begin + 300 + (i % 13) * 60)
+			entry.disabled = i % 10 == 9
+			entries.append(entry)
+
+		start = time.process_time()
+		for entry in entries:
+			t.addTimerEntry(entry)
+		add = time.process_time() - start
+
+		start = time.process_time()
+		enigma.stopped = False
+		enigma.run(count * 7 + 3600)
+		run = time.process_time() - start
+		enigma.timers.clear()
+	finally:
+		sys.stdout = stdout
+
+	print("%s: %d timers, add %.3fs, run %.3fs" % (timerclass.__name__, count, add, run))
+
+
+	assert not t.timer_list
+	assert len(t.processed_timers) == count
+	for entry in entries:
+		assert entry.state == entry.StateEnded
+		assert entry.activations == (0 if entry.disabled else 3)
+
+
+fake_time.setTime(1600000000)
+bench_timer(ListTimer, 1000)
+bench_timer(timer.Timer, 1000)
+bench_timer(timer.Timer, 10000)
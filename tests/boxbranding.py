@@ -0,0 +1,5 @@
+# fake-boxbranding
+
+
+def getHaveVFDSymbol():
+	return "False"
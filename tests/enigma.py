@@ -25,6 +25,7 @@ from events import eventfnc
 class eTimer:
 	def __init__(self):
 		self.timeout = slot()
+		self.callback = self.timeout.list
 		self.next_activation = None
 		print("NEW TIMER")
 
@@ -36,7 +37,10 @@ class eTimer:
 		timers.add(self)
 
 	def stop(self):
-		timers.remove(self)
+		timers.discard(self)
+
+	def isActive(self):
+		return self in timers
 
 	def __repr__(self):
 		return "<eTimer timeout=%s next_activation=%s singleshot=%s>" % (repr(self.timeout), repr(self.next_activation), repr(self.singleshot))
@@ -85,6 +89,16 @@ def run(duration=1000):
 		runIteration()
 
 
+class eEnv:
+	@staticmethod
+	def resolve(path):
+		return path.replace("${sysconfdir}", "/etc").replace("${datadir}", "/usr/share").replace("${libdir}", "/usr/lib")
+
+
+def eGetEnigmaDebugLvl():
+	return 0
+
+
 ##################### ENIGMA GUI
 
 eSize = None
@@ -95,13 +109,36 @@ eLabel = None
 ePixmap = None
 eWindowStyleManager = None
 loadPNG = None
+loadJPG = None
+loadSVG = None
 addFont = None
-gRGB = None
 eWindowStyleSkinned = None
 eButton = None
 eListboxPythonStringContent = None
 eListbox = None
 eSubtitleWidget = None
+eRect = None
+getFontFaces = None
+gMainDC = None
+BT_ALPHATEST = None
+BT_ALPHABLEND = None
+BT_HALIGN_CENTER = None
+BT_HALIGN_LEFT = None
+BT_HALIGN_RIGHT = None
+BT_KEEP_ASPECT_RATIO = None
+BT_SCALE = None
+BT_VALIGN_BOTTOM = None
+BT_VALIGN_CENTER = None
+BT_VALIGN_TOP = None
+
+
+def getDesktop(screen):
+	return None
+
+
+class gRGB:
+	def __init__(self, *args):
+		self.args = args
 
 
 class eEPGCache:
@@ -160,9 +197,29 @@ class eServiceReference:
 	isMarker = 64
 	isGroup = 128
 
-	def __init__(self, ref):
+	idInvalid = -1
+	idStructure = 0
+	idDVB = 1
+	idFile = 2
+
+	def __init__(self, ref="", flags=0, path=""):
+		if isinstance(ref, int):
+			ref = "%d:%d:0:0:0:0:0:0:0:0:%s" % (ref, flags, path)
 		self.ref = ref
-		self.flags = 0
+		fields = ref.split(":", 10)
+		self.type = int(fields[0]) if fields[0].isdigit() else self.idInvalid
+		self.flags = int(fields[1]) if len(fields) > 1 and fields[1].isdigit() else 0
+		self.data = [int(x, 16) if x else 0 for x in fields[2:10]]
+		self.path = fields[10] if len(fields) > 10 else ""
+
+	def valid(self):
+		return self.type != self.idInvalid
+
+	def getUnsignedData(self, num):
+		return self.data[num] if num < len(self.data) else 0
+
+	def getPath(self):
+		return self.path
 
 	def toString(self):
 		return self.ref
@@ -171,6 +228,10 @@ class eServiceReference:
 		return self.toString()
 
 
+class iServiceInformation:
+	sTransponderData = 27
+
+
 class iRecordableService:
 	def __init__(self, ref):
 		self.ref = ref
@@ -282,7 +343,63 @@ class eDBoxLCD:
 
 eDBoxLCD()
 
-Misc_Options = None
+
+class Misc_Options:
+	@classmethod
+	def getInstance(self):
+		return self.instance
+
+	instance = None
+
+	def __init__(self):
+		Misc_Options.instance = self
+
+	def detected_12V_output(self):
+		return False
+
+
+Misc_Options()
+
+
+class eDVBCIInterfaces:
+	@classmethod
+	def getInstance(self):
+		return self.instance
+
+	instance = None
+
+	def __init__(self):
+		eDVBCIInterfaces.instance = self
+
+	def getNumOfSlots(self):
+		return 0
+
+
+eDVBCIInterfaces()
+
+
+class eDVBResourceManager:
+	@classmethod
+	def getInstance(self):
+		return self.instance
+
+	instance = None
+
+	def __init__(self):
+		eDVBResourceManager.instance = self
+
+	def canMeasureFrontendInputPower(self):
+		return False
+
+
+eDVBResourceManager()
+
+eConsoleAppContainer = None
+eDVBDB = None
+eListboxServiceContent = None
+eDVBCI_UI = None
+setPreferredTuner = None
+eStreamServer = None
 
 
 class eServiceCenter:
@@ -356,6 +473,30 @@ def init_parental_control():
 	InitParentalControl()
 
 
+def init_record_timer():
+	# RecordTimer without the screens and the tuner setup, which need a receiver
+	print("init record timer")
+	import sys
+	import types
+	for name in ("Components.UsageConfig", "Screens.PictureInPicture", "Screens.Standby", "Screens.InfoBar", "Tools.Trashcan"):
+		sys.modules[name] = types.ModuleType(name)
+	sys.modules["Components.UsageConfig"].defaultMoviePath = lambda: "/tmp/"
+	sys.modules["Screens.PictureInPicture"].PictureInPicture = None
+	sys.modules["Screens.InfoBar"].InfoBar = types.SimpleNamespace(instance=None)
+	sys.modules["Tools.Trashcan"].instance = None
+	import Screens
+	Screens.InfoBar = sys.modules["Screens.InfoBar"]
+
+	from Components.config import config, ConfigSelection, ConfigSubsection, ConfigYesNo
+	from Components.SystemInfo import SystemInfo
+	config.usage = ConfigSubsection()
+	config.usage.frontend_priority = ConfigSelection(default="-1", choices=["-1"])
+	config.usage.recording_frontend_priority = ConfigSelection(default="-2", choices=["-2"])
+	config.misc.use_ci_assignment = ConfigYesNo(default=False)
+	for tuner in ("DVB-T", "DVB-C", "DVB-S", "ATSC"):
+		SystemInfo["%s_priority_tuner_available" % tuner] = False
+
+
 def init_all():
 	# this is stuff from StartEnigma.py
 	init_nav()
@@ -0,0 +1,127 @@
+import builtins
+import enigma
+import math
+
+if not hasattr(builtins, "_"):
+	builtins._ = lambda text: text
+
+from Plugins.SystemPlugins.PositionerSetup.calibration import Calibration, CalibrationFrontend
+
+# test for the rotor calibration. a simulated dish with a satellite a few
+# degrees off is searched and focused on from timer callbacks, the main
+# loop runs between every move and measurement. a calibration can be
+# paused and resumed, and cancelled halfway.
+#
+# run with PYTHONPATH=.:..:../lib/python/ python test_calibration.py
+
+STEPSIZE = 0.125
+
+
+class SimulatedDish(CalibrationFrontend):
+	def __init__(self, satellite, position=0.0):
+		self.satellite = satellite
+		self.position = position
+		self.measurements = 0
+		self.stopped = False
+		self.callback = None
+		self.timer = enigma.eTimer()
+		self.timer.callback.append(self.measured)
+
+	def gotoX(self, satlon):
+		self.position = satlon
+		return round(satlon / STEPSIZE)
+
+	def step(self, steps):
+		self.position += steps * STEPSIZE
+
+	def getSettleTime(self, degrees):
+		return 0
+
+	def measure(self, time, callback):
+		self.callback = callback
+		self.timer.start(0, True)
+
+	def measured(self):
+		self.measurements += 1
+		snr = 80.0 * math.exp(-(self.position - self.satellite) ** 2)
+		callback, self.callback = self.callback, None
+		callback(snr, 1.0 if snr > 20 else 0.0)
+
+	def stop(self):
+		self.stopped = True
+		self.timer.stop()
+
+
+def calibrate(dish, steps, random):
+	calibration = Calibration(dish, STEPSIZE, random=lambda: random)
+	finished = []
+	calibration.onFinished.append(lambda state, result: finished.append((state, result)))
+	calibration.start(getattr(calibration, steps[0])(*steps[1:]))
+	return calibration, finished
+
+
+def run(calibration):
+	iterations = 0
+	while calibration.isRunning():
+		enigma.runIteration()
+		iterations += 1
+	return iterations
+
+
+def test_gotoX():
+	for random in (0.0, 0.9): # searching east first, west first
+		dish = SimulatedDish(22.2)
+		calibration, finished = calibrate(dish, ("gotoXcalibration", 19.2), random)
+		iterations = run(calibration)
+		state, (x0, xm) = finished[0]
+		assert state == Calibration.DONE, finished
+		assert abs(x0 - 22.2) < STEPSIZE and abs(xm - 22.2) <= STEPSIZE, (x0, xm)
+		assert abs(dish.position - x0) < STEPSIZE
+		print("gotoX calibration: %d main loop iterations, %d measurements, offset %.2f" % (iterations, dish.measurements, x0 - 19.2))
+
+
+def test_autofocus():
+	dish = SimulatedDish(0.5)
+	calibration, finished = calibrate(dish, ("autofocus",), 0.0)
+	run(calibration)
+	assert finished == [(Calibration.DONE, (4, 4))], finished
+	assert dish.position == 0.5
+
+	dish = SimulatedDish(5.0)
+	calibration, finished = calibrate(dish, ("autofocus",), 0.0)
+	run(calibration)
+	assert finished == [(Calibration.FAILED, "There is no signal to lock on !")], finished
+
+
+def test_pause_cancel():
+	dish = SimulatedDish(0.5)
+	calibration, finished = calibrate(dish, ("autofocus",), 0.0)
+	for x in range(5):
+		enigma.runIteration()
+	calibration.pause()
+	keepalive = enigma.eTimer()
+	keepalive.start(10)
+	for x in range(5):
+		enigma.runIteration()
+	measurements = dish.measurements
+	for x in range(5):
+		enigma.runIteration()
+	assert calibration.state == Calibration.PAUSED and dish.measurements == measurements
+	keepalive.stop()
+	calibration.resume()
+	run(calibration)
+	assert finished == [(Calibration.DONE, (4, 4))], finished
+
+	dish = SimulatedDish(0.5)
+	calibration, finished = calibrate(dish, ("autofocus",), 0.0)
+	for x in range(5):
+		enigma.runIteration()
+	calibration.cancel()
+	assert calibration.state == Calibration.CANCELLED and dish.stopped
+	assert not calibration.timer.isActive() and not enigma.timers
+	assert finished[0][0] == Calibration.CANCELLED
+
+
+test_gotoX()
+test_autofocus()
+test_pause_cancel()
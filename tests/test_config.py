@@ -0,0 +1,119 @@
+import enigma
+import os
+import shutil
+import tempfile
+
+import Components.config
+from Components.config import config, Config, ConfigFile, ConfigInteger, ConfigSubsection, ConfigText, ConfigYesNo
+
+# round trip of the settings journal. values saved to the journal and
+# compacted into the settings file are read back into an empty config
+# tree, as on the next start, where the values of plugins which were
+# never imported have to survive as well.
+#
+# run with PYTHONPATH=.:..:../lib/python/ python test_config.py
+
+SETTINGS = """config.plugins.neverimported.option=kept
+config.plugins.neverimported.list.0.name=first
+config.test.number=1
+config.test.text=hello
+"""
+
+
+def configFile(directory):
+	configfile = ConfigFile()
+	configfile.CONFIG_FILE = os.path.join(directory, "settings")
+	configfile.JOURNAL_FILE = configfile.CONFIG_FILE + ".journal"
+	return configfile
+
+
+def reload(directory):
+	# the settings as a fresh start reads them, without any config elements
+	Components.config.config = Config()
+	try:
+		configFile(directory).load()
+		return Components.config.config.flatten()
+	finally:
+		Components.config.config = config
+
+
+def read(filename):
+	with open(filename, "r", encoding="UTF-8") as f:
+		return f.read()
+
+
+def test_journal(directory):
+	configfile = configFile(directory)
+	with open(configfile.CONFIG_FILE, "w", encoding="UTF-8") as f:
+		f.write(SETTINGS)
+	configfile.load()
+	config.test = ConfigSubsection()
+	config.test.number = ConfigInteger(default=0)
+	config.test.text = ConfigText(default="")
+	config.test.flag = ConfigYesNo(default=False)
+	assert config.test.number.value == 1 and config.test.text.value == "hello"
+
+	config.misc.settingsjournal.value = True
+	config.misc.settingsjournal.save()
+	config.test.number.value = 2
+	config.test.number.save()
+	configfile.save()
+	config.test.flag.value = True
+	config.test.flag.save()
+	configfile.save()
+	config.test.text.value = ""  # back to the default
+	config.test.text.save()
+	configfile.save()
+	configfile.save()  # nothing changed
+	assert read(configfile.CONFIG_FILE) == SETTINGS
+	journal = read(configfile.JOURNAL_FILE).splitlines()
+	assert sorted(journal) == ["-config.test.text", "config.misc.settingsjournal=true", "config.test.flag=true", "config.test.number=2"], journal
+
+	expected = config.flatten()
+	assert expected["config.plugins.neverimported.option"] == "kept"
+	assert expected["config.plugins.neverimported.list.0.name"] == "first"
+	assert "config.test.text" not in expected
+	assert reload(directory) == expected
+
+	configfile.save(compact=True)
+	assert not os.path.exists(configfile.JOURNAL_FILE)
+	assert configfile.saved == expected
+	assert reload(directory) == expected
+	settings = read(configfile.CONFIG_FILE)
+	assert "config.plugins.neverimported.option=kept\n" in settings and "config.test.text" not in settings
+
+	config.test.number.value = 3
+	config.test.number.save()
+	configfile.save()
+	assert read(configfile.JOURNAL_FILE) == "config.test.number=3\n"
+	expected["config.test.number"] = "3"
+	assert reload(directory) == expected
+	return configfile
+
+
+def test_without_journal(directory, configfile):
+	config.misc.settingsjournal.value = False
+	config.misc.settingsjournal.save()
+	config.test.flag.value = False
+	config.test.flag.save()
+	configfile.save()
+	assert not os.path.exists(configfile.JOURNAL_FILE)
+	assert configfile.saved is None
+	expected = config.flatten()
+	assert "config.test.flag" not in expected and expected["config.plugins.neverimported.option"] == "kept"
+	assert reload(directory) == expected
+
+	# the first save with journal writes the settings file again
+	config.misc.settingsjournal.value = True
+	config.misc.settingsjournal.save()
+	configfile.save()
+	assert not os.path.exists(configfile.JOURNAL_FILE)
+	assert configfile.saved == config.flatten() == reload(directory)
+
+
+directory = tempfile.mkdtemp()
+try:
+	test_without_journal(directory, test_journal(directory))
+finally:
+	shutil.rmtree(directory)
+print("test_config passed")
@@ -0,0 +1,69 @@
+import enigma
+
+from Components.Element import Element
+from Components.Sources.Source import Source
+
+# test for batched changes. a batching source which changes several times
+# in one main loop iteration pushes once when the iteration is done, a
+# change of everything replaces the specific ones and the same specific
+# change is pushed once.
+#
+# run with PYTHONPATH=.:..:../lib/python/ python test_element.py
+
+
+class BatchedSource(Source):
+	BATCH_CHANGES = True
+
+
+class Renderer(Element):
+	def __init__(self):
+		Element.__init__(self)
+		self.changes = []
+
+	def changed(self, what):
+		self.changes.append(what)
+
+
+def iterate():
+	for timer in list(enigma.timers):
+		timer.next_activation = 0
+	enigma.runIteration()
+
+
+def test_element():
+	source = BatchedSource()
+	renderer = Renderer()
+	renderer.connect(source)
+	del renderer.changes[:]
+
+	source.changed((Element.CHANGED_SPECIFIC, 1))
+	source.changed((Element.CHANGED_SPECIFIC, 2))
+	source.changed((Element.CHANGED_SPECIFIC, 1))
+	assert renderer.changes == []
+	iterate()
+	assert renderer.changes == [(Element.CHANGED_SPECIFIC, 1), (Element.CHANGED_SPECIFIC, 2)]
+	assert (source.changes_pushed, source.changes_saved) == (2, 1)
+
+	del renderer.changes[:]
+	source.changed((Element.CHANGED_SPECIFIC, 1))
+	source.changed((Element.CHANGED_ALL,))
+	source.changed((Element.CHANGED_SPECIFIC, 2))
+	iterate()
+	assert renderer.changes == [(Element.CHANGED_ALL,)]
+	assert (source.changes_pushed, source.changes_saved) == (3, 3)
+
+	# an element which did not opt in pushes at once
+	plain = Source()
+	other = Renderer()
+	other.connect(plain)
+	plain.changed((Element.CHANGED_ALL,))
+	assert other.changes == [(Element.CHANGED_DEFAULT,), (Element.CHANGED_ALL,)]
+
+	# a source destroyed before the flush
+	source.changed((Element.CHANGED_ALL,))
+	source.destroy()
+	iterate()
+	print("test_element passed")
+
+
+test_element()
@@ -0,0 +1,128 @@
+import sys
+
+from twisted.internet import defer, reactor, task
+from twisted.python.failure import Failure
+from twisted.web import resource, server
+
+from Tools.HttpClient import HttpClient, HttpError
+
+# test for the asynchronous http client against a local stand-in server:
+# response caching with ttl and etag, the concurrency limit, authentication,
+# errors and cancellation when the owning screen closes.
+#
+# run with PYTHONPATH=.:..:../lib/python/ python test_httpclient.py
+
+
+class Page(resource.Resource):
+	isLeaf = True
+
+	def __init__(self):
+		resource.Resource.__init__(self)
+		self.requests = 0
+		self.running = 0
+		self.max_running = 0
+
+	def render_GET(self, request):
+		self.requests += 1
+		path = request.path
+		if path == b"/etag":
+			request.setHeader(b"ETag", b'"v1"')
+			if request.getHeader(b"If-None-Match") == b'"v1"':
+				request.setResponseCode(304)
+				return b""
+			return b"tagged"
+		if path == b"/auth":
+			if request.getHeader(b"Authorization") != b"Basic dXNlcjpwYXNz":
+				request.setResponseCode(401)
+				request.setHeader(b"WWW-Authenticate", b'Basic realm="test"')
+				return b"denied"
+			return b"welcome"
+		if path == b"/missing":
+			request.setResponseCode(404)
+			return b"not here"
+		if path == b"/slow":
+			self.running += 1
+			self.max_running = max(self.max_running, self.running)
+
+			def finish():
+				self.running -= 1
+				if not request.finished and not request._disconnected:
+					request.write(b"slow")
+					request.finish()
+			reactor.callLater(0.2, finish)
+			return server.NOT_DONE_YET
+		return b'{"page": "%s"}' % path
+
+
+class Screen:
+	def __init__(self):
+		self.onClose = []
+
+	def close(self):
+		for x in self.onClose[:]:
+			x()
+
+
+@defer.inlineCallbacks
+def test_httpclient():
+	page = Page()
+	port = reactor.listenTCP(0, server.Site(page), interface="127.0.0.1")
+	base = "http://127.0.0.1:%d" % port.getHost().port
+	client = HttpClient(max_requests=2)
+
+	# ttl cache
+	data = yield client.getJson(base + "/json", ttl=60)
+	assert data == {"page": "/json"}
+	data = yield client.getJson(base + "/json", ttl=60)
+	assert page.requests == 1
+
+	# etag revalidation
+	body = yield client.get(base + "/etag")
+	body = yield client.get(base + "/etag")
+	assert body == b"tagged" and page.requests == 3
+
+	# authentication
+	body = yield client.get(base + "/auth", auth=("user", "pass"))
+	assert body == b"welcome"
+
+	# errors
+	try:
+		yield client.get(base + "/missing")
+		assert False
+	except HttpError as e:
+		assert e.code == 404
+
+	# at most two requests at once
+	bodies = yield defer.gatherResults([client.get(base + "/slow") for x in range(6)])
+	assert bodies == [b"slow"] * 6 and page.max_running == 2
+
+	# a closed screen cancels its requests, their callbacks are never called
+	screen = Screen()
+	called = []
+	client.get(base + "/slow", owner=screen).addBoth(called.append)
+	client.get(base + "/slow", owner=screen).addBoth(called.append)
+	client.get(base + "/slow", owner=screen).addBoth(called.append)
+	yield task.deferLater(reactor, 0.05, lambda: None)
+	screen.close()
+	yield task.deferLater(reactor, 0.5, lambda: None)
+	assert not called and client.running == 0 and not client.waiting
+
+	yield client.pool.closeCachedConnections()
+	yield port.stopListening()
+	print("test_httpclient passed")
+
+
+def run():
+	def done(result):
+		if isinstance(result, Failure):
+			print(result.getTraceback())
+			run.failed = True
+		reactor.stop()
+
+	test_httpclient().addBoth(done)
+	reactor.run()
+	sys.exit(run.failed)
+
+
+run.failed = False
+run()
@@ -0,0 +1,109 @@
+import enigma
+import os
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from Components.ImportChannels import ImportChannels
+
+# test for the channel import from a fallback receiver against a local
+# stand-in for its web interface. only changed bouquet files are written,
+# bouquets which are gone are removed and an unchanged list is left alone.
+#
+# run with PYTHONPATH=.:..:../lib/python/ python test_importchannels.py
+
+remote = {
+	"bouquets.tv": b'#NAME User - bouquets (TV)\n#SERVICE 1:7:1:0:0:0:0:0:0:0:FROM BOUQUET "userbouquet.a.tv" ORDER BY bouquet\n#SERVICE 1:7:1:0:0:0:0:0:0:0:FROM BOUQUET "userbouquet.b.tv" ORDER BY bouquet\n',
+	"bouquets.radio": b'#NAME User - bouquets (Radio)\n#SERVICE 1:7:2:0:0:0:0:0:0:0:FROM BOUQUET "userbouquet.r.radio" ORDER BY bouquet\n',
+	"userbouquet.a.tv": b"#NAME A\n#SERVICE 1:0:1:1:1:1:C00000:0:0:0:\n",
+	"userbouquet.b.tv": b"#NAME B\n#SERVICE 1:0:1:2:1:1:C00000:0:0:0:\n",
+	"userbouquet.r.radio": b"#NAME R\n#SERVICE 1:0:2:3:1:1:C00000:0:0:0:\n",
+}
+requests = []
+
+
+class FallbackReceiver(BaseHTTPRequestHandler):
+	def do_GET(self):
+		file = os.path.basename(parse_qs(urlsplit(self.path).query)["file"][0])
+		requests.append(file)
+		if file in remote:
+			self.send_response(200)
+			self.send_header("Content-Length", str(len(remote[file])))
+			self.end_headers()
+			self.wfile.write(remote[file])
+		else:
+			self.send_error(404)
+
+	def log_message(self, *args):
+		pass
+
+
+def run(importer):
+	del requests[:]
+	importer.done = []
+	assert importer.importChannels()
+	return sorted(requests)
+
+
+def test_importchannels():
+	server = HTTPServer(("127.0.0.1", 0), FallbackReceiver)
+	threading.Thread(target=server.serve_forever, daemon=True).start()
+
+	importer = ImportChannels.__new__(ImportChannels)
+	importer.url = "http://127.0.0.1:%d" % server.server_address[1]
+	importer.header = None
+	importer.settings_dir = tempfile.mkdtemp()
+	importer.ImportChannelsDone = lambda flag, message=None: importer.done.append((flag, message))
+
+	def local():
+		files = {}
+		for file in os.listdir(importer.settings_dir):
+			with open(os.path.join(importer.settings_dir, file), "rb") as f:
+				files[file] = f.read()
+		return files
+
+	# first import, every file is fetched once
+	assert run(importer) == sorted(remote)
+	assert local() == remote and importer.channels_changed
+
+	# nothing changed, nothing written
+	mtimes = dict((file, os.stat(os.path.join(importer.settings_dir, file)).st_mtime_ns) for file in remote)
+	assert run(importer) == sorted(remote)
+	assert not importer.channels_changed
+	assert mtimes == dict((file, os.stat(os.path.join(importer.settings_dir, file)).st_mtime_ns) for file in remote)
+
+	# a changed bouquet and a removed one
+	remote["userbouquet.a.tv"] += b"#SERVICE 1:0:1:4:1:1:C00000:0:0:0:\n"
+	remote["bouquets.tv"] = remote["bouquets.tv"].split(b"\n#SERVICE")[0] + b'\n#SERVICE 1:7:1:0:0:0:0:0:0:0:FROM BOUQUET "userbouquet.a.tv" ORDER BY bouquet\n'
+	del remote["userbouquet.b.tv"]
+	run(importer)
+	assert local() == remote and importer.channels_changed
+
+	# a failed download leaves the local files alone
+	before = local()
+	remote["bouquets.tv"] += b'#SERVICE 1:7:1:0:0:0:0:0:0:0:FROM BOUQUET "userbouquet.missing.tv" ORDER BY bouquet\n'
+	importer.done = []
+	assert not importer.importChannels()
+	assert local() == before and importer.done and not importer.done[0][0]
+
+	# file names which are not plain names are not written
+	remote["bouquets.tv"] = remote["bouquets.tv"].split(b"\n#SERVICE")[0] + b'\n#SERVICE 1:7:1:0:0:0:0:0:0:0:FROM BOUQUET "userbouquet.a.tv" ORDER BY bouquet\n#SERVICE 1:7:1:0:0:0:0:0:0:0:FROM BOUQUET ".." ORDER BY bouquet\n'
+	remote[".."] = b"#NAME dots\n"
+	run(importer)
+	assert sorted(local()) == sorted(file for file in remote if file != "..")
+
+	# a file which can not be replaced fails the import, nothing is left behind
+	remote["userbouquet.r.radio"] += b"#SERVICE 1:0:2:5:1:1:C00000:0:0:0:\n"
+	os.remove(os.path.join(importer.settings_dir, "userbouquet.r.radio"))
+	os.mkdir(os.path.join(importer.settings_dir, "userbouquet.r.radio"))
+	importer.done = []
+	assert not importer.importChannels()
+	assert importer.done and not importer.done[0][0]
+	assert not [file for file in os.listdir(importer.settings_dir) if file.startswith(".")]
+
+	server.shutdown()
+	print("test_importchannels passed")
+
+
+test_importchannels()
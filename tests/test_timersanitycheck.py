@@ -0,0 +1,235 @@
+import enigma
+import os
+import tempfile
+import time
+
+os.environ["TZ"] = "Europe/Berlin"
+time.tzset()
+
+enigma.init_record_timer()
+
+from Components.config import config
+import NavigationInstance
+import RecordTimer
+from Components import TimerSanityCheck
+from ServiceReference import ServiceReference
+from Tools.CIHelper import cihelper
+
+import reference_timersanitycheck
+
+# compares the conflict check against the engine it replaced. timers are
+# checked against a receiver with two tuners, which can record any number
+# of services from the transponder they are tuned to.
+#
+# run with PYTHONPATH=.:..:../lib/python/ python test_timersanitycheck.py
+
+TUNERS = 2
+DAY = 86400
+
+
+class FakeRecording:
+	def __init__(self, navigation, ref):
+		self.navigation = navigation
+		ref = getattr(ref, "ref", ref)
+		self.transponder = tuple(ref.getUnsignedData(x) for x in (2, 3, 4))
+
+	def start(self, simulate=False):
+		tuned = set(recording.transponder for recording in self.navigation.recordings)
+		if self.transponder not in tuned and len(tuned) >= TUNERS:
+			return -1
+		self.navigation.recordings.append(self)
+		return 0
+
+	def stop(self):
+		if self in self.navigation.recordings:
+			self.navigation.recordings.remove(self)
+
+	def frontendInfo(self):
+		return self
+
+	def getFrontendData(self):
+		return {"tuner_type": "DVB-S"}
+
+
+class FakeNavigation:
+	def __init__(self):
+		self.recordings = []
+
+	def recordService(self, ref, simulate=False):
+		return FakeRecording(self, ref)
+
+	def stopRecordService(self, service):
+		service.stop()
+
+	def getCurrentlyPlayingServiceReference(self):
+		return None
+
+
+class FakeServiceInfo:
+	def getInfoObject(self, ref, what):
+		return {"tuner_type": "DVB-S"}
+
+
+NavigationInstance.instance = FakeNavigation()
+enigma.eServiceCenter.getInstance().info = lambda ref: FakeServiceInfo()
+
+# CI slot of each assigned service
+assignments = {}
+multidescramble = [False]
+cihelper.ServiceIsAssigned = lambda ref, timer=None: ref in assignments and (assignments[ref], ref)
+cihelper.canMultiDescramble = lambda ci: multidescramble[0]
+
+
+def service(sid, tsid):
+	return "1:0:19:%X:%X:1:C00000:0:0:0:" % (sid, tsid)
+
+
+def entry(name, ref, begin, end, repeated=0, justplay=False, descramble=True, record_ecm=False):
+	timer = RecordTimer.RecordTimerEntry(ServiceReference(ref), begin, end, name, "", None, justplay=justplay, descramble=descramble, record_ecm=record_ecm)
+	timer.repeated = repeated
+	return timer
+
+
+def check(timerlist, newtimer):
+	results = []
+	for engine in (reference_timersanitycheck.TimerSanityCheck, TimerSanityCheck.TimerSanityCheck):
+		sanitycheck = engine(timerlist, newtimer)
+		ok = sanitycheck.check()
+		assert not NavigationInstance.instance.recordings, "fake recordings left behind"
+		results.append((ok, sorted(timer.name for timer in sanitycheck.getSimulTimerList())))
+	assert results[0] == results[1], "%s: reference %s, new %s" % (newtimer.name, results[0], results[1])
+	return results[1]
+
+
+def localTime(days, hour, minute=0):
+	# days from now at the given local time of day
+	day = time.localtime(time.time() + days * DAY)
+	return int(time.mktime((day.tm_year, day.tm_mon, day.tm_mday, hour, minute, 0, 0, 0, -1)))
+
+
+def test_overlaps():
+	begin = localTime(1, 20)
+	a = entry("a", service(1, 1), begin, begin + 3600)
+	b = entry("b", service(2, 2), begin + 1800, begin + 5400)
+	assert check([a, b], entry("c", service(3, 3), begin + 3000, begin + 4000)) == (False, ["a", "b", "c"])
+	assert check([a, b], entry("c", service(3, 1), begin + 3000, begin + 4000)) == (True, ["c"]) # same transponder as a
+	assert check([a, b], entry("c", service(3, 3), begin + 5400, begin + 7200)) == (True, ["c"]) # after both
+	assert check([a, b], entry("c", service(3, 3), begin - 1800, begin)) == (True, ["c"]) # ends when a begins
+	# a timer beginning when another one ends still needs a tuner of its own
+	assert check([a, b], entry("c", service(3, 3), begin + 3600, begin + 7200)) == (False, ["a", "b", "c"])
+	c = entry("c", service(3, 3), begin + 3600, begin + 5400)
+	d = entry("d", service(4, 4), begin + 3600, begin + 5400)
+	assert check([a, b, c], d) == (False, ["a", "b", "c", "d"])
+	assert check([a, b, d], c) == (False, ["a", "b", "c", "d"])
+
+
+def test_repeated():
+	begin = localTime(1, 20)
+	daily = entry("daily", service(1, 1), begin, begin + 3600, repeated=127)
+	weekly = entry("weekly", service(2, 2), begin + 1800, begin + 5400, repeated=1 << time.localtime(begin).tm_wday)
+	assert check([daily, weekly], entry("single", service(3, 3), begin + 1800, begin + 2400)) == (False, ["daily", "single", "weekly"])
+	assert check([daily, weekly], entry("single", service(3, 3), localTime(2, 20, 30), localTime(2, 20, 40))) == (True, ["single"])
+	# far from the first weeks of the repeating timers
+	assert check([daily, weekly], entry("single", service(3, 3), localTime(22, 20, 30), localTime(22, 20, 40))) == (False, ["daily", "single", "weekly"])
+	assert check([daily, weekly], entry("single", service(3, 3), localTime(23, 20, 30), localTime(23, 20, 40))) == (True, ["single"])
+	single = entry("single", service(2, 2), localTime(11, 20), localTime(11, 21))
+	weekday = 1 << time.localtime(single.begin).tm_wday
+	assert check([daily, single], entry("weekly", service(3, 3), begin + 1800, begin + 5400, repeated=weekday)) == (False, ["daily", "single", "weekly"])
+	assert check([daily, single], entry("weekly", service(3, 3), begin + 3600, begin + 5400, repeated=weekday)) == (False, ["daily", "single", "weekly"])
+	assert check([daily], entry("other", service(3, 3), begin + 600, begin + 1200, repeated=127)) == (True, ["other"])
+	assert check([daily, weekly], entry("other", service(3, 3), begin + 600, begin + 1200, repeated=127)) == (True, ["other"])
+	assert check([daily, weekly], entry("other", service(3, 3), begin + 3000, begin + 3300, repeated=127)) == (False, ["daily", "other", "weekly"])
+
+
+def test_dst():
+	# a daily timer keeps its local time of day across the next DST change
+	change = localTime(1, 12)
+	while time.localtime(change).tm_isdst == time.localtime(change + DAY).tm_isdst:
+		change += DAY
+	days = (change - time.time()) // DAY + 1
+	begin = localTime(days - 3, 20)
+	daily = entry("daily", service(1, 1), begin, begin + 3600, repeated=127)
+	after = localTime(days + 2, 20)
+	other = entry("other", service(2, 2), after, after + 3600)
+	assert check([daily, other], entry("single", service(3, 3), after + 600, after + 1200)) == (False, ["daily", "other", "single"])
+	# an hour earlier, where the daily timer would be without the correction
+	assert check([daily, other], entry("single", service(3, 3), localTime(days + 2, 19), localTime(days + 2, 19, 30))) == (True, ["single"])
+	single = entry("single", service(3, 3), after + 600, after + 1200)
+	assert check([other, single], entry("daily", service(1, 1), begin, begin + 3600, repeated=127)) == (False, ["daily", "other", "single"])
+
+
+def test_zap():
+	begin = localTime(1, 20)
+	a = entry("a", service(1, 1), begin, begin + 3600)
+	b = entry("b", service(2, 2), begin, begin + 3600)
+	# zapping needs a tuner as well
+	assert check([a, b], entry("zap", service(3, 3), begin + 600, begin + 601, justplay=True)) == (False, ["a", "b", "zap"])
+	zap = entry("zap", service(3, 3), begin + 600, begin + 601, justplay=True)
+	assert check([a, zap], entry("b", service(2, 2), begin, begin + 3600)) == (False, ["a", "b", "zap"])
+	assert check([a, zap], entry("b", service(2, 2), begin + 660, begin + 3600)) == (True, ["b"])
+	assert check([zap], entry("zap2", service(3, 3), begin + 600, begin + 601, justplay=True)) == (True, ["zap2"])
+
+
+def test_ci():
+	begin = localTime(1, 20)
+	config.misc.use_ci_assignment.value = True
+	assignments.update({service(1, 1): 0, service(2, 1): 0, service(3, 3): 0, service(4, 4): 1})
+	try:
+		a = entry("a", service(1, 1), begin, begin + 3600)
+		assert check([a], entry("c", service(3, 3), begin + 1800, begin + 5400)) == (False, ["a", "c"]) # same CI
+		assert check([a], entry("c", service(4, 4), begin + 1800, begin + 5400)) == (True, ["c"]) # other CI
+		assert check([a], entry("c", service(3, 3), begin + 3600, begin + 5400)) == (False, ["a", "c"])
+		assert check([a], entry("c", service(3, 3), begin + 5400, begin + 7200)) == (True, ["c"])
+		assert check([a], entry("c", service(3, 3), begin + 1800, begin + 5400, descramble=False, record_ecm=True)) == (True, ["c"])
+		assert check([a], entry("c", service(2, 1), begin + 1800, begin + 5400)) == (False, ["a", "c"])
+		multidescramble[0] = True
+		assert check([a], entry("c", service(2, 1), begin + 1800, begin + 5400)) == (True, ["c"]) # same transponder
+		assert check([a], entry("c", service(3, 3), begin + 1800, begin + 5400)) == (False, ["a", "c"])
+	finally:
+		config.misc.use_ci_assignment.value = False
+		assignments.clear()
+		multidescramble[0] = False
+
+
+def load(xml, engine):
+	RecordTimer.TimerSanityCheck = engine
+	fd, filename = tempfile.mkstemp(suffix=".xml")
+	try:
+		with os.fdopen(fd, "w") as f:
+			f.write(xml)
+		recordtimer = RecordTimer.RecordTimer()
+		recordtimer.Filename = filename
+		recordtimer.timer_list = []
+		recordtimer.processed_timers = []
+		recordtimer.loadTimer()
+		return sorted((timer.name, timer.disabled) for timer in recordtimer.timer_list + recordtimer.processed_timers)
+	finally:
+		os.remove(filename)
+		RecordTimer.TimerSanityCheck = TimerSanityCheck.TimerSanityCheck
+
+
+def test_loadTimer():
+	begin = localTime(1, 20)
+	timers = [
+		("a", service(1, 1), begin, begin + 3600, 0),
+		("b", service(2, 2), begin + 600, begin + 3600, 0),
+		("c", service(3, 3), begin + 1200, begin + 2400, 0), # no tuner left
+		("d", service(4, 4), begin + 3700, begin + 7200, 0),
+		("e", service(5, 1), begin + 1800, begin + 2400, 0), # a's transponder
+		("daily", service(6, 6), begin - DAY + 1800, begin - DAY + 1900, 127), # no tuner left today
+		("f", service(7, 7), begin + 3 * DAY, begin + 3 * DAY + 600, 0),
+	]
+	xml = "<timers>\n%s</timers>\n" % "".join('<timer begin="%d" end="%d" serviceref="%s" repeated="%d" name="%s" description="" afterevent="auto" eit="" disabled="0" justplay="0" />\n' % (begin, end, ref, repeated, name) for (name, ref, begin, end, repeated) in timers)
+	reference = load(xml, reference_timersanitycheck.TimerSanityCheck)
+	disabled = load(xml, TimerSanityCheck.TimerSanityCheck)
+	assert disabled == reference, (reference, disabled)
+	assert sorted(name for name, off in disabled if off) == ["c", "daily"], disabled
+
+
+test_overlaps()
+test_repeated()
+test_dst()
+test_zap()
+test_ci()
+test_loadTimer()
+print("test_timersanitycheck passed")